@@ -4,6 +4,7 @@ from .models import (
     GlobalQueryOptions,
     RoutesModel,
     QueryDelimOptions,
+    SearchLimits,
     AbstractResponseModel,
     BackendConfigModel
 )
@@ -11,6 +12,7 @@ from .types import (
     GlobalQueryOptionsDict,
     RoutesModelDict,
     QueryDelimOptionsDict,
+    SearchLimitsDict,
     BackendConfigDict,
     RouteSchema
 )
@@ -28,7 +30,10 @@ DEFAULT_ACTION_MAP = {
     RoutesEnum.update_one: CrudActions.update_one.value,
     RoutesEnum.update_many: CrudActions.update_many.value,
     RoutesEnum.delete_many: CrudActions.delete_many.value,
-    RoutesEnum.recover_one: CrudActions.recover_one.value
+    RoutesEnum.recover_one: CrudActions.recover_one.value,
+    RoutesEnum.export: CrudActions.export.value,
+    RoutesEnum.aggregate: CrudActions.aggregate.value,
+    RoutesEnum.facets: CrudActions.facets.value
 }
 
 
@@ -48,6 +53,22 @@ RoutesSchema: List[RouteSchema] = [
         "path": '/bulk',
         "method": "POST"
     },
+    {
+        # before /{id}, which would match it
+        "name": RoutesEnum.export,
+        "path": '/export',
+        "method": "GET"
+    },
+    {
+        "name": RoutesEnum.aggregate,
+        "path": '/aggregate',
+        "method": "GET"
+    },
+    {
+        "name": RoutesEnum.facets,
+        "path": '/facets',
+        "method": "GET"
+    },
     {
         "name": RoutesEnum.get_one,
         "path": '/{id}',
@@ -80,12 +101,14 @@ class BetterCrudGlobalConfig:
     query: ClassVar[GlobalQueryOptions] = GlobalQueryOptions()
     routes: ClassVar[Optional[RoutesModel]] = RoutesModel()
     delim_config: ClassVar[Optional[QueryDelimOptions]] = None
+    search_limits: ClassVar[SearchLimits] = SearchLimits()
     soft_deleted_field_key: ClassVar[Optional[str]
                                      ] = DEFAULT_SOFT_DELETED_FIELD_KEY
     action_map: ClassVar[Optional[Dict[RoutesEnum, str]]] = None
     page_schema: ClassVar[Optional[AbstractPage]] = Page
-    pagination_mode: ClassVar[Literal["always", "optional", "disabled"]] = "optional"
+    pagination_mode: ClassVar[Literal["always", "optional", "disabled", "cursor"]] = "optional"
     response_schema: ClassVar[Optional[AbstractResponseModel]] = None
+    fast_response: ClassVar[bool] = False
     backend_config: ClassVar[BackendConfigModel] = None
 
     @classmethod
@@ -96,20 +119,24 @@ class BetterCrudGlobalConfig:
         query: Optional[GlobalQueryOptionsDict] = {},
         routes: Optional[RoutesModelDict] = {},
         delim_config: Optional[QueryDelimOptionsDict] = {},
+        search_limits: Optional[SearchLimitsDict] = {},
         soft_deleted_field_key: Optional[str] = None,
         action_map: Optional[Dict[RoutesEnum, str]] = None,
         page_schema: Optional[AbstractPage] = Page,
-        pagination_mode: Literal["always", "optional", "disabled"] = "optional",
-        response_schema: Optional[AbstractResponseModel] = None
+        pagination_mode: Literal["always", "optional", "disabled", "cursor"] = "optional",
+        response_schema: Optional[AbstractResponseModel] = None,
+        fast_response: bool = False
     ) -> None:
         cls.query = GlobalQueryOptions(**query)
         cls.routes = RoutesModel(**routes)
         cls.delim_config = QueryDelimOptions(**delim_config)
+        cls.search_limits = SearchLimits(**search_limits)
         if soft_deleted_field_key:
             cls.soft_deleted_field_key = soft_deleted_field_key
         cls.page_schema = page_schema
         cls.pagination_mode = pagination_mode
         cls.response_schema = response_schema
+        cls.fast_response = fast_response
         cls.action_map = action_map or DEFAULT_ACTION_MAP
         cls.backend_config = BackendConfigModel(**backend_config)
         if cls.backend_config.backend != "custom":
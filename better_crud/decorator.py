@@ -47,7 +47,8 @@ def crud(
     query: Optional[QueryOptionsDict] = {},
     summary_vars: Optional[Dict] = {},
     feature: Optional[str] = "",
-    pagination_mode: Optional[Literal["always", "optional", "disabled"]] = None,
+    pagination_mode: Optional[Literal["always", "optional", "disabled", "cursor"]] = None,
+    fast_response: Optional[bool] = None,
 ) -> Callable[[Type[T]], Type[T]]:
     def decorator(cls: Type[T]) -> Type[T]:
         options = CrudOptions(
@@ -60,6 +61,7 @@ def crud(
             routes={**BetterCrudGlobalConfig.routes.model_dump(), **routes},
             query={**BetterCrudGlobalConfig.query.model_dump(), **query},
             pagination_mode=pagination_mode if pagination_mode is not None else BetterCrudGlobalConfig.pagination_mode,
+            fast_response=fast_response if fast_response is not None else BetterCrudGlobalConfig.fast_response,
         )
         _init_cbv(cls)
         return crud_routes_factory(router, cls, options)
@@ -1,9 +1,26 @@
 from typing import Callable, Optional, List, Dict, Any, Union
-from fastapi import Query, Request
-from .helper import parse_query_search, parse_query_sort, get_params_filter
-from pydantic.types import Json
+import json
+from fastapi import Query, Request, HTTPException, status
+from fastapi.exceptions import RequestValidationError
+from .helper import (
+    parse_query_search,
+    parse_query_sort,
+    parse_query_fields,
+    parse_query_group_by,
+    parse_query_metrics,
+    filter_to_search,
+    get_params_filter
+)
 from pydantic import BaseModel
-from .types import QuerySortDict
+from .types import QuerySortDict, QueryGroupByDict, QueryMetricDict
+from .config import BetterCrudGlobalConfig
+from .exceptions import InvalidSearchException, InvalidAggregateException
+from .search import (
+    SearchNode,
+    build_search_tree,
+    parse_search_spec,
+    search_tree_to_dict
+)
 from .models import (
     AuthModel,
     QuerySortModel,
@@ -24,21 +41,78 @@ class GetQuerySearch:
     def __call__(
         self,
         request: Request,
-        search_spec: Optional[Json] = Query(None, alias="s"),
+        search_spec: Optional[str] = Query(None, alias="s"),
         filters: List[str] = Query(None, alias="filter"),
         ors: List[str] = Query(None, alias="or"),
-    ):
+    ) -> Optional[SearchNode]:
         params_filter = getattr(request.state, "params_filter", None)
         auth_filter = getattr(request.state, "auth_filter", None)
-        search = parse_query_search(
-            search_spec=search_spec,
-            ors=ors,
-            filters=filters,
-            query_filter=self.query_filter,
-            auth_filter=auth_filter,
-            params_filter=params_filter
-        )
-        return search
+        limits = BetterCrudGlobalConfig.search_limits
+        try:
+            search_tree = None
+            if search_spec:
+                search_tree = parse_search_spec(search_spec, limits)
+            if callable(self.query_filter):
+                # the filter function works on the search dict
+                search_tree = search_tree_to_dict(search_tree)
+            search = parse_query_search(
+                search_spec=search_tree,
+                ors=ors,
+                filters=filters,
+                query_filter=self.query_filter,
+                auth_filter=auth_filter,
+                params_filter=params_filter
+            )
+            return build_search_tree(search, limits)
+        except json.JSONDecodeError as e:
+            raise RequestValidationError([{
+                "type": "json_invalid",
+                "loc": ("query", "s"),
+                "msg": "Invalid JSON",
+                "input": search_spec,
+                "ctx": {"error": e.msg}
+            }])
+        except InvalidSearchException as e:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+
+class GetQueryFacets(GetQuerySearch):
+    """Search of the facets route, the `filter` params on the facet
+    fields are kept apart so that each facet can leave its own out"""
+
+    def __call__(
+        self,
+        request: Request,
+        facet_fields: List[str] = Query(..., alias="fields"),
+        search_spec: Optional[str] = Query(None, alias="s"),
+        filters: List[str] = Query(None, alias="filter"),
+        ors: List[str] = Query(None, alias="or"),
+    ) -> Dict[str, Any]:
+        fields = parse_query_fields(facet_fields)
+        facet_search: Dict[str, List[Dict]] = {}
+        # `or` params combine with the filters, a dict query filter
+        # replaces them, they can not be split then
+        if not ors and not isinstance(self.query_filter, dict):
+            search_filters = []
+            for filter_str in filters or []:
+                field = filter_str.split(
+                    BetterCrudGlobalConfig.delim_config.delim)[0]
+                if field in fields:
+                    facet_search.setdefault(field, []).append(
+                        filter_to_search(filter_str))
+                else:
+                    search_filters.append(filter_str)
+            filters = search_filters
+        return {
+            "fields": fields,
+            "search": super().__call__(request, search_spec, filters, ors),
+            "facet_search": {
+                field: {"$and": items} for field, items in facet_search.items()
+            }
+        }
 
 
 class GetQuerySorts:
@@ -59,6 +133,49 @@ class GetQuerySorts:
         return []
 
 
+class GetQueryFields:
+
+    def __init__(self, allow_fields: Optional[List[str]] = None):
+        self.allow_fields = allow_fields
+
+    def __call__(
+        self,
+        fields: List[str] = Query(None, alias="fields")
+    ):
+        if not fields:
+            return None
+        query_fields = parse_query_fields(fields)
+        if not self.allow_fields or any(
+            field not in self.allow_fields for field in query_fields
+        ):
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                detail="Invalid fields"
+            )
+        return query_fields
+
+
+class GetQueryAggregate:
+
+    def __call__(
+        self,
+        group_by: List[str] = Query(
+            None, description="Fields to group by, `field||bucket` truncates a date"),
+        metrics: List[str] = Query(
+            None, description="Aggregates to compute, `function||field`"),
+    ) -> Dict[str, Union[List[QueryGroupByDict], List[QueryMetricDict]]]:
+        try:
+            return {
+                "group_by": parse_query_group_by(group_by or []),
+                "metrics": parse_query_metrics(metrics or ["count"])
+            }
+        except InvalidAggregateException as e:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+
 class GetQueryJoins:
 
     def __init__(self, option_joins: Optional[JoinOptions] = None):
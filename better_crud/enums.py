@@ -10,6 +10,9 @@ class RoutesEnum(str, Enum):
     update_many = 'update_many'
     delete_many = 'delete_many'
     recover_one = 'recover_one'
+    export = 'export'
+    aggregate = 'aggregate'
+    facets = 'facets'
 
 
 class CrudActions(str, Enum):
@@ -21,6 +24,9 @@ class CrudActions(str, Enum):
     update_many = 'update',
     delete_many = 'delete'
     recover_one = 'recover'
+    export = 'read'
+    aggregate = 'read'
+    facets = 'read'
 
 
 class QuerySortType(str, Enum):
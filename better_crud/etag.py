@@ -0,0 +1,55 @@
+from typing import Any, Optional
+import hashlib
+from fastapi import Request, status
+from fastapi.responses import Response
+
+
+def create_version_etag(request: Request, id: Any, version: Any) -> str:
+    """Weak tag of the entity version, the query string is part of it as
+    it changes the representation"""
+    digest = hashlib.sha1(
+        f"{id}:{version}:{request.url.query}".encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def create_body_etag(body: bytes) -> str:
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def _opaque_tag(etag: str) -> str:
+    etag = etag.strip()
+    if etag.startswith("W/"):
+        return etag[2:]
+    return etag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison of `etag` with the If-None-Match header"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return _opaque_tag(etag) in [
+        _opaque_tag(tag) for tag in if_none_match.split(",")
+    ]
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag}
+    )
+
+
+def etag_response(
+    request: Request,
+    response: Response,
+    etag: Optional[str] = None
+) -> Response:
+    """Tag the response, or replace it with a 304 when the client has it"""
+    etag = etag or create_body_etag(response.body)
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+    response.headers["ETag"] = etag
+    return response
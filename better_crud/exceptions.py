@@ -1,3 +1,6 @@
+from typing import Any, List
+
+
 class NotSupportOperatorException(Exception):
     def __init__(self, operator: str):
         super().__init__(f"not support operator {operator}")
@@ -12,5 +15,27 @@ class InvalidFieldException(Exception):
     def __init__(self, field: str):
         super().__init__(f"invalid field name {field}")
 
+
+class InvalidSearchException(Exception):
+    def __init__(self, reason: str):
+        super().__init__(f"invalid search, {reason}")
+
+
+class InvalidAggregateException(Exception):
+    def __init__(self, reason: str):
+        super().__init__(f"invalid aggregate, {reason}")
+
+
 class NotFoundException(Exception):
-    pass
\ No newline at end of file
+    pass
+
+
+class RelationNotFoundException(Exception):
+    def __init__(self, relation: str, ids: List[Any]):
+        super().__init__(
+            f"{relation} not found: {', '.join(str(id) for id in ids)}")
+
+
+class InvalidCursorException(Exception):
+    def __init__(self, cursor: str):
+        super().__init__(f"invalid cursor {cursor}")
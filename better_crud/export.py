@@ -0,0 +1,50 @@
+from typing import Any, AsyncIterator, Dict, Optional
+import csv
+import io
+import json
+from fastapi.encoders import jsonable_encoder
+from .types import ExportFormat
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+async def _iter_rows(
+    first_row: Optional[Dict[str, Any]],
+    rows: AsyncIterator[Dict[str, Any]]
+) -> AsyncIterator[Dict[str, Any]]:
+    if first_row is None:
+        return
+    yield first_row
+    async for row in rows:
+        yield row
+
+
+async def encode_export_rows(
+    first_row: Optional[Dict[str, Any]],
+    rows: AsyncIterator[Dict[str, Any]],
+    format: ExportFormat = "ndjson"
+) -> AsyncIterator[str]:
+    """Encode the exported rows, lines are sent in chunks of about
+    `EXPORT_CHUNK_SIZE` characters"""
+    buffer = io.StringIO()
+    writer = None
+    async for row in _iter_rows(first_row, rows):
+        row = jsonable_encoder(row)
+        if format == "csv":
+            if writer is None:
+                writer = csv.DictWriter(buffer, fieldnames=list(row.keys()))
+                writer.writeheader()
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(row))
+            buffer.write("\n")
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
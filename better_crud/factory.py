@@ -33,15 +33,31 @@ from fastapi import (
     HTTPException,
     BackgroundTasks
 )
+from fastapi.encoders import jsonable_encoder
 from fastapi.params import Depends as DependsParam
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import TypeAdapter
 from .enums import RoutesEnum
+from .etag import (
+    create_version_etag,
+    etag_matches,
+    etag_response,
+    not_modified_response
+)
 from .models import (
     CrudOptions,
     AbstractResponseModel,
     RouteOptions,
     JoinOptions
 )
-from .types import QuerySortDict, CreateSchemaType, UpdateSchemaType
+from .types import (
+    QuerySortDict,
+    CreateSchemaType,
+    UpdateSchemaType,
+    ExportFormat,
+    FacetValueDict
+)
+from .export import EXPORT_MEDIA_TYPES, encode_export_rows
 from .config import BetterCrudGlobalConfig, RoutesSchema
 from .helper import get_serialize_model, get_route_summary
 from .depends import (
@@ -51,11 +67,20 @@ from .depends import (
     GetQueryLoads,
     GetQuerySorts,
     GetQueryJoins,
+    GetQueryFields,
+    GetQueryAggregate,
+    GetQueryFacets,
 )
 from fastapi_pagination import pagination_ctx
 from fastapi_pagination.bases import AbstractPage
-from .pagination import PageAlways, PageOptional
-from .exceptions import NotFoundException
+from .pagination import PageAlways, PageOptional, CursorPage
+from .exceptions import (
+    NotFoundException,
+    InvalidCursorException,
+    InvalidFieldException,
+    InvalidAggregateException,
+    RelationNotFoundException
+)
 
 T = TypeVar("T")
 CRUD_CLASS_KEY = "__crud_class__"
@@ -159,6 +184,21 @@ def crud_routes_factory(router: APIRouter, cls: Type[T], options: CrudOptions) -
     serialize = options.serialize
     _crud_routes.append((router, cls, options))
     pagination_mode = options.pagination_mode or BetterCrudGlobalConfig.pagination_mode
+    fast_response = options.fast_response \
+        if options.fast_response is not None \
+        else BetterCrudGlobalConfig.fast_response
+
+    def get_allow_fields(router_name: str) -> Optional[List[str]]:
+        if options.query.allow_fields is not None:
+            return options.query.allow_fields
+        serialize_model = get_serialize_model(serialize, router_name)
+        return list(getattr(serialize_model, "model_fields", None) or [])
+
+    def fields_response(output: Any) -> Response:
+        # partial rows do not match the serialize model
+        if response_schema_type:
+            output = response_schema_type.create(output)
+        return JSONResponse(jsonable_encoder(output))
 
     async def get_many(
         self,
@@ -171,16 +211,37 @@ def crud_routes_factory(router: APIRouter, cls: Type[T], options: CrudOptions) -
         ),
         sorts: List[QuerySortDict] = Depends(
             GetQuerySorts(options.query.sort)),
+        fields: Optional[List[str]] = Depends(
+            GetQueryFields(get_allow_fields(RoutesEnum.get_many.value))),
     ):
-        return await self.service.crud_get_many(
-            request=request,
-            joins=joins,
-            search=search,
-            sorts=sorts,
-            soft_delete=options.query.soft_delete,
-            include_deleted=request.query_params.get(
-                INCLUDE_DELETED_KEY) == "true" if options.query.allow_include_deleted else False
-        )
+        try:
+            output = await self.service.crud_get_many(
+                request=request,
+                joins=joins,
+                search=search,
+                sorts=sorts,
+                soft_delete=options.query.soft_delete,
+                include_deleted=request.query_params.get(
+                    INCLUDE_DELETED_KEY) == "true" if options.query.allow_include_deleted else False,
+                count_mode=options.query.count_mode,
+                fields=fields,
+                read_mode=options.query.read_mode
+            )
+        except InvalidCursorException:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        except InvalidFieldException:
+            if not fields:
+                raise
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                detail="Invalid fields"
+            )
+        if fields:
+            return fields_response(output)
+        return output
 
     async def get_one(
         self,
@@ -188,19 +249,43 @@ def crud_routes_factory(router: APIRouter, cls: Type[T], options: CrudOptions) -
         joins: JoinOptions = Depends(
             GetQueryLoads(options.query.joins)
         ),
+        fields: Optional[List[str]] = Depends(
+            GetQueryFields(get_allow_fields(RoutesEnum.get_one.value))),
         id: Union[int, str] = Path(..., title="The ID of the item to get")
     ):
-        try:
-            return await self.service.crud_get_one(
+        if options.query.etag and not fields:
+            version = await self.service.crud_get_version(
                 request,
                 id,
                 joins=joins
             )
+            if version is not None:
+                etag = create_version_etag(request, id, version)
+                if etag_matches(request, etag):
+                    return not_modified_response(etag)
+                request.state.etag = etag
+        try:
+            output = await self.service.crud_get_one(
+                request,
+                id,
+                joins=joins,
+                fields=fields
+            )
         except NotFoundException:
             raise HTTPException(
                 status.HTTP_404_NOT_FOUND,
                 detail="No data found"
             )
+        except InvalidFieldException:
+            if not fields:
+                raise
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                detail="Invalid fields"
+            )
+        if fields:
+            return fields_response(output)
+        return output
 
     async def recover_one(
         self,
@@ -224,11 +309,17 @@ def crud_routes_factory(router: APIRouter, cls: Type[T], options: CrudOptions) -
         request: Request,
         background_tasks: BackgroundTasks
     ):
-        return await self.service.crud_create_one(
-            request,
-            model,
-            background_tasks=background_tasks
-        )
+        try:
+            return await self.service.crud_create_one(
+                request,
+                model,
+                background_tasks=background_tasks
+            )
+        except RelationNotFoundException as e:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
 
     async def create_many(
         self,
@@ -236,11 +327,17 @@ def crud_routes_factory(router: APIRouter, cls: Type[T], options: CrudOptions) -
         request: Request,
         background_tasks: BackgroundTasks
     ):
-        return await self.service.crud_create_many(
-            request,
-            model,
-            background_tasks=background_tasks
-        )
+        try:
+            return await self.service.crud_create_many(
+                request,
+                model,
+                background_tasks=background_tasks
+            )
+        except RelationNotFoundException as e:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
 
     async def update_one(
         self,
@@ -261,6 +358,11 @@ def crud_routes_factory(router: APIRouter, cls: Type[T], options: CrudOptions) -
                 status.HTTP_404_NOT_FOUND,
                 detail="No data found"
             )
+        except RelationNotFoundException as e:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
 
     async def update_many(
         self,
@@ -288,6 +390,11 @@ def crud_routes_factory(router: APIRouter, cls: Type[T], options: CrudOptions) -
                 status.HTTP_404_NOT_FOUND,
                 detail="No data found"
             )
+        except RelationNotFoundException as e:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
 
     async def delete_many(
         self,
@@ -302,7 +409,8 @@ def crud_routes_factory(router: APIRouter, cls: Type[T], options: CrudOptions) -
                 request,
                 id_list,
                 soft_delete=options.query.soft_delete,
-                background_tasks=background_tasks
+                background_tasks=background_tasks,
+                returning=options.query.delete_returning
             )
         except NotFoundException:
             raise HTTPException(
@@ -310,6 +418,101 @@ def crud_routes_factory(router: APIRouter, cls: Type[T], options: CrudOptions) -
                 detail="No data found"
             )
 
+    async def export(
+        self,
+        request: Request,
+        search: Dict = Depends(
+            GetQuerySearch(options.query.filter)
+        ),
+        joins: JoinOptions = Depends(
+            GetQueryJoins(options.query.joins)
+        ),
+        sorts: List[QuerySortDict] = Depends(
+            GetQuerySorts(options.query.sort)),
+        fields: Optional[List[str]] = Depends(
+            GetQueryFields(get_allow_fields(RoutesEnum.export.value))),
+        format: ExportFormat = Query("ndjson", description="Export format"),
+    ):
+        rows = self.service.crud_export(
+            request=request,
+            joins=joins,
+            search=search,
+            sorts=sorts,
+            soft_delete=options.query.soft_delete,
+            include_deleted=request.query_params.get(
+                INCLUDE_DELETED_KEY) == "true" if options.query.allow_include_deleted else False,
+            fields=fields or get_allow_fields(RoutesEnum.export.value) or None
+        )
+        # run the query before streaming, so errors are still a 400
+        try:
+            first_row = await rows.__anext__()
+        except StopAsyncIteration:
+            first_row = None
+        except InvalidFieldException:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                detail="Invalid fields"
+            )
+        return StreamingResponse(
+            encode_export_rows(first_row, rows, format),
+            media_type=EXPORT_MEDIA_TYPES[format]
+        )
+
+    async def aggregate(
+        self,
+        request: Request,
+        search: Dict = Depends(
+            GetQuerySearch(options.query.filter)
+        ),
+        joins: JoinOptions = Depends(
+            GetQueryJoins(options.query.joins)
+        ),
+        aggregate: Dict = Depends(GetQueryAggregate()),
+    ):
+        try:
+            return await self.service.crud_aggregate(
+                request=request,
+                joins=joins,
+                search=search,
+                soft_delete=options.query.soft_delete,
+                include_deleted=request.query_params.get(
+                    INCLUDE_DELETED_KEY) == "true" if options.query.allow_include_deleted else False,
+                group_by=aggregate["group_by"],
+                metrics=aggregate["metrics"]
+            )
+        except (InvalidFieldException, InvalidAggregateException) as e:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+    async def facets(
+        self,
+        request: Request,
+        facets: Dict = Depends(
+            GetQueryFacets(options.query.filter)
+        ),
+        joins: JoinOptions = Depends(
+            GetQueryJoins(options.query.joins)
+        ),
+    ):
+        try:
+            return await self.service.crud_facets(
+                request=request,
+                fields=facets["fields"],
+                search=facets["search"],
+                facet_search=facets["facet_search"],
+                joins=joins,
+                soft_delete=options.query.soft_delete,
+                include_deleted=request.query_params.get(
+                    INCLUDE_DELETED_KEY) == "true" if options.query.allow_include_deleted else False
+            )
+        except InvalidFieldException as e:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
     cls.get_many = get_many
     cls.create_one = create_one
     cls.create_many = create_many
@@ -319,6 +522,12 @@ def crud_routes_factory(router: APIRouter, cls: Type[T], options: CrudOptions) -
     cls.get_one = get_one
     if options.query.soft_delete and options.query.allow_recover:
         cls.recover_one = recover_one
+    if options.query.allow_export:
+        cls.export = export
+    if options.query.allow_aggregate:
+        cls.aggregate = aggregate
+    if options.query.allow_facets:
+        cls.facets = facets
 
     function_members = inspect.getmembers(cls, inspect.isfunction)
     functions_set = set(func for _, func in function_members)
@@ -414,13 +623,50 @@ def crud_routes_factory(router: APIRouter, cls: Type[T], options: CrudOptions) -
         if router_name == RoutesEnum.recover_one:
             if not (options.query.soft_delete and options.query.allow_recover):
                 continue
+        if router_name == RoutesEnum.export and not options.query.allow_export:
+            continue
+        if router_name == RoutesEnum.aggregate and not options.query.allow_aggregate:
+            continue
+        if router_name == RoutesEnum.facets and not options.query.allow_facets:
+            continue
         overrides = list(filter(lambda route: route.path ==
                          path and method in route.methods, router.routes))
         if overrides:
             continue
         endpoint = getattr(cls, router_name)
+        response_model = get_serialize_model(serialize, router_name)
+        if router_name == RoutesEnum.get_many:
+            page_type = CursorPage if pagination_mode == "cursor" else page_schema_type
+            response_model = Union[
+                page_type[response_model],
+                List[response_model]
+            ]
+        elif router_name in [RoutesEnum.create_many, RoutesEnum.update_many, RoutesEnum.delete_many]:
+            response_model = List[response_model]
+        elif router_name == RoutesEnum.aggregate:
+            response_model = List[Dict[str, Any]]
+        elif router_name == RoutesEnum.facets:
+            response_model = Dict[str, List[FacetValueDict]]
+
+        if router_name == RoutesEnum.export:
+            response_model = None
+        elif response_schema_type:
+            response_model = response_schema_type[response_model]
 
-        def decorator(func: Callable) -> Callable:
+        use_etag = options.query.etag and router_name in (
+            RoutesEnum.get_one,
+            RoutesEnum.get_many
+        )
+        response_adapter = None
+        if (fast_response or use_etag) and response_model is not None:
+            # the etag of the body needs the serialized bytes
+            response_adapter = TypeAdapter(response_model)
+
+        def decorator(
+            func: Callable,
+            response_adapter: Optional[TypeAdapter],
+            use_etag: bool
+        ) -> Callable:
             @wraps(func)
             async def wrapper(*args: Any, **kwargs: Any) -> Any:
                 if options.params:
@@ -428,23 +674,32 @@ def crud_routes_factory(router: APIRouter, cls: Type[T], options: CrudOptions) -
                         kwargs.pop(key)
                 if INCLUDE_DELETED_KEY in kwargs:
                     kwargs.pop(INCLUDE_DELETED_KEY)
+                request = kwargs.get("request")
                 endpoint_output = await func(*args, **kwargs)
+                if isinstance(endpoint_output, Response):
+                    if use_etag and endpoint_output.status_code == status.HTTP_200_OK:
+                        return etag_response(
+                            request,
+                            endpoint_output,
+                            getattr(request.state, "etag", None)
+                        )
+                    return endpoint_output
                 if response_schema_type:
-                    return response_schema_type.create(endpoint_output)
+                    endpoint_output = response_schema_type.create(
+                        endpoint_output)
+                if response_adapter is not None:
+                    response = adapter_response(
+                        response_adapter, endpoint_output)
+                    if use_etag:
+                        return etag_response(
+                            request,
+                            response,
+                            getattr(request.state, "etag", None)
+                        )
+                    return response
                 return endpoint_output
             return wrapper
-        endpoint_wrapper = decorator(endpoint)
-        response_model = get_serialize_model(serialize, router_name)
-        if router_name == RoutesEnum.get_many:
-            response_model = Union[
-                page_schema_type[response_model],
-                List[response_model]
-            ]
-        elif router_name in [RoutesEnum.create_many, RoutesEnum.update_many, RoutesEnum.delete_many]:
-            response_model = List[response_model]
-
-        if response_schema_type:
-            response_model = response_schema_type[response_model]
+        endpoint_wrapper = decorator(endpoint, response_adapter, use_etag)
 
         dependencies = None
         route_options: RouteOptions = getattr(
@@ -470,6 +725,8 @@ def crud_routes_factory(router: APIRouter, cls: Type[T], options: CrudOptions) -
                 page_cls = PageAlways
             elif pagination_mode == "optional":
                 page_cls = PageOptional
+            elif pagination_mode == "cursor":
+                page_cls = CursorPage
             else:
                 page_cls = None
             if page_cls is not None:
@@ -498,6 +755,17 @@ def crud_routes_factory(router: APIRouter, cls: Type[T], options: CrudOptions) -
     return cls
 
 
+def adapter_response(adapter: TypeAdapter, output: Any) -> Response:
+    """Validate the output once with the precompiled adapter of the route
+    and encode it straight to json bytes, fastapi does not validate a
+    returned `Response` again"""
+    content = adapter.validate_python(output, from_attributes=True)
+    return Response(
+        adapter.dump_json(content, by_alias=True),
+        media_type="application/json"
+    )
+
+
 def _update_route_endpoint_signature(
     cls: Type[Any],
     endpoint: Callable,
@@ -521,7 +789,10 @@ def _update_route_endpoint_signature(
         cls.update_one,
         cls.update_many,
         cls.delete_many,
-        cls.get_one
+        cls.get_one,
+        getattr(cls, RoutesEnum.export.value, None),
+        getattr(cls, RoutesEnum.aggregate.value, None),
+        getattr(cls, RoutesEnum.facets.value, None)
     ]
     if is_crud_route and options.params:
         for key, param in options.params.items():
@@ -533,7 +804,12 @@ def _update_route_endpoint_signature(
                 ]
             )
             new_parameters.append(new_param)
-    if endpoint == cls.get_many:
+    if endpoint in (
+        cls.get_many,
+        getattr(cls, RoutesEnum.export.value, None),
+        getattr(cls, RoutesEnum.aggregate.value, None),
+        getattr(cls, RoutesEnum.facets.value, None)
+    ):
         if options.query.allow_include_deleted:
             new_param = inspect.Parameter(
                 INCLUDE_DELETED_KEY,
@@ -1,9 +1,25 @@
-from typing import Optional, Callable, List, TypeVar, Dict, Any, Union
+from typing import (
+    Optional,
+    Callable,
+    List,
+    TypeVar,
+    Dict,
+    Any,
+    Union,
+    get_args
+)
 from fastapi import Request
 import json
 from fastapi_pagination.api import resolve_params
 from fastapi_pagination.bases import AbstractParams
-from .types import QuerySortDict
+from .types import (
+    QuerySortDict,
+    QueryGroupByDict,
+    QueryMetricDict,
+    AggregateFunction,
+    DateBucket
+)
+from .exceptions import InvalidAggregateException
 from .models import SerializeModel, RouteOptions, PathParamModel, JoinOptions
 from .enums import RoutesEnum
 
@@ -121,12 +137,69 @@ def parse_query_sort(
     return sorts
 
 
+def parse_query_fields(raw_query_fields: List[str]) -> List[str]:
+    fields = []
+    for item in raw_query_fields:
+        for field in item.split(BetterCrudGlobalConfig.delim_config.delim_str):
+            field = field.strip()
+            if field and field not in fields:
+                fields.append(field)
+    return fields
+
+
+def _split_query_items(raw_items: List[str]) -> List[List[str]]:
+    delim_config = BetterCrudGlobalConfig.delim_config
+    items = []
+    for raw_item in raw_items:
+        for item in raw_item.split(delim_config.delim_str):
+            item = item.strip()
+            if item:
+                items.append(item.split(delim_config.delim))
+    return items
+
+
+def parse_query_group_by(raw_group_by: List[str]) -> List[QueryGroupByDict]:
+    """Parse `field` or `field||bucket` items, the bucket truncates a
+    date field"""
+    group_by = []
+    for parts in _split_query_items(raw_group_by):
+        if len(parts) > 2:
+            raise InvalidAggregateException(f"group by {parts[0]}")
+        bucket = parts[1] if len(parts) == 2 else None
+        if bucket is not None and bucket not in get_args(DateBucket):
+            raise InvalidAggregateException(f"date bucket {bucket}")
+        group_by.append(QueryGroupByDict(field=parts[0], bucket=bucket))
+    return group_by
+
+
+def parse_query_metrics(raw_metrics: List[str]) -> List[QueryMetricDict]:
+    """Parse `function` or `function||field` items, only count can go
+    without a field"""
+    metrics = []
+    for parts in _split_query_items(raw_metrics):
+        function = parts[0]
+        field = parts[1] if len(parts) == 2 else None
+        if len(parts) > 2 or function not in get_args(AggregateFunction):
+            raise InvalidAggregateException(f"metric {function}")
+        if field is None and function != "count":
+            raise InvalidAggregateException(f"metric {function} needs a field")
+        metrics.append(QueryMetricDict(function=function, field=field))
+    return metrics
+
+
 def update_entity_attr(entity, update_value: Dict):
     for key, value in update_value.items():
         if value is not None:
             setattr(entity, key, value)
 
 
+def get_pagination_params() -> Optional[AbstractParams]:
+    try:
+        return resolve_params()
+    except Exception:
+        return None
+
+
 def decide_should_paginate():
     try:
         params: AbstractParams = resolve_params()
@@ -147,6 +220,8 @@ def get_serialize_model(serialize: SerializeModel, router_name):
             return get_serialize_model(serialize, RoutesEnum.update_one)
         elif router_name == RoutesEnum.recover_one:
             return get_serialize_model(serialize, RoutesEnum.get_one)
+        elif router_name == RoutesEnum.export:
+            return get_serialize_model(serialize, RoutesEnum.get_many)
     return serialize_model or getattr(serialize, "base", None)
 
 
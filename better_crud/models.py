@@ -13,7 +13,14 @@ from typing import (
 from abc import ABC, abstractmethod
 from pydantic import BaseModel, Field, ConfigDict
 from .enums import RoutesEnum, QuerySortType
-from .types import DBSessionFactory, BackendType
+from .types import (
+    DBSessionFactory,
+    BackendType,
+    CountMode,
+    ReadMode,
+    ReadStrategy,
+    JoinStrategy
+)
 C = TypeVar("C")
 
 
@@ -40,6 +47,9 @@ class SerializeModel(BaseModel):
     update_many: Optional[Any] = None
     delete_many: Optional[Any] = None
     recover_one: Optional[Any] = None
+    export: Optional[Any] = None
+    aggregate: Optional[Any] = None
+    facets: Optional[Any] = None
 
 
 class RouteOptions(BaseModel):
@@ -62,6 +72,9 @@ class RoutesModel(BaseModel):
     update_many: Optional[RouteOptions] = None
     delete_many: Optional[RouteOptions] = None
     recover_one: Optional[RouteOptions] = None
+    export: Optional[RouteOptions] = None
+    aggregate: Optional[RouteOptions] = None
+    facets: Optional[RouteOptions] = None
 
 
 class QuerySortModel(BaseModel):
@@ -75,6 +88,8 @@ class JoinOptionModel(BaseModel):
     select_only_detail: Optional[bool] = False
     additional_filter_fn: Optional[Callable[[Any], List[Any]]] = None
     alias: Any = None
+    exists: Optional[bool] = False
+    strategy: Optional[JoinStrategy] = "joined"
 
 
 JoinOptions = Dict[str, JoinOptionModel]
@@ -86,8 +101,16 @@ class QueryOptions(BaseModel):
     soft_delete: Optional[bool] = None
     allow_include_deleted: Optional[bool] = False
     allow_recover: Optional[bool] = False
+    allow_export: Optional[bool] = False
+    allow_aggregate: Optional[bool] = False
+    allow_facets: Optional[bool] = False
     filter: Union[Optional[Dict], Callable[[Any], Dict]] = None
     sort: Optional[List[QuerySortModel]] = None
+    count_mode: Optional[CountMode] = "exact"
+    read_mode: Optional[ReadMode] = "orm"
+    delete_returning: Optional[bool] = False
+    etag: Optional[bool] = False
+    allow_fields: Optional[List[str]] = None
 
 
 class PathParamModel(BaseModel):
@@ -105,7 +128,8 @@ class CrudOptions(BaseModel):
     auth: Optional[AuthModel] = None
     summary_vars: Dict = None
     params: Optional[Dict[str, PathParamModel]] = None
-    pagination_mode: Optional[Literal["always", "optional", "disabled"]] = None
+    pagination_mode: Optional[Literal["always", "optional", "disabled", "cursor"]] = None
+    fast_response: Optional[bool] = None
 
 
 class GlobalQueryOptions(BaseModel):
@@ -113,6 +137,18 @@ class GlobalQueryOptions(BaseModel):
     soft_delete: Optional[bool] = False
     sort: Optional[List[QuerySortModel]] = None
     allow_include_deleted: Optional[bool] = False
+    count_mode: Optional[CountMode] = "exact"
+    read_mode: Optional[ReadMode] = "orm"
+    delete_returning: Optional[bool] = False
+    etag: Optional[bool] = False
+
+
+class SearchLimits(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+    max_depth: Optional[int] = 10
+    max_breadth: Optional[int] = 100
+    max_in_size: Optional[int] = 1000
+    max_length: Optional[int] = 65536
 
 
 class QueryDelimOptions(BaseModel):
@@ -134,6 +170,11 @@ class AbstractResponseModel(BaseModel, ABC):
 
 class SqlalchemyBackendModel(BaseModel):
     db_session: DBSessionFactory
+    read_db_session: Optional[
+        Union[DBSessionFactory, List[DBSessionFactory]]] = None
+    read_strategy: Optional[ReadStrategy] = "round_robin"
+    concurrent_queries: Optional[bool] = False
+    concurrent_queries_limit: Optional[int] = 10
 
 
 class BackendConfigModel(BaseModel):
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import math
-from typing import Generic, Sequence, TypeVar, Optional, Any
+import json
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from typing import Generic, Sequence, TypeVar, Optional, Any, Dict
 from fastapi import Query
-from fastapi_pagination.bases import AbstractPage, AbstractParams, RawParams
+from fastapi_pagination.bases import AbstractPage, AbstractParams, RawParams, CursorRawParams
 from fastapi_pagination.customization import CustomizedPage, UseOptionalParams, UseParamsFields
 from pydantic import BaseModel
+from pydantic_core import to_json
+from .exceptions import InvalidCursorException
 
 
 T = TypeVar('T')
@@ -29,10 +34,11 @@ class Params(BaseModel, AbstractParams):
 
 class Page(AbstractPage[T], Generic[T]):
     items: Sequence[T]
-    total: int
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    has_next: Optional[bool] = None
     __params_type__ = Params
 
     @classmethod
@@ -42,6 +48,7 @@ class Page(AbstractPage[T], Generic[T]):
         params: AbstractParams,
         *,
         total: Optional[int] = None,
+        has_next: Optional[bool] = None,
         **kwargs: Any,
     ) -> Page[T]:
         size = params.size if params.size is not None else (total or None)
@@ -52,7 +59,16 @@ class Page(AbstractPage[T], Generic[T]):
             pages = math.ceil(total / size)
         else:
             pages = None
-        return cls(items=items, total=total, page=page, size=size, pages=pages)
+        if has_next is None and pages is not None:
+            has_next = page < pages
+        return cls(
+            items=items,
+            total=total,
+            page=page,
+            size=size,
+            pages=pages,
+            has_next=has_next
+        )
 
 
 # For pagination_mode="always" — page/size have default values, always paginates
@@ -63,3 +79,57 @@ PageAlways = CustomizedPage[Page, UseParamsFields(
 
 # For pagination_mode="optional" — page/size are optional, missing → return all
 PageOptional = CustomizedPage[Page, UseOptionalParams()]
+
+
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    return urlsafe_b64encode(to_json(payload)).decode()
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        payload = json.loads(urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError):
+        raise InvalidCursorException(cursor) from None
+    if not isinstance(payload, dict):
+        raise InvalidCursorException(cursor)
+    return payload
+
+
+class CursorParams(BaseModel, AbstractParams):
+    cursor: Optional[str] = Query(
+        None,
+        description='Cursor for the next or previous page'
+    )
+    size: int = Query(50, ge=1, le=100, description='Page size')
+
+    def to_raw_params(self) -> CursorRawParams:
+        return CursorRawParams(
+            cursor=self.cursor,
+            size=self.size,
+        )
+
+
+# For pagination_mode="cursor" — keyset pagination, no total/pages
+class CursorPage(AbstractPage[T], Generic[T]):
+    items: Sequence[T]
+    size: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    __params_type__ = CursorParams
+
+    @classmethod
+    def create(
+        cls,
+        items: Sequence[T],
+        params: AbstractParams,
+        *,
+        next_cursor: Optional[str] = None,
+        prev_cursor: Optional[str] = None,
+        **kwargs: Any,
+    ) -> CursorPage[T]:
+        return cls(
+            items=items,
+            size=params.size,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor
+        )
@@ -0,0 +1,224 @@
+from typing import Any, Dict, NamedTuple, Optional, Tuple, Union
+import functools
+import json
+from .models import SearchLimits
+from .exceptions import InvalidSearchException
+
+LOGICAL_OPERATOR_AND = "$and"
+LOGICAL_OPERATOR_OR = "$or"
+
+IN_OPERATORS = ("$in", "$notin", "$inL", "$notinL")
+
+
+class Leaf(NamedTuple):
+    field: str
+    operator: str
+    value: Any
+
+
+class And(NamedTuple):
+    children: Tuple["SearchNode", ...]
+    # set when the node combines the operators of a single field
+    field: Optional[str] = None
+
+
+class Or(NamedTuple):
+    children: Tuple["SearchNode", ...]
+    field: Optional[str] = None
+
+
+SearchNode = Union[And, Or, Leaf]
+
+
+def is_search_node(search: Any) -> bool:
+    return isinstance(search, (And, Or, Leaf))
+
+
+def build_search_tree(
+    search: Any,
+    limits: Optional[SearchLimits] = None
+) -> Optional[SearchNode]:
+    """Compile a search dict into a tree of And/Or/Leaf nodes
+
+    Nodes found in the dict are kept as they are, anything else than a
+    dict is an empty search. Raises `InvalidSearchException` when the
+    search is malformed or exceeds `limits`
+    """
+    if is_search_node(search):
+        return search
+    if not isinstance(search, dict) or not search:
+        return None
+    return _build_search(search, limits, 1)
+
+
+def _check_depth(limits: Optional[SearchLimits], depth: int):
+    if limits and limits.max_depth is not None and depth > limits.max_depth:
+        raise InvalidSearchException(
+            f"search is nested deeper than {limits.max_depth}")
+
+
+def _check_breadth(limits: Optional[SearchLimits], size: int):
+    if limits and limits.max_breadth is not None \
+            and size > limits.max_breadth:
+        raise InvalidSearchException(
+            f"search has more than {limits.max_breadth} conditions")
+
+
+def _build_search(search: Any, limits: Optional[SearchLimits], depth: int) -> SearchNode:
+    if is_search_node(search):
+        return search
+    if not isinstance(search, dict):
+        raise InvalidSearchException("search must be an object")
+    _check_depth(limits, depth)
+    _check_breadth(limits, len(search))
+    if LOGICAL_OPERATOR_AND in search:
+        # other keys next to $and are ignored
+        and_values = search[LOGICAL_OPERATOR_AND]
+        if not isinstance(and_values, list):
+            raise InvalidSearchException("$and must be a list")
+        _check_breadth(limits, len(and_values))
+        return And(tuple(
+            _build_search(and_value, limits, depth + 1)
+            for and_value in and_values
+        ))
+    children = []
+    for field, value in search.items():
+        if field == LOGICAL_OPERATOR_OR and isinstance(value, list):
+            _check_breadth(limits, len(value))
+            children.append(Or(tuple(
+                _build_search(or_value, limits, depth + 1)
+                for or_value in value
+            )))
+        elif isinstance(value, dict):
+            children.append(_build_field(
+                field,
+                value,
+                LOGICAL_OPERATOR_AND,
+                limits,
+                depth + 1
+            ))
+        else:
+            children.append(_build_leaf(field, "$eq", value, limits))
+    if len(children) == 1:
+        return children[0]
+    return And(tuple(children))
+
+
+def _build_field(
+    field: str,
+    obj: Any,
+    logical_operator: str,
+    limits: Optional[SearchLimits],
+    depth: int
+) -> SearchNode:
+    node_cls = Or if logical_operator == LOGICAL_OPERATOR_OR else And
+    if not isinstance(obj, dict):
+        # nothing can match an empty condition
+        return Or((), field)
+    _check_depth(limits, depth)
+    _check_breadth(limits, len(obj))
+    keys = list(obj.keys())
+    if len(keys) == 1:
+        if keys[0] == LOGICAL_OPERATOR_OR:
+            return _build_field(
+                field,
+                obj[LOGICAL_OPERATOR_OR],
+                LOGICAL_OPERATOR_OR,
+                limits,
+                depth + 1
+            )
+        return node_cls(
+            (_build_leaf(field, keys[0], obj[keys[0]], limits),),
+            field
+        )
+    children = []
+    for operator, value in obj.items():
+        if node_cls is And and operator == LOGICAL_OPERATOR_OR \
+                and isinstance(value, dict):
+            children.append(_build_field(
+                field,
+                value,
+                LOGICAL_OPERATOR_OR,
+                limits,
+                depth + 1
+            ))
+        else:
+            children.append(_build_leaf(field, operator, value, limits))
+    return node_cls(tuple(children), field)
+
+
+def _build_leaf(
+    field: str,
+    operator: str,
+    value: Any,
+    limits: Optional[SearchLimits]
+) -> Leaf:
+    if isinstance(value, dict) or (
+        isinstance(value, list)
+        and any(isinstance(item, (dict, list)) for item in value)
+    ):
+        raise InvalidSearchException(f"invalid value for {field}")
+    if operator in IN_OPERATORS and limits \
+            and limits.max_in_size is not None:
+        size = value.count(",") + 1 if isinstance(value, str) else (
+            len(value) if isinstance(value, list) else 1)
+        if size > limits.max_in_size:
+            raise InvalidSearchException(
+                f"{operator} of {field} has more than {limits.max_in_size} values")
+    return Leaf(field, operator, value)
+
+
+def search_tree_to_dict(node: Optional[SearchNode]) -> Optional[Dict]:
+    """Render a search tree back to the search dict it was built from"""
+    if node is None:
+        return None
+    if isinstance(node, Leaf):
+        return {node.field: {node.operator: node.value}}
+    if node.field is not None:
+        if isinstance(node, Or):
+            return {node.field: {LOGICAL_OPERATOR_OR: _field_operators(node)}}
+        return {node.field: _field_operators(node)}
+    operator = LOGICAL_OPERATOR_OR if isinstance(node, Or) \
+        else LOGICAL_OPERATOR_AND
+    return {operator: [search_tree_to_dict(child) for child in node.children]}
+
+
+def _field_operators(node: Union[And, Or]) -> Any:
+    if not node.children:
+        return []
+    obj = {}
+    for child in node.children:
+        if isinstance(child, Leaf):
+            obj[child.operator] = child.value
+        else:
+            obj[LOGICAL_OPERATOR_OR] = _field_operators(child)
+    return obj
+
+
+def iter_search_leaves(node: Optional[SearchNode]):
+    if node is None:
+        return
+    if isinstance(node, Leaf):
+        yield node
+        return
+    for child in node.children:
+        yield from iter_search_leaves(child)
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_search_spec(
+    raw_search_spec: str,
+    limits: Optional[SearchLimits] = None
+) -> Optional[SearchNode]:
+    """Parse the raw `s` query param, parsed trees are cached by raw string
+
+    Raises `json.JSONDecodeError` when it is not valid json
+    """
+    if limits and limits.max_length is not None \
+            and len(raw_search_spec) > limits.max_length:
+        raise InvalidSearchException(
+            f"search is longer than {limits.max_length} characters")
+    search = json.loads(raw_search_spec)
+    if not isinstance(search, dict):
+        raise InvalidSearchException("search must be an object")
+    return build_search_tree(search, limits)
@@ -1,9 +1,29 @@
 import abc
-from typing import Dict, List, Union, TypeVar, Generic, Optional
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Union,
+    TypeVar,
+    Generic,
+    Optional
+)
 from fastapi import Request, BackgroundTasks
 from fastapi_pagination.bases import AbstractPage
-from ..types import QuerySortDict, ID_TYPE, CreateSchemaType, UpdateSchemaType
+from ..types import (
+    QuerySortDict,
+    ID_TYPE,
+    CreateSchemaType,
+    UpdateSchemaType,
+    CountMode,
+    ReadMode,
+    QueryGroupByDict,
+    QueryMetricDict,
+    FacetValueDict
+)
 from ..models import JoinOptions
+from ..search import SearchNode
 
 ModelType = TypeVar("ModelType")
 
@@ -14,23 +34,73 @@ class AbstractCrudService(Generic[ModelType], abc.ABC):
     async def crud_get_many(
         self,
         request: Optional[Request] = None,
-        search: Optional[Dict] = None,
+        search: Optional[Union[Dict, SearchNode]] = None,
         include_deleted: Optional[bool] = False,
         soft_delete: Optional[bool] = False,
         sorts: List[QuerySortDict] = None,
         joins: Optional[JoinOptions] = None,
+        count_mode: Optional[CountMode] = "exact",
+        fields: Optional[List[str]] = None,
+        read_mode: Optional[ReadMode] = "orm",
     ) -> Union[AbstractPage[ModelType], List[ModelType]]:
         raise NotImplementedError
 
+    def crud_export(
+        self,
+        request: Optional[Request] = None,
+        search: Optional[Union[Dict, SearchNode]] = None,
+        include_deleted: Optional[bool] = False,
+        soft_delete: Optional[bool] = False,
+        sorts: List[QuerySortDict] = None,
+        joins: Optional[JoinOptions] = None,
+        fields: Optional[List[str]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def crud_aggregate(
+        self,
+        request: Optional[Request] = None,
+        search: Optional[Union[Dict, SearchNode]] = None,
+        include_deleted: Optional[bool] = False,
+        soft_delete: Optional[bool] = False,
+        joins: Optional[JoinOptions] = None,
+        group_by: Optional[List[QueryGroupByDict]] = None,
+        metrics: Optional[List[QueryMetricDict]] = None,
+    ) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def crud_facets(
+        self,
+        request: Optional[Request] = None,
+        fields: Optional[List[str]] = None,
+        search: Optional[Union[Dict, SearchNode]] = None,
+        facet_search: Optional[Dict[str, Union[Dict, SearchNode]]] = None,
+        include_deleted: Optional[bool] = False,
+        soft_delete: Optional[bool] = False,
+        joins: Optional[JoinOptions] = None,
+    ) -> Dict[str, List[FacetValueDict]]:
+        raise NotImplementedError
+
     @abc.abstractmethod
     async def crud_get_one(
         self,
         request: Request,
         id: ID_TYPE,
         joins: Optional[JoinOptions] = None,
+        fields: Optional[List[str]] = None,
     ) -> ModelType:
         raise NotImplementedError
 
+    async def crud_get_version(
+        self,
+        request: Request,
+        id: ID_TYPE,
+        joins: Optional[JoinOptions] = None,
+    ) -> Optional[Any]:
+        """Version of the entity that get_one would return, None when it
+        can not be told without loading the entity"""
+        return None
+
     @abc.abstractmethod
     async def crud_create_one(
         self,
@@ -75,7 +145,8 @@ class AbstractCrudService(Generic[ModelType], abc.ABC):
         request: Request,
         ids: List[ID_TYPE],
         soft_delete: Optional[bool] = False,
-        background_tasks: Optional[BackgroundTasks] = None
+        background_tasks: Optional[BackgroundTasks] = None,
+        returning: Optional[bool] = False
     ) -> List[ModelType]:
         raise NotImplementedError
 
@@ -1,4 +1,17 @@
 from .service import SqlalchemyCrudService
+from .query_cache import QueryCache, QueryCacheInfo
+from .operators import register_operator, get_operator
+from .helper import db_session_scope, share_db_session
+from .result_cache import AbstractResultCache, ResultCache, ResultCacheInfo
 __all__ = [
-    "SqlalchemyCrudService"
+    "SqlalchemyCrudService",
+    "QueryCache",
+    "QueryCacheInfo",
+    "register_operator",
+    "get_operator",
+    "db_session_scope",
+    "share_db_session",
+    "AbstractResultCache",
+    "ResultCache",
+    "ResultCacheInfo"
 ]
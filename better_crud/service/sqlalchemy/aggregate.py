@@ -0,0 +1,67 @@
+from typing import Any, Optional
+from sqlalchemy import func
+from ...exceptions import InvalidAggregateException
+from ...types import (
+    AggregateFunction,
+    DateBucket,
+    QueryGroupByDict,
+    QueryMetricDict
+)
+
+AGGREGATE_FUNCTIONS = {
+    "count": func.count,
+    "sum": func.sum,
+    "avg": func.avg,
+    "min": func.min,
+    "max": func.max
+}
+# buckets are text on every database, weeks are numbered by the
+# database though: ISO weeks on postgresql and mysql, weeks starting on
+# the first monday of the year on sqlite
+STRFTIME_BUCKET_FORMATS = {
+    "year": "%Y",
+    "month": "%Y-%m",
+    "week": "%Y-%W",
+    "day": "%Y-%m-%d",
+    "hour": "%Y-%m-%d %H:00"
+}
+MYSQL_BUCKET_FORMATS = {
+    **STRFTIME_BUCKET_FORMATS,
+    "week": "%x-%v"
+}
+POSTGRESQL_BUCKET_FORMATS = {
+    "year": "YYYY",
+    "month": "YYYY-MM",
+    "week": "IYYY-IW",
+    "day": "YYYY-MM-DD",
+    "hour": "YYYY-MM-DD HH24:00"
+}
+
+
+def create_date_bucket(column: Any, bucket: DateBucket, dialect_name: str) -> Any:
+    if dialect_name == "postgresql":
+        return func.to_char(column, POSTGRESQL_BUCKET_FORMATS[bucket])
+    if dialect_name in ("mysql", "mariadb"):
+        return func.date_format(column, MYSQL_BUCKET_FORMATS[bucket])
+    if dialect_name == "sqlite":
+        return func.strftime(STRFTIME_BUCKET_FORMATS[bucket], column)
+    raise InvalidAggregateException(
+        f"date bucket not supported by {dialect_name}")
+
+
+def create_metric(function: AggregateFunction, column: Optional[Any] = None) -> Any:
+    if column is None:
+        return func.count()
+    return AGGREGATE_FUNCTIONS[function](column)
+
+
+def get_group_by_label(group_by: QueryGroupByDict) -> str:
+    if group_by["bucket"]:
+        return f"{group_by['field']}_{group_by['bucket']}"
+    return group_by["field"]
+
+
+def get_metric_label(metric: QueryMetricDict) -> str:
+    if metric["field"]:
+        return f"{metric['function']}_{metric['field']}"
+    return metric["function"]
@@ -1,32 +1,143 @@
 from typing import Dict, List, Union, Optional, Any
+import functools
 import inspect
-from contextlib import asynccontextmanager
+import itertools
+import weakref
+from collections import Counter
+from contextlib import asynccontextmanager, AsyncExitStack
+from contextvars import ContextVar
+from sqlalchemy import select, event
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
 from ...helper import find, update_entity_attr
 from ...config import BetterCrudGlobalConfig
+from ...types import DBSessionFactory
+from ...exceptions import RelationNotFoundException
 
 
 class Provide:
     pass
 
 
+class ExplainJson(Executable, ClauseElement):
+    """`EXPLAIN (FORMAT JSON)` of a statement, whose values stay bound
+    parameters"""
+    inherit_cache = False
+
+    def __init__(self, statement: Any):
+        self.statement = statement
+
+
+@compiles(ExplainJson, "postgresql")
+def _compile_explain_json(element: ExplainJson, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+@functools.lru_cache(maxsize=None)
+def get_field_index(entity, depth: int) -> Dict[str, Any]:
+    """Map the dotted path of every field of `entity` to its attribute
+
+    Columns and relationships of related models are indexed up to `depth`
+    relationships deep
+    """
+    index = {}
+
+    def walk(relation_cls, prefix: str, level: int):
+        mapper = relation_cls.__mapper__
+        for key in mapper.all_orm_descriptors.keys():
+            if key.startswith("__"):
+                continue
+            index[prefix + key] = getattr(relation_cls, key)
+        if level >= depth:
+            return
+        for key, relationship in mapper.relationships.items():
+            walk(relationship.mapper.entity, f"{prefix}{key}.", level + 1)
+
+    walk(entity, "", 0)
+    return index
+
+
+@functools.lru_cache(maxsize=None)
+def get_version_field(entity) -> Optional[str]:
+    """Name of the `version_id_col` of `entity`, the column sqlalchemy
+    bumps on every update"""
+    mapper = entity.__mapper__
+    if mapper.version_id_col is not None:
+        return mapper.get_property_by_column(mapper.version_id_col).key
+    return None
+
+
+def get_many_to_many_primary_values(
+    relation_cls,
+    data: Union[List[Union[Dict, int, str]], int, str]
+) -> List[Any]:
+    primary_key = relation_cls.__mapper__.primary_key[0].name
+    if isinstance(data, list):
+        if len(data) > 0 and isinstance(data[0], dict):
+            return [elem[primary_key] for elem in data]
+        return data
+    return [data]
+
+
+def coerce_primary_value(relation_cls, value: Any) -> Any:
+    primary_column = relation_cls.__mapper__.primary_key[0]
+    try:
+        python_type = primary_column.type.python_type
+        if not isinstance(value, python_type):
+            return python_type(value)
+    except Exception:
+        pass
+    return value
+
+
+async def get_instances(
+    session: AsyncSession,
+    relation_cls,
+    primary_values: List[Any]
+) -> List[Any]:
+    """Get instances by primary key, with one query for those not in the session"""
+    mapper = relation_cls.__mapper__
+    primary_values = [
+        coerce_primary_value(relation_cls, value) for value in primary_values
+    ]
+    instances = {}
+    for primary_value in primary_values:
+        instance = session.identity_map.get(
+            mapper.identity_key_from_primary_key([primary_value]))
+        if instance is not None:
+            instances[primary_value] = instance
+    missing_values = list(dict.fromkeys(
+        value for value in primary_values if value not in instances))
+    if missing_values:
+        primary_field = getattr(relation_cls, mapper.primary_key[0].name)
+        result = await session.execute(
+            select(relation_cls).where(primary_field.in_(missing_values)))
+        for instance in result.scalars().all():
+            instances[mapper.primary_key_from_instance(instance)[0]] = instance
+    not_found_values = [
+        value for value in primary_values if value not in instances]
+    if not_found_values:
+        raise RelationNotFoundException(
+            relation_cls.__name__, list(dict.fromkeys(not_found_values)))
+    return [instances[value] for value in primary_values]
+
+
 async def create_many_to_many_instances(
     session: AsyncSession,
     relation_cls,
     data: Union[List[Union[Dict, int, str]], int, str]
 ) -> Any:
-    primary_key = relation_cls.__mapper__.primary_key[0].name
+    instances = await get_instances(
+        session,
+        relation_cls,
+        get_many_to_many_primary_values(relation_cls, data)
+    )
     if isinstance(data, list):
-        if len(data) > 0 and isinstance(data[0], dict):
-            data = [elem[primary_key] for elem in data]
-        instances = [
-            await session.get(relation_cls, primary_value)
-            for primary_value in data
-        ]
         return instances
     # Many to many may not be an array, but an object,pass in the primary key value
-    instance = await session.get(relation_cls, data)
-    return instance
+    return instances[0]
 
 
 async def create_one_to_many_instances(
@@ -72,23 +183,226 @@ async def create_one_to_one_instance(
     return old_instance
 
 
-def inject_db_session(f):
-    sig = inspect.signature(f)
+class _DBSessionScope:
+
+    def __init__(self):
+        # sessions of the scope, keyed by whether they read from a replica
+        self.db_sessions: Dict[bool, AsyncSession] = {}
+        self.exit_stack = AsyncExitStack()
+        # set by the first write made in the scope
+        self.read_your_writes = False
+
+    async def get_db_session(self, read: bool = False) -> AsyncSession:
+        db_session = self.db_sessions.get(read)
+        if db_session is None:
+            db_session = await self.exit_stack.enter_async_context(
+                _open_db_session(_get_db_session_factory(read)))
+            self.db_sessions[read] = db_session
+        return db_session
+
+
+_db_session_scope: ContextVar[Optional[_DBSessionScope]] = ContextVar(
+    "better_crud_db_session_scope",
+    default=None
+)
+# set by the first write of a request made outside of a shared scope, the
+# reads that follow it stay on the primary so that they see the written rows
+_read_your_writes: ContextVar[bool] = ContextVar(
+    "better_crud_read_your_writes",
+    default=False
+)
+_replica_counter = itertools.count()
+# extra sessions opened by `concurrent_db_session`, bounded so that
+# concurrent queries do not exhaust the pool
+_concurrent_db_sessions = 0
+_open_db_sessions: Counter = Counter()
+# the factory of each opened session, another session of the same
+# database is taken from it
+_db_session_factories: "weakref.WeakKeyDictionary[AsyncSession, DBSessionFactory]" = \
+    weakref.WeakKeyDictionary()
+_FLUSHED_KEY = "better_crud_flushed"
+
+
+def _mark_written():
+    # a shared scope keeps the flag to itself, later reads of the same
+    # context go back to the replica once it exits
+    scope = _db_session_scope.get()
+    if scope is not None:
+        scope.read_your_writes = True
+    else:
+        _read_your_writes.set(True)
+
+
+def _has_written() -> bool:
+    scope = _db_session_scope.get()
+    return _read_your_writes.get() or \
+        (scope is not None and scope.read_your_writes)
+
+
+def _use_read_db_session(read: bool) -> bool:
+    sqlalchemy_config = BetterCrudGlobalConfig.backend_config.sqlalchemy
+    return read and bool(sqlalchemy_config.read_db_session) \
+        and not _has_written()
+
+
+def _get_db_session_factory(read: bool = False) -> DBSessionFactory:
+    sqlalchemy_config = BetterCrudGlobalConfig.backend_config.sqlalchemy
+    read_db_session = sqlalchemy_config.read_db_session
+    if not read or not read_db_session:
+        return sqlalchemy_config.db_session
+    if not isinstance(read_db_session, list):
+        return read_db_session
+    if sqlalchemy_config.read_strategy == "least_busy":
+        return min(
+            read_db_session,
+            key=lambda factory: _open_db_sessions[factory]
+        )
+    return read_db_session[next(_replica_counter) % len(read_db_session)]
+
+
+@asynccontextmanager
+async def _open_db_session(factory: DBSessionFactory):
+    _open_db_sessions[factory] += 1
+    try:
+        if inspect.isasyncgenfunction(factory):
+            DBSession = asynccontextmanager(factory)
+            async with DBSession() as db_session:
+                _db_session_factories[db_session] = factory
+                yield db_session
+        else:
+            # the session of a plain factory is owned by the caller, such
+            # as a middleware, it is left open
+            db_session = factory()
+            _db_session_factories[db_session] = factory
+            yield db_session
+    finally:
+        _open_db_sessions[factory] -= 1
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flushed(session: Session, flush_context: Any):
+    session.info[_FLUSHED_KEY] = True
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _clear_flushed(session: Session, transaction: SessionTransaction):
+    if transaction.parent is None:
+        session.info.pop(_FLUSHED_KEY, None)
+
+
+def _has_writes(db_session: AsyncSession) -> bool:
+    """Whether `db_session` holds changes that other sessions do not see,
+    pending or flushed in its current transaction"""
+    return bool(db_session.new or db_session.dirty or db_session.deleted) \
+        or db_session.info.get(_FLUSHED_KEY, False)
+
+
+@asynccontextmanager
+async def db_session_scope():
+    """Share one session between the service calls made inside the scope
+
+    The session is opened by the first call that needs it and closed with
+    the outermost scope, nested scopes reuse the current one
+    """
+    if _db_session_scope.get() is not None:
+        yield
+        return
+    scope = _DBSessionScope()
+    token = _db_session_scope.set(scope)
+    try:
+        async with scope.exit_stack:
+            yield
+    finally:
+        _db_session_scope.reset(token)
+
+
+@asynccontextmanager
+async def concurrent_db_session(db_session: AsyncSession, read: bool = False):
+    """Another session of the same database as `db_session`, to run a
+    query concurrently with it
+
+    The session is opened from the factory of `db_session`, so that both
+    read the same replica. Yields None when `concurrent_queries` is
+    disabled, after a write of the request, when `db_session` holds
+    changes not yet committed, when the limit of concurrent sessions is
+    reached or when the factory returns `db_session` itself, the query
+    then runs on `db_session`
+    """
+    global _concurrent_db_sessions
+    sqlalchemy_config = BetterCrudGlobalConfig.backend_config.sqlalchemy
+    # another session would not see the writes not yet committed
+    if not sqlalchemy_config.concurrent_queries or _has_written() or \
+            _has_writes(db_session) or \
+            _concurrent_db_sessions >= sqlalchemy_config.concurrent_queries_limit:
+        yield None
+        return
+    _concurrent_db_sessions += 1
+    try:
+        factory = _db_session_factories.get(db_session) or \
+            _get_db_session_factory(_use_read_db_session(read))
+        async with _open_db_session(factory) as other_db_session:
+            yield other_db_session \
+                if other_db_session is not db_session else None
+    finally:
+        _concurrent_db_sessions -= 1
+
+
+async def share_db_session():
+    """Dependency sharing one session across the service calls of a request"""
+    async with db_session_scope():
+        yield
+
+
+@asynccontextmanager
+async def _provide_db_session(
+    param_name: Optional[str],
+    kwargs: Dict[str, Any],
+    read: bool = False
+):
+    if param_name is None or kwargs.get(param_name) is not None:
+        yield
+        return
+    if not read:
+        _mark_written()
+    async with db_session_scope():
+        kwargs[param_name] = await _db_session_scope.get().get_db_session(
+            _use_read_db_session(read))
+        yield
+
+
+def _get_provide_param_name(sig: inspect.Signature) -> Optional[str]:
+    for param in sig.parameters.values():
+        if isinstance(param.default, Provide):
+            return param.name
+    return None
+
+
+def inject_db_session(f=None, *, read: bool = False):
+    """Provide the `db_session` of the decorated service method
+
+    Methods decorated with `read=True` use the `read_db_session` when one
+    is configured, unless the request already wrote to the primary
+    """
+    if f is None:
+        return functools.partial(inject_db_session, read=read)
+    param_name = _get_provide_param_name(inspect.signature(f))
+
+    if inspect.isasyncgenfunction(f):
+        # the session stays open until the generator is exhausted, the
+        # generator may be consumed in another task so it has its own session
+        async def generator_wrapper(*args, **kwargs):
+            if param_name is None or kwargs.get(param_name) is not None:
+                async for item in f(*args, **kwargs):
+                    yield item
+                return
+            factory = _get_db_session_factory(_use_read_db_session(read))
+            async with _open_db_session(factory) as db_session:
+                kwargs[param_name] = db_session
+                async for item in f(*args, **kwargs):
+                    yield item
+        return generator_wrapper
 
     async def wrapper(*args, **kwargs):
-        for param in sig.parameters.values():
-            if isinstance(param.default, Provide):
-                if kwargs.get(param.name) is None:
-                    sqlalchemy_config = BetterCrudGlobalConfig.backend_config.sqlalchemy
-                    if inspect.isasyncgenfunction(sqlalchemy_config.db_session):
-                        DBSession = asynccontextmanager(
-                            sqlalchemy_config.db_session)
-                        async with DBSession() as db_session:
-                            kwargs[param.name] = db_session
-                            return await f(*args, **kwargs)
-                    else:
-                        kwargs[param.name] = sqlalchemy_config.db_session()
-                        return await f(*args, **kwargs)
-                else:
-                    return await f(*args, **kwargs)
+        async with _provide_db_session(param_name, kwargs, read):
+            return await f(*args, **kwargs)
     return wrapper
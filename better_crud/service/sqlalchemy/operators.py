@@ -0,0 +1,250 @@
+from typing import Any, Callable, Dict, Optional
+import functools
+from sqlalchemy import func, bindparam
+from sqlalchemy.orm import RelationshipProperty
+from sqlalchemy.sql.elements import BindParameter
+from ...exceptions import NotSupportRelationshipQueryException
+
+OperatorFn = Callable[[Any, Any], Any]
+
+operator_map: Dict[str, OperatorFn] = {}
+
+LIKE_PATTERNS = {
+    "$cont": "%{}%",
+    "$excl": "%{}%",
+    "$notstarts": "{}%",
+    "$notends": "%{}",
+    "$contL": "%{}%",
+    "$exclL": "%{}%",
+}
+
+
+def register_operator(name: str):
+    """Register the callable building the condition of a search operator
+
+    The callable receives the model field and the value of the search,
+    and returns a sqlalchemy expression. Searches using an operator
+    registered this way are built with the value of each request and
+    are not kept in the query cache.
+    """
+    def decorator(fn: OperatorFn):
+        operator_map[name] = fn
+        return fn
+    return decorator
+
+
+def get_operator(name: str) -> Optional[OperatorFn]:
+    return operator_map.get(name)
+
+
+def is_builtin_operator(name: str) -> bool:
+    """Whether `name` is still the builtin operator, which works with
+    bound parameters in place of the values"""
+    builtin_fn = _builtin_operator_map.get(name)
+    return builtin_fn is not None and operator_map.get(name) is builtin_fn
+
+
+def _like_pattern(value: Any, operator: str) -> Any:
+    if isinstance(value, BindParameter):
+        # the pattern was applied when the value was bound
+        return value
+    return LIKE_PATTERNS[operator].format(value)
+
+
+def _split_value(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.split(",")
+    return value
+
+
+def _typed_bind(compared: Any, value: Any) -> Any:
+    """Type a bound search value like an inline literal compared to `compared`.
+
+    The parameters created by `_parametrize_search` carry the value of the
+    request that built the statement, its type is part of the cache key.
+    """
+    if isinstance(value, list):
+        return [_typed_bind(compared, item) for item in value]
+    if not isinstance(value, BindParameter) or not value.type._isnull:
+        return value
+    compared_type = getattr(compared, "type", None)
+    if compared_type is None:
+        return value
+    sample = value.value
+    if value.expanding:
+        sample = sample[0] if sample else None
+    return bindparam(
+        value.key,
+        type_=compared_type.coerce_compared_value(None, sample),
+        required=True,
+        expanding=value.expanding
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _get_relationship_primary_key(prop: Any) -> Optional[str]:
+    if not isinstance(prop, RelationshipProperty):
+        return None
+    return prop.mapper.primary_key[0].key
+
+
+def _relationship_any(field: Any, value: Any, operator: str) -> Any:
+    primary_key = _get_relationship_primary_key(
+        getattr(field, "property", None))
+    if not primary_key:
+        raise NotSupportRelationshipQueryException(operator)
+    value = _typed_bind(
+        getattr(field.property.mapper.entity, primary_key),
+        value
+    )
+    return field.any(**{primary_key: value})
+
+
+@register_operator("$eq")
+def _eq(field, value):
+    return field == value
+
+
+@register_operator("$ne")
+def _ne(field, value):
+    return field != value
+
+
+@register_operator("$gt")
+def _gt(field, value):
+    return field > value
+
+
+@register_operator("$gte")
+def _gte(field, value):
+    return field >= value
+
+
+@register_operator("$lt")
+def _lt(field, value):
+    return field < value
+
+
+@register_operator("$lte")
+def _lte(field, value):
+    return field <= value
+
+
+@register_operator("$cont")
+def _cont(field, value):
+    return field.like(_like_pattern(value, "$cont"))
+
+
+@register_operator("$excl")
+def _excl(field, value):
+    return field.notlike(_like_pattern(value, "$excl"))
+
+
+@register_operator("$starts")
+def _starts(field, value):
+    return field.startswith(value)
+
+
+@register_operator("$ends")
+def _ends(field, value):
+    return field.endswith(value)
+
+
+@register_operator("$notstarts")
+def _notstarts(field, value):
+    return field.notlike(_like_pattern(value, "$notstarts"))
+
+
+@register_operator("$notends")
+def _notends(field, value):
+    return field.notlike(_like_pattern(value, "$notends"))
+
+
+@register_operator("$isnull")
+def _isnull(field, value):
+    return field.is_(None)
+
+
+@register_operator("$notnull")
+def _notnull(field, value):
+    return field.isnot(None)
+
+
+@register_operator("$in")
+def _in(field, value):
+    return field.in_(_split_value(value))
+
+
+@register_operator("$notin")
+def _notin(field, value):
+    return field.notin_(_split_value(value))
+
+
+@register_operator("$between")
+def _between(field, value):
+    return field.between(*_split_value(value))
+
+
+@register_operator("$notbetween")
+def _notbetween(field, value):
+    return ~field.between(*_split_value(value))
+
+
+@register_operator("$length")
+def _length(field, value):
+    if not isinstance(value, BindParameter):
+        value = int(value)
+    return func.length(field) == value
+
+
+@register_operator("$any")
+def _any(field, value):
+    return _relationship_any(field, value, "$any")
+
+
+@register_operator("$notany")
+def _notany(field, value):
+    return func.not_(_relationship_any(field, value, "$notany"))
+
+
+@register_operator("$startsL")
+def _starts_l(field, value):
+    return field.istartswith(value)
+
+
+@register_operator("$endsL")
+def _ends_l(field, value):
+    return field.iendswith(value)
+
+
+@register_operator("$contL")
+def _cont_l(field, value):
+    return field.ilike(_like_pattern(value, "$contL"))
+
+
+@register_operator("$exclL")
+def _excl_l(field, value):
+    return field.notilike(_like_pattern(value, "$exclL"))
+
+
+@register_operator("$eqL")
+def _eq_l(field, value):
+    return func.lower(field) == value
+
+
+@register_operator("$neL")
+def _ne_l(field, value):
+    return func.lower(field) != value
+
+
+@register_operator("$inL")
+def _in_l(field, value):
+    return func.lower(field).in_(_split_value(value))
+
+
+@register_operator("$notinL")
+def _notin_l(field, value):
+    return func.lower(field).notin_(_split_value(value))
+
+
+_builtin_operator_map: Dict[str, OperatorFn] = dict(operator_map)
@@ -0,0 +1,49 @@
+from typing import Any, Hashable, NamedTuple, Optional
+from collections import OrderedDict
+
+
+class QueryCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class QueryCache:
+    """Bounded LRU of parametrized statements built by `_build_cached_query`"""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._statements: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        statement = self._statements.get(key)
+        if statement is None:
+            self.misses += 1
+            return None
+        self._statements.move_to_end(key)
+        self.hits += 1
+        return statement
+
+    def set(self, key: Hashable, statement: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        self._statements[key] = statement
+        self._statements.move_to_end(key)
+        while len(self._statements) > self.maxsize:
+            self._statements.popitem(last=False)
+
+    def clear(self) -> None:
+        self._statements.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> QueryCacheInfo:
+        return QueryCacheInfo(
+            self.hits,
+            self.misses,
+            self.maxsize,
+            len(self._statements)
+        )
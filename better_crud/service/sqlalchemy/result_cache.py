@@ -0,0 +1,249 @@
+from typing import Any, Dict, NamedTuple, Optional, Sequence, Tuple
+import abc
+import functools
+import hashlib
+import inspect
+import time
+from collections import OrderedDict
+from pydantic import BaseModel
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import InstanceState
+from sqlalchemy.orm.attributes import set_committed_value
+from ...helper import get_pagination_params
+from ...search import build_search_tree
+
+# arguments of the service methods that are not part of the result key
+UNKEYED_ARGUMENTS = ("self", "request", "db_session", "background_tasks")
+
+
+class ResultCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class AbstractResultCache(abc.ABC):
+    """Store of the results of `crud_get_one`/`crud_get_many`
+
+    Results are stored under keys that include the generation of the
+    entities they were read from, a write bumps the generation of its
+    entity so that the results read before it are no longer found.
+    Implement it to keep the results in an external store.
+    """
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the stored result, or None when there is none"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def set(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_generations(self, names: Sequence[str]) -> Tuple[int, ...]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def bump_generation(self, name: str) -> None:
+        raise NotImplementedError
+
+
+class ResultCache(AbstractResultCache):
+    """In-process LRU of results, each result expires after `ttl` seconds"""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._results: OrderedDict = OrderedDict()
+        self._generations: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        item = self._results.get(key)
+        if item is not None and item[0] is not None \
+                and item[0] <= time.monotonic():
+            del self._results[key]
+            item = None
+        if item is None:
+            self.misses += 1
+            return None
+        self._results.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    async def set(self, key: str, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl \
+            if self.ttl is not None else None
+        self._results[key] = (expires_at, value)
+        self._results.move_to_end(key)
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+    async def get_generations(self, names: Sequence[str]) -> Tuple[int, ...]:
+        return tuple(self._generations.get(name, 0) for name in names)
+
+    async def bump_generation(self, name: str) -> None:
+        self._generations[name] = self._generations.get(name, 0) + 1
+
+    def clear(self) -> None:
+        self._results.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> ResultCacheInfo:
+        return ResultCacheInfo(
+            self.hits,
+            self.misses,
+            self.maxsize,
+            len(self._results)
+        )
+
+
+def get_entity_cache_name(entity: Any) -> str:
+    return entity.__tablename__
+
+
+@functools.lru_cache(maxsize=None)
+def get_related_cache_names(entity: Any, depth: int) -> Tuple[str, ...]:
+    """Cache names of `entity` and of the models it can load, up to
+    `depth` relationships deep"""
+    names = [get_entity_cache_name(entity)]
+
+    def walk(relation_cls, level: int):
+        if level >= depth:
+            return
+        for relationship in relation_cls.__mapper__.relationships:
+            related_cls = relationship.mapper.entity
+            name = get_entity_cache_name(related_cls)
+            if name not in names:
+                names.append(name)
+                walk(related_cls, level + 1)
+
+    walk(entity, 0)
+    return tuple(names)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return _normalize(value.model_dump())
+    if isinstance(value, dict):
+        return tuple(sorted(
+            (str(key), _normalize(item)) for key, item in value.items()
+        ))
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(item) for item in value)
+    return value
+
+
+def _copy_result(value: Any, memo: Optional[Dict[int, Any]] = None) -> Any:
+    """Copy of a result made of detached entities, holding the loaded
+    attributes only, so that it does not depend on the session that
+    loaded it nor share state with other requests"""
+    memo = {} if memo is None else memo
+    if id(value) in memo:
+        return memo[id(value)]
+    if isinstance(value, (list, tuple)):
+        return type(value)(_copy_result(item, memo) for item in value)
+    if isinstance(value, dict):
+        return {key: _copy_result(item, memo) for key, item in value.items()}
+    if isinstance(value, BaseModel):
+        return value.model_copy(update={
+            name: _copy_result(getattr(value, name), memo)
+            for name in value.model_fields
+        })
+    state = sa_inspect(value, raiseerr=False)
+    if not isinstance(state, InstanceState):
+        return value
+    entity = state.mapper.class_manager.new_instance()
+    memo[id(value)] = entity
+    for attr in state.mapper.attrs:
+        if attr.key in state.dict:
+            set_committed_value(
+                entity,
+                attr.key,
+                _copy_result(state.dict[attr.key], memo)
+            )
+    return entity
+
+
+def _has_request_filter(joins: Any) -> bool:
+    # the result of a join filtered by the request can not be shared
+    return bool(joins) and any(
+        getattr(config, "additional_filter_fn", None) is not None
+        for config in joins.values()
+    )
+
+
+def _create_result_key(
+    method_name: str,
+    sig: inspect.Signature,
+    args: Tuple,
+    kwargs: Dict[str, Any],
+    generations: Tuple[int, ...]
+) -> Optional[str]:
+    bound = sig.bind(*args, **kwargs)
+    bound.apply_defaults()
+    arguments = bound.arguments
+    if _has_request_filter(arguments.get("joins")):
+        return None
+    key_parts = [method_name, generations]
+    for name, value in arguments.items():
+        if name in UNKEYED_ARGUMENTS:
+            continue
+        if name == "search":
+            value = build_search_tree(value)
+        key_parts.append((name, _normalize(value)))
+    request = arguments.get("request")
+    state = getattr(request, "state", None)
+    key_parts.append(_normalize(getattr(state, "auth_filter", None)))
+    key_parts.append(_normalize(get_pagination_params()))
+    digest = hashlib.sha1(repr(key_parts).encode()).hexdigest()
+    entity = arguments["self"].entity
+    return f"{get_entity_cache_name(entity)}:{digest}"
+
+
+def cache_result(f):
+    """Serve the result of the decorated read method from `result_cache`"""
+    sig = inspect.signature(f)
+
+    @functools.wraps(f)
+    async def wrapper(self, *args, **kwargs):
+        result_cache: Optional[AbstractResultCache] = self.result_cache
+        if result_cache is None:
+            return await f(self, *args, **kwargs)
+        generations = await result_cache.get_generations(
+            get_related_cache_names(self.entity, self.field_index_depth))
+        key = _create_result_key(
+            f.__name__,
+            sig,
+            (self, *args),
+            kwargs,
+            generations
+        )
+        if key is None:
+            return await f(self, *args, **kwargs)
+        result = await result_cache.get(key)
+        if result is not None:
+            return _copy_result(result)
+        result = await f(self, *args, **kwargs)
+        await result_cache.set(key, _copy_result(result))
+        return result
+    return wrapper
+
+
+def invalidate_result_cache(f):
+    """Drop the cached results of the entity once the decorated write
+    method succeeded"""
+    @functools.wraps(f)
+    async def wrapper(self, *args, **kwargs):
+        result = await f(self, *args, **kwargs)
+        if self.result_cache is not None:
+            await self.result_cache.bump_generation(
+                get_entity_cache_name(self.entity))
+        return result
+    return wrapper
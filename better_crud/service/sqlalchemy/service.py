@@ -6,26 +6,108 @@ from typing import (
     TypeVar,
     Generic,
     Optional,
-    Sequence
+    Sequence,
+    Tuple,
+    ClassVar,
+    AsyncIterator
 )
 from datetime import datetime
+import asyncio
 import functools
+import json
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import MANYTOMANY, MANYTOONE, ONETOMANY, noload, joinedload
+from sqlalchemy.orm import (
+    ColumnProperty,
+    MANYTOMANY,
+    MANYTOONE,
+    ONETOMANY,
+    noload,
+    joinedload,
+    selectinload,
+    subqueryload,
+    raiseload
+)
 from sqlalchemy.sql.selectable import Select
-from sqlalchemy import or_, update, delete, and_, func, select
+from sqlalchemy import (
+    or_,
+    update,
+    delete,
+    and_,
+    select,
+    literal,
+    false,
+    func,
+    distinct,
+    cast,
+    null,
+    union_all,
+    bindparam
+)
+from sqlalchemy.sql.sqltypes import NULLTYPE
+from sqlalchemy.sql.elements import UnaryExpression
 from sqlalchemy.orm.interfaces import ORMOption
 from fastapi import Request, BackgroundTasks
-from fastapi_pagination.ext.sqlalchemy import paginate
-from fastapi_pagination.bases import AbstractPage
-from ...helper import decide_should_paginate, build_join_options_tree
+from fastapi_pagination import create_page
+from fastapi_pagination.ext.sqlalchemy import create_count_query, create_paginate_query
+from fastapi_pagination.bases import AbstractPage, AbstractParams
+from pydantic import TypeAdapter
+from ...helper import (
+    decide_should_paginate,
+    get_pagination_params,
+    build_join_options_tree
+)
+from ...pagination import CursorParams, encode_cursor, decode_cursor
 from ..abstract import AbstractCrudService
-from ...types import QuerySortDict, ID_TYPE, CreateSchemaType, UpdateSchemaType
+from ...types import (
+    QuerySortDict,
+    ID_TYPE,
+    CreateSchemaType,
+    UpdateSchemaType,
+    CountMode,
+    ReadMode,
+    QueryGroupByDict,
+    QueryMetricDict,
+    FacetValueDict
+)
 from ...models import JoinOptions, JoinOptionModel
+from ...search import (
+    SearchNode,
+    Leaf,
+    And,
+    Or,
+    build_search_tree,
+    iter_search_leaves
+)
 from ...backend import register_backend
 
 from ...config import BetterCrudGlobalConfig
+from .query_cache import QueryCache
+from .result_cache import (
+    AbstractResultCache,
+    cache_result,
+    invalidate_result_cache
+)
+from .aggregate import (
+    create_date_bucket,
+    create_metric,
+    get_group_by_label,
+    get_metric_label
+)
+from .operators import (
+    LIKE_PATTERNS,
+    get_operator,
+    is_builtin_operator,
+    _split_value,
+    _typed_bind
+)
 from .helper import (
+    coerce_primary_value,
+    get_field_index,
+    get_version_field,
+    concurrent_db_session,
+    ExplainJson,
+    get_instances,
+    get_many_to_many_primary_values,
     create_many_to_many_instances,
     create_one_to_many_instances,
     create_many_to_one_instance,
@@ -36,16 +118,49 @@ from .helper import (
 from ...exceptions import (
     NotSupportOperatorException,
     InvalidFieldException,
-    NotSupportRelationshipQueryException,
-    NotFoundException
+    InvalidAggregateException,
+    NotFoundException,
+    InvalidCursorException
 )
 
 ModelType = TypeVar("ModelType")
 Selectable = TypeVar("Selectable", bound=Select[Any])
 
 
-LOGICAL_OPERATOR_AND = "$and"
-LOGICAL_OPERATOR_OR = "$or"
+CURSOR_DIRECTION_NEXT = "next"
+CURSOR_DIRECTION_PREV = "prev"
+
+SOFT_DELETED_NOW_PARAM = "_bc_now"
+WINDOW_TOTAL_LABEL = "_bc_total"
+AGGREGATE_KEY_LABEL = "_bc_key"
+AGGREGATE_GROUP_LABEL = "_bc_group_"
+AGGREGATE_METRIC_LABEL = "_bc_metric_"
+FACET_CTE_NAME = "_bc_facet_base"
+FACET_KEY_LABEL = "_bc_key"
+FACET_INDEX_LABEL = "_bc_facet"
+FACET_COUNT_LABEL = "_bc_count"
+FACET_VALUE_LABEL = "_bc_value_"
+FACET_MATCH_LABEL = "_bc_match_"
+
+LOADER_STRATEGIES = {
+    "joined": joinedload,
+    "selectin": selectinload,
+    "subquery": subqueryload,
+}
+
+EAGER_LAZY_STRATEGIES = ("joined", "selectin", "subquery", "immediate", True)
+SPLIT_OPERATORS = ("$in", "$notin", "$inL", "$notinL")
+BETWEEN_OPERATORS = ("$between", "$notbetween")
+VALUELESS_OPERATORS = ("$isnull", "$notnull")
+
+
+class _UncacheableQuery(Exception):
+    pass
+
+
+@functools.lru_cache(maxsize=None)
+def _get_type_adapter(python_type: type) -> TypeAdapter:
+    return TypeAdapter(python_type)
 
 
 @register_backend("sqlalchemy")
@@ -55,6 +170,11 @@ class SqlalchemyCrudService(
 ):
 
     entity: object = NotImplementedError
+    query_cache: ClassVar[QueryCache] = QueryCache()
+    result_cache: ClassVar[Optional[AbstractResultCache]] = None
+    field_index_depth: ClassVar[int] = 3
+    version_field: ClassVar[Optional[str]] = None
+    ids_first_pagination: ClassVar[bool] = False
 
     def __init__(
         self,
@@ -64,6 +184,8 @@ class SqlalchemyCrudService(
         self.primary_key = entity.__mapper__.primary_key[0].name
         self.entity_has_delete_column = hasattr(
             self.entity, BetterCrudGlobalConfig.soft_deleted_field_key)
+        self.field_index = get_field_index(entity, self.field_index_depth)
+        self.version_field = self.version_field or get_version_field(entity)
 
     def prepare_order(
         self,
@@ -83,106 +205,142 @@ class SqlalchemyCrudService(
         query = query.order_by(*order_bys)
         return query
 
-    def create_search_field_object_condition(
+    def create_search_condition(
         self,
-        logical_operator: str,
-        field: str,
-        obj: Dict[str, Any],
+        search: Optional[Union[Dict, SearchNode]],
         joins: Optional[JoinOptions] = None,
+    ) -> List[Any]:
+        search = build_search_tree(search)
+        if search is None:
+            return []
+        return [self._create_node_condition(search, joins)]
+
+    def _create_node_condition(
+        self,
+        node: SearchNode,
+        joins: Optional[JoinOptions] = None,
+        in_field: Optional[bool] = False
     ):
-        logical_operator = logical_operator or LOGICAL_OPERATOR_AND
-        if not isinstance(obj, dict):
-            return None
-        model_field = self.get_model_field(field, joins)
-        keys = list(obj.keys())
-        if len(keys) == 1:
-            if keys[0] == LOGICAL_OPERATOR_OR:
-                return self.create_search_field_object_condition(
-                    LOGICAL_OPERATOR_OR,
-                    field,
-                    obj.get(LOGICAL_OPERATOR_OR),
-                    joins
-                )
-            else:
-                return self.build_query_expression(
-                    model_field,
-                    keys[0],
-                    obj[keys[0]]
-                )
+        if isinstance(node, Leaf):
+            clause = self.build_query_expression(
+                self.get_model_field(node.field, joins),
+                node.operator,
+                node.value
+            )
+            if in_field:
+                return clause
+            return self._create_exists_condition(node.field, clause, joins)
+        if isinstance(node, And) and node.field is None and not in_field:
+            return and_(*self._create_and_conditions(node, joins))
+        clauses = [
+            self._create_node_condition(
+                child,
+                joins,
+                in_field or node.field is not None
+            ) for child in node.children
+        ]
+        if isinstance(node, Or):
+            clause = or_(*clauses) if clauses else false()
         else:
-            if logical_operator == LOGICAL_OPERATOR_OR:
-                return or_(*(self.build_query_expression(
-                    model_field,
-                    operator,
-                    obj[operator]
-                ) for operator in keys))
-            elif logical_operator == LOGICAL_OPERATOR_AND:
-                clauses = []
-                for operator in keys:
-                    is_or = operator == LOGICAL_OPERATOR_OR
-                    if isinstance(obj[operator], dict) and is_or:
-                        clauses.append(
-                            self.create_search_field_object_condition(
-                                LOGICAL_OPERATOR_OR,
-                                field,
-                                obj.get(operator),
-                                joins
-                            )
-                        )
-                    else:
-                        clauses.append(self.build_query_expression(
-                            model_field, operator, obj[operator]))
-                return and_(*clauses)
+            clause = and_(*clauses)
+        if node.field is None or in_field:
+            return clause
+        # the operators of one field share the exists subquery
+        return self._create_exists_condition(node.field, clause, joins)
 
-    def create_search_condition(
+    def _create_and_conditions(
         self,
-        search: Dict,
-        joins: Optional[JoinOptions] = None,
+        node: And,
+        joins: Optional[JoinOptions] = None
     ) -> List[Any]:
-        if not isinstance(search, dict) or not search:
-            return []
-        conds = []
-        if LOGICAL_OPERATOR_AND in search:  # {$and: [...], ...}
-            and_values = search.get(LOGICAL_OPERATOR_AND)
-            if len(and_values) == 1:  # {$and: [{}]}
-                conds.append(
-                    and_(*self.create_search_condition(and_values[0], joins)))
-            else:  # {$and: [{},{},...]}
-                clauses = [
-                    and_(*self.create_search_condition(and_value, joins))
-                    for and_value in and_values
-                ]
-                conds.append(and_(*clauses))
-        else:
-            for field, value in search.items():
-                field_is_or = field == LOGICAL_OPERATOR_OR
-                if field_is_or and isinstance(value, list):
-                    if len(value) == 1:
-                        conds.append(
-                            and_(
-                                *self.create_search_condition(value[0], joins)
-                            )
-                        )
-                    else:
-                        clauses = [
-                            and_(
-                                *self.create_search_condition(or_value, joins)
-                            ) for or_value in value
-                        ]
-                        conds.append(or_(*clauses))
-                elif isinstance(value, Dict):
-                    conds.append(
-                        self.create_search_field_object_condition(
-                            LOGICAL_OPERATOR_AND,
-                            field,
-                            value,
-                            joins
-                        )
-                    )
-                else:
-                    conds.append(self.get_model_field(
-                        field, joins) == value)
-        return conds
+        # like the join, the conditions on one relationship must hold for
+        # the same related row, so they share one exists subquery
+        clauses = []
+        exists_clauses: Dict[str, Tuple[str, List[Any]]] = {}
+        for child in node.children:
+            exists_path = self._get_exists_path(child.field, joins)
+            if exists_path is None:
+                clauses.append(self._create_node_condition(child, joins))
+            elif exists_path in exists_clauses:
+                exists_clauses[exists_path][1].append(
+                    self._create_node_condition(child, joins, True))
+            else:
+                exists_clauses[exists_path] = (child.field, [
+                    self._create_node_condition(child, joins, True)])
+        for field, field_clauses in exists_clauses.values():
+            clauses.append(self._create_exists_condition(
+                field, and_(*field_clauses), joins))
+        return clauses
+
+    def _get_exists_path(
+        self,
+        field: Optional[str],
+        joins: Optional[JoinOptions] = None
+    ) -> Optional[str]:
+        # the relationship path of a field filtered with exists
+        if field is None or not joins:
+            return None
+        field_parts = field.split(".")
+        if len(field_parts) == 1:
+            return None
+        config = joins.get(field_parts[0])
+        if not config or not config.exists:
+            return None
+        return ".".join(field_parts[:-1])
+
+    def _create_exists_condition(
+        self,
+        field: str,
+        clause: Any,
+        joins: Optional[JoinOptions] = None
+    ):
+        if clause is None or self._get_exists_path(field, joins) is None:
+            return clause
+        field_parts = field.split(".")
+        relation_cls = self.entity
+        relations = []
+        for field_part in field_parts[:-1]:
+            relation = getattr(relation_cls, field_part)
+            relations.append(relation)
+            relation_cls = relation.property.mapper.entity
+        for relation in reversed(relations):
+            if relation.property.uselist:
+                clause = relation.any(clause)
+            else:
+                clause = relation.has(clause)
+        return clause
+
+    def _prepare_exists_joins(
+        self,
+        joins: Optional[JoinOptions],
+        sorts: List[QuerySortDict] = None
+    ) -> Optional[JoinOptions]:
+        if not joins or not any(config.exists for config in joins.values()):
+            return joins
+        sort_relations = {
+            sort["field"].split(".")[0]
+            for sort in sorts or [] if "." in sort["field"]
+        }
+        prepared_joins = {}
+        for field_key, config in joins.items():
+            if config.exists and (
+                "." in field_key
+                or field_key in sort_relations
+                or not self._is_to_many_join(field_key)
+            ):
+                # sorting by a relationship field needs the join
+                config = config.model_copy(update={"exists": False})
+            prepared_joins[field_key] = config
+        return prepared_joins
+
+    def _is_to_many_join(self, field_key: str) -> bool:
+        relation_cls = self.entity
+        for field_part in field_key.split("."):
+            relationship = relation_cls.__mapper__.relationships[field_part]
+            if relationship.uselist:
+                return True
+            relation_cls = relationship.mapper.entity
+        return False
 
     def _create_join_options(
         self,
@@ -199,14 +357,17 @@ class SqlalchemyCrudService(
             should_select = config.select
             if not from_detail and config.select_only_detail:
                 should_select = False
-            if should_select:
+            if should_select and config.strategy == "raise":
+                options.append(raiseload(join_field))
+            elif should_select:
+                loader_fn = self._get_loader_strategy(join_field, config)
                 if config.additional_filter_fn:
                     filter_results = config.additional_filter_fn(request)
                     if not isinstance(filter_results, list):
                         filter_results = [filter_results]
-                    loader = joinedload(join_field.and_(*filter_results))
+                    loader = loader_fn(join_field.and_(*filter_results))
                 else:
-                    loader = joinedload(join_field)
+                    loader = loader_fn(join_field)
                 if children:
                     options.append(loader.options(*self._create_join_options(
                         children,
@@ -219,9 +380,17 @@ class SqlalchemyCrudService(
                 options.append(noload(join_field))
         return options
 
+    def _get_loader_strategy(self, join_field, config: JoinOptionModel):
+        strategy = config.strategy or "joined"
+        if strategy == "auto":
+            # collections are loaded in a second query instead of
+            # multiplying the rows of the main one
+            strategy = "selectin" if join_field.property.uselist else "joined"
+        return LOADER_STRATEGIES[strategy]
+
     def _build_query(
         self,
-        search: Optional[Dict] = None,
+        search: Optional[SearchNode] = None,
         include_deleted: Optional[bool] = False,
         soft_delete: Optional[bool] = True,
         joins: Optional[JoinOptions] = None,
@@ -229,50 +398,290 @@ class SqlalchemyCrudService(
         request: Optional[Request] = None,
         populate_existing: Optional[bool] = False
     ) -> Selectable:
+        joins = self._prepare_exists_joins(joins, sorts)
         conds = []
-        options = []
         if search:
-            conds = conds + self.create_search_condition(search, joins)
+            conds = self.create_search_condition(search, joins)
+        return self._build_statement(
+            conds,
+            soft_deleted_now=datetime.now(),
+            include_deleted=include_deleted,
+            soft_delete=soft_delete,
+            joins=joins,
+            sorts=sorts,
+            request=request,
+            populate_existing=populate_existing
+        )
+
+    def _build_cached_query(
+        self,
+        search: Optional[SearchNode] = None,
+        include_deleted: Optional[bool] = False,
+        soft_delete: Optional[bool] = True,
+        joins: Optional[JoinOptions] = None,
+        sorts: List[QuerySortDict] = None,
+        request: Optional[Request] = None,
+        populate_existing: Optional[bool] = False
+    ) -> Tuple[Selectable, Dict[str, Any]]:
+        """Like `_build_query`, but the statement comes from `query_cache`.
+
+        Search values are replaced by bind parameters, so the statement
+        only depends on the shape of the search and is built once per
+        shape. The returned params must be passed when executing it.
+        """
+        joins = self._prepare_exists_joins(joins, sorts)
+        bind_params = {}
+        try:
+            search_template, search_shape = self._parametrize_search(
+                search,
+                bind_params
+            )
+            key = (
+                type(self),
+                self.entity,
+                search_shape,
+                # the soft delete filter follows the global configuration
+                BetterCrudGlobalConfig.soft_deleted_field_key
+                if self.entity_has_delete_column else None,
+                bool(include_deleted),
+                bool(soft_delete),
+                self._joins_cache_key(joins),
+                tuple((sort["field"], sort["sort"]) for sort in sorts or []),
+                bool(populate_existing)
+            )
+            hash(key)
+        except (_UncacheableQuery, TypeError):
+            return self._build_query(
+                search=search,
+                include_deleted=include_deleted,
+                soft_delete=soft_delete,
+                joins=joins,
+                sorts=sorts,
+                request=request,
+                populate_existing=populate_existing
+            ), {}
+        bind_params[SOFT_DELETED_NOW_PARAM] = datetime.now()
+        stmt = self.query_cache.get(key)
+        if stmt is None:
+            conds = []
+            if search_template:
+                conds = self.create_search_condition(search_template, joins)
+            stmt = self._build_statement(
+                conds,
+                soft_deleted_now=bindparam(
+                    SOFT_DELETED_NOW_PARAM,
+                    type_=NULLTYPE,
+                    required=True
+                ),
+                include_deleted=include_deleted,
+                soft_delete=soft_delete,
+                joins=joins,
+                sorts=sorts,
+                request=request,
+                populate_existing=populate_existing
+            )
+            self.query_cache.set(key, stmt)
+        return stmt, bind_params
+
+    def _build_filter_query(
+        self,
+        search: Optional[SearchNode] = None,
+        include_deleted: Optional[bool] = False,
+        soft_delete: Optional[bool] = True,
+        joins: Optional[JoinOptions] = None,
+        request: Optional[Request] = None
+    ) -> Tuple[Selectable, Dict[str, Any], JoinOptions]:
+        """Query of the rows matched by the search, for aggregations.
+
+        The joins only filter or group the rows, nothing is loaded through
+        them. Returns the query, its bind params and the joins it uses.
+        """
+        joins = {
+            field_key: config.model_copy(update={"select": False})
+            for field_key, config in (joins or {}).items()
+        }
+        query, bind_params = self._build_cached_query(
+            search=search,
+            include_deleted=include_deleted,
+            soft_delete=soft_delete,
+            joins=joins,
+            request=request
+        )
+        return query, bind_params, joins
+
+    def _build_statement(
+        self,
+        conds: List[Any],
+        soft_deleted_now: Any,
+        include_deleted: Optional[bool] = False,
+        soft_delete: Optional[bool] = True,
+        joins: Optional[JoinOptions] = None,
+        sorts: List[QuerySortDict] = None,
+        request: Optional[Request] = None,
+        populate_existing: Optional[bool] = False
+    ) -> Selectable:
+        conds = list(conds)
+        options = []
         if self.entity_has_delete_column and soft_delete:
             soft_deleted_field = BetterCrudGlobalConfig.soft_deleted_field_key
             if not include_deleted:
                 conds.append(or_(
-                    getattr(self.entity, soft_deleted_field) > datetime.now(),
+                    getattr(self.entity, soft_deleted_field) > soft_deleted_now,
                     getattr(self.entity, soft_deleted_field).is_(None)
                 ))
         stmt = select(self.entity)
+        should_distinct = False
         if joins:
+            exists_keys = {
+                field_key for field_key, config in joins.items()
+                if config.exists
+            }
             for field_key, config in joins.items():
-                if config.join:
+                if config.join and field_key.split(".")[0] not in exists_keys:
                     join_field = self.get_model_field(field_key)
                     if config.alias:
                         join_field = join_field.of_type(config.alias)
                     stmt = stmt.join(join_field, isouter=True)
+                    # only to-many joins can duplicate the base rows
+                    should_distinct = should_distinct or \
+                        self._is_to_many_join(field_key)
             options = options + self._create_join_options(
                 build_join_options_tree(joins),
                 request=request
             )
         if options:
             stmt = stmt.options(*options)
-        stmt = stmt.distinct()
+        if should_distinct:
+            stmt = stmt.distinct()
         stmt = stmt.where(*conds)
         stmt = self.prepare_order(stmt, sorts, joins)
         if populate_existing:
             stmt = stmt.execution_options(populate_existing=populate_existing)
         return stmt
 
-    @inject_db_session
+    def _joins_cache_key(self, joins: Optional[JoinOptions]) -> Tuple:
+        if not joins:
+            return ()
+        key = []
+        for field_key, config in joins.items():
+            if config.additional_filter_fn:
+                # the loader criteria depend on the request
+                raise _UncacheableQuery()
+            key.append((field_key, tuple(
+                getattr(config, name) for name in JoinOptionModel.model_fields
+            )))
+        return tuple(key)
+
+    def _parametrize_search(
+        self,
+        search: Optional[SearchNode],
+        bind_params: Dict[str, Any]
+    ) -> Tuple[Optional[SearchNode], Any]:
+        """Bind every value of the search tree.
+
+        Returns the tree with values replaced by bind parameters and
+        its shape, which only holds fields, operators and the values that
+        affect the generated SQL.
+        """
+        if search is None:
+            return None, None
+        if isinstance(search, Leaf):
+            value, value_shape = self._parametrize_value(
+                search.operator,
+                search.value,
+                bind_params
+            )
+            return search._replace(value=value), (search.field, value_shape)
+        items = [
+            self._parametrize_search(child, bind_params)
+            for child in search.children
+        ]
+        return (
+            search._replace(children=tuple(item[0] for item in items)),
+            (
+                type(search).__name__,
+                search.field,
+                tuple(item[1] for item in items)
+            )
+        )
+
+    def _parametrize_value(
+        self,
+        operator: str,
+        value: Any,
+        bind_params: Dict[str, Any]
+    ) -> Tuple[Any, Any]:
+        def bind(bind_value, expanding=False):
+            key = f"_bc_{len(bind_params)}"
+            bind_params[key] = bind_value
+            return bindparam(
+                key,
+                bind_value,
+                type_=NULLTYPE,
+                required=True,
+                expanding=expanding
+            )
+
+        if not is_builtin_operator(operator):
+            # custom operators may read the value of the search
+            raise _UncacheableQuery()
+        if value is None or operator in VALUELESS_OPERATORS \
+                or isinstance(value, (dict, list)):
+            # these values change the generated SQL, keep them inline
+            return value, (operator, "raw", value if isinstance(
+                value, (dict, list)) else repr(value))
+        value_type = type(value)
+        if operator in LIKE_PATTERNS:
+            value = bind(LIKE_PATTERNS[operator].format(value))
+        elif operator in SPLIT_OPERATORS:
+            value = bind(_split_value(value), expanding=True)
+        elif operator in BETWEEN_OPERATORS:
+            value = [bind(item) for item in _split_value(value)]
+            return value, (operator, value_type, len(value))
+        elif operator == "$length":
+            value = bind(int(value))
+        else:
+            value = bind(value)
+        return value, (operator, value_type)
+
+    @inject_db_session(read=True)
+    @cache_result
     async def crud_get_many(
         self,
         request: Optional[Request] = None,
-        search: Optional[Dict] = None,
+        search: Optional[Union[Dict, SearchNode]] = None,
         include_deleted: Optional[bool] = False,
         soft_delete: Optional[bool] = False,
         sorts: List[QuerySortDict] = None,
         joins: Optional[JoinOptions] = None,
+        count_mode: Optional[CountMode] = "exact",
+        fields: Optional[List[str]] = None,
+        read_mode: Optional[ReadMode] = "orm",
         db_session: Optional[AsyncSession] = Provide(),
     ) -> Union[AbstractPage[ModelType], List[ModelType]]:
-        query = self._build_query(
+        search = build_search_tree(search)
+        self.validate_fields(search, sorts)
+        if not fields and read_mode == "core" \
+                and not self._should_load_relationships(joins):
+            # plain rows of every column, relationships need the orm
+            fields = [
+                column_attr.key
+                for column_attr in self.entity.__mapper__.column_attrs
+            ]
+        params = get_pagination_params()
+        if isinstance(params, CursorParams):
+            return await self._cursor_paginate(
+                params,
+                db_session,
+                search=search,
+                include_deleted=include_deleted,
+                soft_delete=soft_delete,
+                sorts=sorts,
+                joins=joins,
+                request=request,
+                fields=fields
+            )
+        query, bind_params = self._build_cached_query(
             search=search,
             include_deleted=include_deleted,
             soft_delete=soft_delete,
@@ -280,33 +689,721 @@ class SqlalchemyCrudService(
             sorts=sorts,
             request=request
         )
+        if fields:
+            query = query.with_only_columns(*self._get_field_columns(fields))
         if decide_should_paginate():
-            return await paginate(db_session, query)
-        result = await db_session.execute(query)
+            return await self._paginate(
+                params,
+                db_session,
+                query,
+                bind_params=bind_params,
+                count_mode=count_mode,
+                as_mappings=bool(fields),
+                ids_first=not fields and self._should_fetch_ids_first(
+                    joins,
+                    sorts
+                )
+            )
+        result = await db_session.execute(query, bind_params)
+        return self._fetch_items(result, bool(fields))
+
+    @inject_db_session(read=True)
+    async def crud_export(
+        self,
+        request: Optional[Request] = None,
+        search: Optional[Union[Dict, SearchNode]] = None,
+        include_deleted: Optional[bool] = False,
+        soft_delete: Optional[bool] = False,
+        sorts: List[QuerySortDict] = None,
+        joins: Optional[JoinOptions] = None,
+        fields: Optional[List[str]] = None,
+        yield_per: Optional[int] = 1000,
+        db_session: Optional[AsyncSession] = Provide(),
+    ) -> AsyncIterator[Dict[str, Any]]:
+        search = build_search_tree(search)
+        self.validate_fields(search, sorts)
+        column_attrs = self.entity.__mapper__.column_attrs
+        if fields is None:
+            fields = [column_attr.key for column_attr in column_attrs]
+        else:
+            # relationships can not be flattened into a row
+            columns = [field for field in fields if field in column_attrs]
+            if not columns:
+                raise InvalidFieldException(",".join(fields))
+            fields = columns
+        query, bind_params = self._build_cached_query(
+            search=search,
+            include_deleted=include_deleted,
+            soft_delete=soft_delete,
+            joins=joins,
+            sorts=sorts,
+            request=request
+        )
+        query = query.with_only_columns(
+            *self._get_field_columns(fields)
+        ).execution_options(yield_per=yield_per)
+        result = await db_session.stream(query, bind_params)
+        async for row in result.mappings():
+            yield dict(row)
+
+    @inject_db_session(read=True)
+    async def crud_aggregate(
+        self,
+        request: Optional[Request] = None,
+        search: Optional[Union[Dict, SearchNode]] = None,
+        include_deleted: Optional[bool] = False,
+        soft_delete: Optional[bool] = False,
+        joins: Optional[JoinOptions] = None,
+        group_by: Optional[List[QueryGroupByDict]] = None,
+        metrics: Optional[List[QueryMetricDict]] = None,
+        db_session: Optional[AsyncSession] = Provide(),
+    ) -> List[Dict[str, Any]]:
+        search = build_search_tree(search)
+        self.validate_fields(search)
+        metrics = metrics or [QueryMetricDict(function="count", field=None)]
+        query, bind_params, joins = self._build_filter_query(
+            search=search,
+            include_deleted=include_deleted,
+            soft_delete=soft_delete,
+            joins=joins,
+            request=request
+        )
+        dialect_name = db_session.get_bind().dialect.name
+        group_values = []
+        for item in group_by or []:
+            column = self._get_aggregate_column(item["field"], joins)
+            if item["bucket"]:
+                column = create_date_bucket(column, item["bucket"], dialect_name)
+            group_values.append(column)
+        metric_values = [
+            self._get_aggregate_column(metric["field"], joins)
+            if metric["field"] else None
+            for metric in metrics
+        ]
+        primary_key = self.entity.__mapper__.primary_key[0]
+        count_column = None
+        if query._distinct:
+            # to-many joins repeat the rows, the values are aggregated
+            # over the distinct rows of each item instead, which leaves
+            # no single row for the values of a to-many relationship
+            for metric in metrics:
+                if metric["field"] and "." in metric["field"] and \
+                        self._is_to_many_join(metric["field"].rsplit(".", 1)[0]):
+                    raise InvalidAggregateException(
+                        f"metric of the to-many relationship field {metric['field']}")
+            rows = query.with_only_columns(
+                primary_key.label(AGGREGATE_KEY_LABEL),
+                *[
+                    column.label(f"{AGGREGATE_GROUP_LABEL}{index}")
+                    for index, column in enumerate(group_values)
+                ],
+                *[
+                    column.label(f"{AGGREGATE_METRIC_LABEL}{index}")
+                    for index, column in enumerate(metric_values)
+                    if column is not None
+                ]
+            ).order_by(None).subquery()
+            group_values = [
+                rows.c[f"{AGGREGATE_GROUP_LABEL}{index}"]
+                for index in range(len(group_values))
+            ]
+            metric_values = [
+                rows.c[f"{AGGREGATE_METRIC_LABEL}{index}"]
+                if column is not None else None
+                for index, column in enumerate(metric_values)
+            ]
+            count_column = distinct(rows.c[AGGREGATE_KEY_LABEL])
+            query = select().select_from(rows)
+        group_columns = [
+            column.label(get_group_by_label(item))
+            for item, column in zip(group_by or [], group_values)
+        ]
+        metric_columns = [
+            create_metric(
+                metric["function"],
+                column if column is not None else count_column
+            ).label(get_metric_label(metric))
+            for metric, column in zip(metrics, metric_values)
+        ]
+        query = query.with_only_columns(
+            *group_columns,
+            *metric_columns
+        ).group_by(*group_columns).order_by(None).order_by(*group_columns)
+        result = await db_session.execute(query, bind_params)
+        return [dict(row) for row in result.mappings()]
+
+    @inject_db_session(read=True)
+    async def crud_facets(
+        self,
+        request: Optional[Request] = None,
+        fields: Optional[List[str]] = None,
+        search: Optional[Union[Dict, SearchNode]] = None,
+        facet_search: Optional[Dict[str, Union[Dict, SearchNode]]] = None,
+        include_deleted: Optional[bool] = False,
+        soft_delete: Optional[bool] = False,
+        joins: Optional[JoinOptions] = None,
+        db_session: Optional[AsyncSession] = Provide(),
+    ) -> Dict[str, List[FacetValueDict]]:
+        """Value counts of each of `fields`, in one statement.
+
+        The rows matching `search` are selected once in a CTE, along with
+        whether they match the `facet_search` of each field. A facet
+        counts the rows matching the `facet_search` of the other fields,
+        its own is left out.
+        """
+        fields = fields or []
+        search = build_search_tree(search)
+        facet_search = {
+            field: build_search_tree(field_search)
+            for field, field_search in (facet_search or {}).items()
+        }
+        self.validate_fields(search)
+        for field_search in facet_search.values():
+            self.validate_fields(field_search)
+        if not fields:
+            return {}
+        query, bind_params, joins = self._build_filter_query(
+            search=search,
+            include_deleted=include_deleted,
+            soft_delete=soft_delete,
+            joins=joins,
+            request=request
+        )
+        primary_key = self.entity.__mapper__.primary_key[0]
+        columns = [primary_key.label(FACET_KEY_LABEL)]
+        for index, field in enumerate(fields):
+            columns.append(self._get_aggregate_column(field, joins).label(
+                f"{FACET_VALUE_LABEL}{index}"))
+        match_labels = {}
+        for field, field_search in facet_search.items():
+            if field_search is None:
+                continue
+            match_labels[field] = f"{FACET_MATCH_LABEL}{len(match_labels)}"
+            columns.append(and_(
+                *self.create_search_condition(field_search, joins)
+            ).label(match_labels[field]))
+        base = query.with_only_columns(*columns).order_by(None) \
+            .cte(FACET_CTE_NAME)
+        value_columns = [
+            base.c[f"{FACET_VALUE_LABEL}{index}"] for index in range(len(fields))
+        ]
+        # to-many joins repeat the rows
+        count = func.count(distinct(base.c[FACET_KEY_LABEL])) \
+            if query._distinct else func.count()
+        facet_queries = []
+        for index, field in enumerate(fields):
+            facet_queries.append(select(
+                literal(index).label(FACET_INDEX_LABEL),
+                *[
+                    column if column_index == index
+                    else cast(null(), column.type).label(column.name)
+                    for column_index, column in enumerate(value_columns)
+                ],
+                count.label(FACET_COUNT_LABEL)
+            ).where(*[
+                base.c[label] for match_field, label in match_labels.items()
+                if match_field != field
+            ]).group_by(value_columns[index]))
+        stmt = union_all(*facet_queries)
+        stmt = stmt.order_by(
+            stmt.selected_columns[FACET_INDEX_LABEL],
+            stmt.selected_columns[FACET_COUNT_LABEL].desc(),
+            *[stmt.selected_columns[column.name] for column in value_columns]
+        )
+        result = await db_session.execute(stmt, bind_params)
+        facets: Dict[str, List[FacetValueDict]] = {field: [] for field in fields}
+        for row in result.mappings():
+            index = row[FACET_INDEX_LABEL]
+            facets[fields[index]].append(FacetValueDict(
+                value=row[f"{FACET_VALUE_LABEL}{index}"],
+                count=row[FACET_COUNT_LABEL]
+            ))
+        return facets
+
+    def _get_aggregate_column(
+        self,
+        field: str,
+        joins: Optional[JoinOptions] = None
+    ) -> Any:
+        """Column of `field`, a field of a relationship needs the
+        relationship joined"""
+        if "." in field:
+            config = (joins or {}).get(field.rsplit(".", 1)[0])
+            if config is None or not config.join or config.exists:
+                raise InvalidFieldException(field)
+        column = self.get_model_field(field, joins)
+        if not isinstance(getattr(column, "property", None), ColumnProperty):
+            raise InvalidFieldException(field)
+        return column
+
+    def _should_load_relationships(
+        self,
+        joins: Optional[JoinOptions] = None,
+        from_detail: Optional[bool] = False
+    ) -> bool:
+        joins = joins or {}
+        for field_key, config in joins.items():
+            if config.select and (from_detail or not config.select_only_detail):
+                return True
+        for relationship in self.entity.__mapper__.relationships:
+            config = joins.get(relationship.key)
+            if relationship.lazy in EAGER_LAZY_STRATEGIES and (
+                config is None or config.select
+            ):
+                return True
+        return False
+
+    def _should_fetch_ids_first(
+        self,
+        joins: Optional[JoinOptions] = None,
+        sorts: List[QuerySortDict] = None
+    ) -> bool:
+        """Whether the joins multiply the rows of the page query, so that
+        the page is better selected by primary key first"""
+        if not self.ids_first_pagination:
+            return False
+        if any("." in sort["field"] for sort in sorts or []):
+            # a distinct page of ids can not be sorted by a joined column
+            return False
+        joins = joins or {}
+        for field_key, config in joins.items():
+            if not self._is_to_many_join(field_key):
+                continue
+            if config.join and not config.exists:
+                return True
+            if config.select and not config.select_only_detail \
+                    and self._get_loader_strategy(
+                        self.get_model_field(field_key), config
+                    ) is joinedload:
+                return True
+        for relationship in self.entity.__mapper__.relationships:
+            config = joins.get(relationship.key)
+            if relationship.uselist and relationship.lazy == "joined" \
+                    and (config is None or config.select):
+                return True
+        return False
+
+    def _get_field_columns(self, fields: List[str]) -> List[Any]:
+        column_attrs = self.entity.__mapper__.column_attrs
+        columns = []
+        for field in fields:
+            if field not in column_attrs:
+                raise InvalidFieldException(field)
+            columns.append(getattr(self.entity, field))
+        return columns
+
+    def _fetch_items(self, result, as_mappings: bool = False) -> List[Any]:
+        if as_mappings:
+            return [dict(row) for row in result.mappings()]
         return result.unique().scalars().all()
 
-    @inject_db_session
+    async def _paginate(
+        self,
+        params: AbstractParams,
+        db_session: AsyncSession,
+        query: Selectable,
+        bind_params: Optional[Dict[str, Any]] = None,
+        count_mode: Optional[CountMode] = "exact",
+        as_mappings: bool = False,
+        ids_first: bool = False
+    ) -> AbstractPage[ModelType]:
+        bind_params = bind_params or {}
+        total = None
+        has_next = None
+        # rows are counted before DISTINCT applies, so the window would
+        # count the duplicates
+        window_total = count_mode == "window" and not query._distinct
+        if count_mode == "window" and not window_total:
+            count_mode = "exact"
+        if count_mode == "estimate":
+            total = await self._estimate_count(
+                db_session,
+                query,
+                bind_params=bind_params
+            )
+        if count_mode == "exact" or (count_mode == "estimate" and total is None):
+            async with concurrent_db_session(db_session, read=True) \
+                    as count_db_session:
+                if count_db_session is not None:
+                    # the page query runs while the other session counts
+                    total, (items, _) = await asyncio.gather(
+                        count_db_session.scalar(
+                            create_count_query(query),
+                            bind_params
+                        ),
+                        self._fetch_page(
+                            db_session,
+                            query,
+                            create_paginate_query(query, params),
+                            bind_params,
+                            as_mappings=as_mappings,
+                            ids_first=ids_first
+                        )
+                    )
+                    return create_page(items, params=params, total=total)
+            total = await db_session.scalar(
+                create_count_query(query),
+                bind_params
+            )
+        if count_mode == "none":
+            # fetch one extra row to know whether another page exists
+            raw_params = params.to_raw_params().as_limit_offset()
+            page_query = query.limit(raw_params.limit + 1)
+            if raw_params.offset:
+                page_query = page_query.offset(raw_params.offset)
+            items, _ = await self._fetch_page(
+                db_session,
+                query,
+                page_query,
+                bind_params,
+                as_mappings=as_mappings,
+                ids_first=ids_first
+            )
+            has_next = len(items) > raw_params.limit
+            items = items[:raw_params.limit]
+        else:
+            items, total_over = await self._fetch_page(
+                db_session,
+                query,
+                create_paginate_query(query, params),
+                bind_params,
+                as_mappings=as_mappings,
+                ids_first=ids_first,
+                with_total=window_total
+            )
+            if window_total:
+                total = total_over
+                if total is None:
+                    # an empty page has no row to carry the total
+                    total = await db_session.scalar(
+                        create_count_query(query),
+                        bind_params
+                    )
+        return create_page(
+            items,
+            params=params,
+            total=total,
+            has_next=has_next
+        )
+
+    async def _fetch_page(
+        self,
+        db_session: AsyncSession,
+        query: Selectable,
+        page_query: Selectable,
+        bind_params: Dict[str, Any],
+        as_mappings: bool = False,
+        ids_first: bool = False,
+        with_total: bool = False
+    ) -> Tuple[List[Any], Optional[int]]:
+        """Fetch the items of the page, and the `count(*) OVER ()` total
+        of the rows when `with_total` is set"""
+        total_columns = []
+        if with_total:
+            total_columns.append(
+                func.count().over().label(WINDOW_TOTAL_LABEL))
+        if not ids_first:
+            if total_columns:
+                page_query = page_query.add_columns(*total_columns)
+            result = await db_session.execute(page_query, bind_params)
+            if not with_total:
+                return self._fetch_items(result, as_mappings), None
+            return self._fetch_items_with_total(result, as_mappings)
+        # the page of ids is selected without the loaded relationships,
+        # then the entities are loaded by id and put back in page order
+        primary_field = getattr(self.entity, self.primary_key)
+        result = await db_session.execute(
+            self._create_ids_page_query(page_query, total_columns),
+            bind_params
+        )
+        rows = result.all()
+        if not rows:
+            return [], None
+        ids = [row[0] for row in rows]
+        result = await db_session.execute(
+            query.where(primary_field.in_(ids)).order_by(None),
+            bind_params
+        )
+        entities = {
+            getattr(entity, self.primary_key): entity
+            for entity in self._fetch_items(result)
+        }
+        items = [entities[id] for id in ids if id in entities]
+        return items, rows[0][1] if with_total else None
+
+    def _create_ids_page_query(
+        self,
+        page_query: Selectable,
+        total_columns: Optional[List[Any]] = None
+    ) -> Selectable:
+        """Page query selecting the primary keys, the sort columns are
+        selected as well since a DISTINCT query can only be ordered by
+        selected columns"""
+        primary_field = getattr(self.entity, self.primary_key)
+        order_columns = []
+        for clause in page_query._order_by_clauses:
+            while isinstance(clause, UnaryExpression):
+                clause = clause.element
+            if not clause.compare(primary_field.expression):
+                order_columns.append(clause)
+        return page_query.with_only_columns(
+            primary_field,
+            *(total_columns or []),
+            *order_columns
+        )
+
+    def _fetch_items_with_total(
+        self,
+        result,
+        as_mappings: bool = False
+    ) -> Tuple[List[Any], Optional[int]]:
+        if as_mappings:
+            items = [dict(row) for row in result.mappings()]
+            totals = [item.pop(WINDOW_TOTAL_LABEL) for item in items]
+        else:
+            rows = result.unique().all()
+            items = [row[0] for row in rows]
+            totals = [row[1] for row in rows]
+        return items, totals[0] if totals else None
+
+    async def _estimate_count(
+        self,
+        db_session: AsyncSession,
+        query: Selectable,
+        bind_params: Optional[Dict[str, Any]] = None
+    ) -> Optional[int]:
+        dialect = db_session.get_bind().dialect
+        if dialect.name != "postgresql":
+            return None
+        plan = await db_session.scalar(
+            ExplainJson(query.order_by(None)),
+            bind_params
+        )
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    async def _cursor_paginate(
+        self,
+        params: CursorParams,
+        db_session: AsyncSession,
+        search: Optional[SearchNode] = None,
+        include_deleted: Optional[bool] = False,
+        soft_delete: Optional[bool] = False,
+        sorts: List[QuerySortDict] = None,
+        joins: Optional[JoinOptions] = None,
+        request: Optional[Request] = None,
+        fields: Optional[List[str]] = None
+    ) -> AbstractPage[ModelType]:
+        sorts = list(sorts or [])
+        if not any(sort["field"] == self.primary_key for sort in sorts):
+            # the primary key makes the sort keys unique
+            sorts.append({"field": self.primary_key, "sort": "ASC"})
+        sort_fields = [sort["field"] for sort in sorts]
+        direction = CURSOR_DIRECTION_NEXT
+        cursor_values = None
+        if params.cursor:
+            payload = decode_cursor(params.cursor)
+            direction = payload.get("d")
+            cursor_values = payload.get("v")
+            if (
+                direction not in (CURSOR_DIRECTION_NEXT, CURSOR_DIRECTION_PREV)
+                or payload.get("k") != sort_fields
+                or not isinstance(cursor_values, list)
+                or len(cursor_values) != len(sorts)
+            ):
+                raise InvalidCursorException(params.cursor)
+        if direction == CURSOR_DIRECTION_PREV:
+            sorts = [
+                {
+                    "field": sort["field"],
+                    "sort": "DESC" if sort["sort"] == "ASC" else "ASC"
+                }
+                for sort in sorts
+            ]
+        query, bind_params = self._build_cached_query(
+            search=search,
+            include_deleted=include_deleted,
+            soft_delete=soft_delete,
+            joins=joins,
+            sorts=sorts,
+            request=request
+        )
+        key_fields = [
+            self.get_model_field(field, joins) for field in sort_fields
+        ]
+        nullable_keys = [
+            "." in field or self._is_nullable_field(key_field)
+            for field, key_field in zip(sort_fields, key_fields)
+        ]
+        # NULL sorts after any value, the same way on every database
+        null_orders = []
+        order_bys = []
+        for key_field, sort, nullable in zip(key_fields, sorts, nullable_keys):
+            if nullable:
+                null_order = key_field.is_(None)
+                null_orders.append(null_order)
+                order_bys.append(
+                    null_order.asc() if sort["sort"] == "ASC" else null_order.desc())
+            order_bys.append(
+                key_field.asc() if sort["sort"] == "ASC" else key_field.desc())
+        query = query.order_by(None).order_by(*order_bys)
+        item_size = 1
+        if fields:
+            query = query.with_only_columns(*self._get_field_columns(fields))
+            item_size = len(fields)
+        if cursor_values is not None:
+            query = query.where(self._build_keyset_condition(
+                key_fields,
+                sorts,
+                cursor_values,
+                params.cursor,
+                nullable_keys
+            ))
+        # DISTINCT queries can only be ordered by selected columns
+        query = query.add_columns(*key_fields, *null_orders) \
+            .limit(params.size + 1)
+        key_end = item_size + len(key_fields)
+        result = await db_session.execute(query, bind_params)
+        rows = result.unique().all()
+        has_more = len(rows) > params.size
+        rows = rows[:params.size]
+        if direction == CURSOR_DIRECTION_PREV:
+            rows.reverse()
+            has_next, has_prev = True, has_more
+        else:
+            has_next, has_prev = has_more, cursor_values is not None
+        next_cursor = None
+        prev_cursor = None
+        if rows:
+            if has_next:
+                next_cursor = encode_cursor({
+                    "d": CURSOR_DIRECTION_NEXT,
+                    "k": sort_fields,
+                    "v": list(rows[-1][item_size:key_end])
+                })
+            if has_prev:
+                prev_cursor = encode_cursor({
+                    "d": CURSOR_DIRECTION_PREV,
+                    "k": sort_fields,
+                    "v": list(rows[0][item_size:key_end])
+                })
+        if fields:
+            items = [dict(zip(fields, row[:item_size])) for row in rows]
+        else:
+            items = [row[0] for row in rows]
+        return create_page(
+            items,
+            params=params,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor
+        )
+
+    def _build_keyset_condition(
+        self,
+        key_fields: List[Any],
+        sorts: List[QuerySortDict],
+        cursor_values: List[Any],
+        cursor: str,
+        nullable_keys: Optional[List[bool]] = None
+    ):
+        """Rows after the cursor values in the sort order, where NULL
+        sorts after any value"""
+        nullable_keys = nullable_keys or [False] * len(key_fields)
+        values = []
+        for field, value, nullable in zip(key_fields, cursor_values, nullable_keys):
+            if value is None and not nullable:
+                raise InvalidCursorException(cursor)
+            values.append(None if value is None else literal(
+                self._coerce_cursor_value(field, value, cursor), field.type))
+        clauses = []
+        for index, (field, sort) in enumerate(zip(key_fields, sorts)):
+            value = values[index]
+            if sort["sort"] == "ASC":
+                if value is None:
+                    # nothing sorts after NULL
+                    continue
+                comparison = field > value
+                if nullable_keys[index]:
+                    comparison = or_(comparison, field.is_(None))
+            elif value is None:
+                comparison = field.is_not(None)
+            else:
+                comparison = field < value
+            clauses.append(and_(*[
+                key_fields[prev_index].is_(None) if values[prev_index] is None
+                else key_fields[prev_index] == values[prev_index]
+                for prev_index in range(index)
+            ], comparison))
+        return or_(false(), *clauses)
+
+    def _is_nullable_field(self, field) -> bool:
+        column = getattr(field, "expression", field)
+        return getattr(column, "nullable", True)
+
+    def _coerce_cursor_value(self, field, value: Any, cursor: str) -> Any:
+        try:
+            python_type = field.type.python_type
+        except (AttributeError, NotImplementedError):
+            return value
+        try:
+            return _get_type_adapter(python_type).validate_python(value)
+        except ValueError:
+            raise InvalidCursorException(cursor) from None
+
+    @inject_db_session(read=True)
+    @cache_result
     async def crud_get_one(
         self,
         request: Request,
         id: ID_TYPE,
         joins: Optional[JoinOptions] = None,
+        fields: Optional[List[str]] = None,
         db_session: Optional[AsyncSession] = Provide()
     ) -> ModelType:
-        entity = await self._get(
-            id,
-            db_session,
-            options=self._create_join_options(
-                build_join_options_tree(joins),
-                request=request,
-                from_detail=True
+        if fields:
+            result = await db_session.execute(
+                select(*self._get_field_columns(fields)).where(
+                    getattr(self.entity, self.primary_key) == id
+                )
+            )
+            row = result.mappings().first()
+            entity = dict(row) if row else None
+        else:
+            entity = await self._get(
+                id,
+                db_session,
+                options=self._create_join_options(
+                    build_join_options_tree(joins),
+                    request=request,
+                    from_detail=True
+                )
             )
-        )
         if not entity:
             raise NotFoundException()
         return entity
 
+    @inject_db_session(read=True)
+    async def crud_get_version(
+        self,
+        request: Request,
+        id: ID_TYPE,
+        joins: Optional[JoinOptions] = None,
+        db_session: Optional[AsyncSession] = Provide()
+    ) -> Optional[Any]:
+        if self.version_field is None \
+                or self._should_load_relationships(joins, from_detail=True):
+            # the version of the row does not cover the loaded relations
+            return None
+        result = await db_session.execute(
+            select(getattr(self.entity, self.version_field)).where(
+                getattr(self.entity, self.primary_key) == id
+            )
+        )
+        return result.scalar_one_or_none()
+
     @inject_db_session
+    @invalidate_result_cache
     async def crud_create_one(
         self,
         request: Request,
@@ -330,11 +1427,25 @@ class SqlalchemyCrudService(
         db_session: AsyncSession,
         background_tasks: Optional[BackgroundTasks] = None
     ) -> ModelType:
-        relationships = self.entity.__mapper__.relationships
         extra_data = await self.on_before_create(
             model,
             background_tasks=background_tasks
         )
+        entity = await self._build_create_entity(
+            self._get_create_data(request, model, extra_data),
+            db_session=db_session
+        )
+        db_session.add(entity)
+        await db_session.flush()
+        await self.on_after_create(entity, model=model, background_tasks=background_tasks)
+        return entity
+
+    def _get_create_data(
+        self,
+        request: Request,
+        model: CreateSchemaType,
+        extra_data: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
         model_data: Dict = model.model_dump(exclude_unset=True)
         if extra_data:
             model_data.update(extra_data)
@@ -343,6 +1454,41 @@ class SqlalchemyCrudService(
                 model_data.update(request.state.auth_persist)
             if hasattr(request.state, "params_filter"):
                 model_data.update(request.state.params_filter)
+        return model_data
+
+    async def _prefetch_many_to_many(
+        self,
+        model_data_list: List[Dict[str, Any]],
+        db_session: AsyncSession
+    ) -> List[Any]:
+        relationships = self.entity.__mapper__.relationships
+        instances = []
+        for relationship in relationships:
+            if relationship.direction != MANYTOMANY:
+                continue
+            relation_cls = relationship.mapper.entity
+            primary_values = []
+            for model_data in model_data_list:
+                if model_data.get(relationship.key) is not None:
+                    primary_values.extend(get_many_to_many_primary_values(
+                        relation_cls,
+                        model_data[relationship.key]
+                    ))
+            if primary_values:
+                instances.extend(await get_instances(
+                    db_session,
+                    relation_cls,
+                    primary_values
+                ))
+        # the caller keeps the instances referenced, the identity map is weak
+        return instances
+
+    async def _build_create_entity(
+        self,
+        model_data: Dict[str, Any],
+        db_session: AsyncSession
+    ) -> ModelType:
+        relationships = self.entity.__mapper__.relationships
         for key, value in model_data.items():
             if key in relationships:
                 relation_dir = relationships[key].direction
@@ -371,13 +1517,10 @@ class SqlalchemyCrudService(
                         relation_cls,
                         value
                     )
-        entity: ModelType = self.entity(**model_data)
-        db_session.add(entity)
-        await db_session.flush()
-        await self.on_after_create(entity, model=model, background_tasks=background_tasks)
-        return entity
+        return self.entity(**model_data)
 
     @inject_db_session
+    @invalidate_result_cache
     async def crud_create_many(
         self,
         request: Request,
@@ -387,14 +1530,34 @@ class SqlalchemyCrudService(
     ) -> List[ModelType]:
         entities = []
         try:
-            for model in models:
-                entity = await self._create_one_entity(
-                    request,
-                    model,
-                    db_session=db_session,
-                    background_tasks=background_tasks
-                )
-                entities.append(entity)
+            extra_data_list = await self.on_before_create_many(
+                models,
+                background_tasks=background_tasks
+            )
+            if extra_data_list is None:
+                extra_data_list = [None] * len(models)
+            model_data_list = [
+                self._get_create_data(request, model, extra_data)
+                for model, extra_data in zip(models, extra_data_list)
+            ]
+            prefetched = await self._prefetch_many_to_many(
+                model_data_list,
+                db_session
+            )
+            for model_data in model_data_list:
+                entities.append(await self._build_create_entity(
+                    model_data,
+                    db_session=db_session
+                ))
+            del prefetched
+            # a single flush lets the unit of work batch the inserts
+            db_session.add_all(entities)
+            await db_session.flush()
+            await self.on_after_create_many(
+                entities,
+                models=models,
+                background_tasks=background_tasks
+            )
             await db_session.commit()
             return entities
         except Exception:
@@ -402,6 +1565,7 @@ class SqlalchemyCrudService(
             raise
 
     @inject_db_session
+    @invalidate_result_cache
     async def crud_update_one(
         self,
         request: Request,
@@ -430,22 +1594,47 @@ class SqlalchemyCrudService(
         background_tasks: Optional[BackgroundTasks] = None
     ) -> ModelType:
         model_data = model.model_dump(exclude_unset=True)
-        relationship_fields = self._guess_should_load_relationship_fields(
-            model_data
+        options = self._create_update_options([model_data], request=request)
+        entity = await self._get(id, db_session=db_session, options=options)
+        if not entity:
+            raise NotFoundException()
+        return await self._apply_update(
+            entity,
+            model,
+            model_data,
+            db_session=db_session,
+            background_tasks=background_tasks
         )
+
+    def _create_update_options(
+        self,
+        model_data_list: List[Dict[str, Any]],
+        request: Optional[Request] = None
+    ) -> Sequence[ORMOption]:
+        relationship_fields = []
+        for model_data in model_data_list:
+            for field in self._guess_should_load_relationship_fields(model_data):
+                if field not in relationship_fields:
+                    relationship_fields.append(field)
         joins = functools.reduce(
             lambda x, y: {**x, y: JoinOptionModel(select=True, join=False)},
             relationship_fields,
             {}
         )
-        options = self._create_join_options(
+        return self._create_join_options(
             build_join_options_tree(joins),
             request=request,
             from_detail=True
         )
-        entity = await self._get(id, db_session=db_session, options=options)
-        if not entity:
-            raise NotFoundException()
+
+    async def _apply_update(
+        self,
+        entity: ModelType,
+        model: UpdateSchemaType,
+        model_data: Dict[str, Any],
+        db_session: AsyncSession,
+        background_tasks: Optional[BackgroundTasks] = None
+    ) -> ModelType:
         extra_data = await self.on_before_update(
             entity,
             model,
@@ -489,6 +1678,7 @@ class SqlalchemyCrudService(
         return entity
 
     @inject_db_session
+    @invalidate_result_cache
     async def crud_update_many(
         self,
         request: Request,
@@ -499,17 +1689,44 @@ class SqlalchemyCrudService(
     ) -> List[ModelType]:
         if len(ids) != len(models):
             raise Exception("The id and models length do not match")
-        entities = []
+        model_data_list = [
+            model.model_dump(exclude_unset=True) for model in models
+        ]
         try:
-            for index, model in enumerate(models):
-                entity = await self._update_one_entity(
-                    ids[index],
-                    model,
-                    request=request,
-                    db_session=db_session,
-                    background_tasks=background_tasks
+            if self._can_bulk_update(model_data_list):
+                entities = await self._bulk_update(
+                    ids,
+                    model_data_list,
+                    db_session=db_session
                 )
-                entities.append(entity)
+            else:
+                entities = await self._get_many(
+                    ids,
+                    db_session,
+                    options=self._create_update_options(
+                        model_data_list,
+                        request=request
+                    )
+                )
+                if not all(entities):
+                    raise NotFoundException()
+                prefetched = await self._prefetch_many_to_many(
+                    model_data_list,
+                    db_session
+                )
+                for entity, model, model_data in zip(
+                    entities,
+                    models,
+                    model_data_list
+                ):
+                    await self._apply_update(
+                        entity,
+                        model,
+                        model_data,
+                        db_session=db_session,
+                        background_tasks=background_tasks
+                    )
+                del prefetched
             await db_session.commit()
             for entity, model in zip(entities, models):
                 await self.on_after_update(entity, model=model, background_tasks=background_tasks)
@@ -519,30 +1736,95 @@ class SqlalchemyCrudService(
             raise
 
     @inject_db_session
+    @invalidate_result_cache
     async def crud_delete_many(
         self,
         request: Request,
         ids: List[ID_TYPE],
         soft_delete: Optional[bool] = False,
         background_tasks: Optional[BackgroundTasks] = None,
+        returning: Optional[bool] = False,
         db_session: Optional[AsyncSession] = Provide()
     ) -> List[ModelType]:
+        if returning and self._supports_returning(db_session, soft_delete):
+            return await self._delete_many_returning(
+                ids,
+                soft_delete=soft_delete,
+                background_tasks=background_tasks,
+                db_session=db_session
+            )
         entities = [await self._get(id, db_session) for id in ids]
         for entity in entities:
             if not entity:
                 raise NotFoundException()
         await self.on_before_delete(entities, background_tasks=background_tasks)
+        try:
+            if soft_delete:
+                await self._soft_delete(ids, db_session=db_session)
+            else:
+                await self._batch_delete(
+                    getattr(self.entity, self.primary_key).in_(ids),
+                    db_session=db_session
+                )
+            await db_session.commit()
+        except Exception:
+            await db_session.rollback()
+            raise
+        await self.on_after_delete(entities, background_tasks=background_tasks)
+        return entities
+
+    def _supports_returning(
+        self,
+        db_session: AsyncSession,
+        soft_delete: Optional[bool] = False
+    ) -> bool:
+        dialect = db_session.get_bind().dialect
         if soft_delete:
-            await self._soft_delete(ids, db_session=db_session)
-        else:
-            await self._batch_delete(
-                getattr(self.entity, self.primary_key).in_(ids),
-                db_session=db_session
-            )
+            return dialect.update_returning
+        return dialect.delete_returning
+
+    async def _delete_many_returning(
+        self,
+        ids: List[ID_TYPE],
+        soft_delete: Optional[bool] = False,
+        background_tasks: Optional[BackgroundTasks] = None,
+        db_session: Optional[AsyncSession] = None
+    ) -> List[ModelType]:
+        primary_values = [
+            coerce_primary_value(self.entity, id) for id in ids
+        ]
+        try:
+            if soft_delete:
+                deleted = await self._soft_delete(
+                    primary_values,
+                    db_session=db_session,
+                    returning=True
+                )
+            else:
+                deleted = await self._batch_delete(
+                    getattr(self.entity, self.primary_key).in_(primary_values),
+                    db_session=db_session,
+                    returning=True
+                )
+            if len(deleted) != len(set(primary_values)):
+                raise NotFoundException()
+            mapper = self.entity.__mapper__
+            deleted = {
+                mapper.primary_key_from_instance(entity)[0]: entity
+                for entity in deleted
+            }
+            entities = [deleted[value] for value in primary_values]
+            # the rows are already gone, raising here still rolls them back
+            await self.on_before_delete(entities, background_tasks=background_tasks)
+            await db_session.commit()
+        except Exception:
+            await db_session.rollback()
+            raise
         await self.on_after_delete(entities, background_tasks=background_tasks)
         return entities
 
     @inject_db_session
+    @invalidate_result_cache
     async def crud_recover_one(
         self,
         request: Request,
@@ -560,6 +1842,66 @@ class SqlalchemyCrudService(
         await self.on_after_recover(entity, background_tasks=background_tasks)
         return entity
 
+    def _can_bulk_update(self, model_data_list: List[Dict[str, Any]]) -> bool:
+        # on_before_update needs the loaded entity
+        on_before_update = getattr(self.on_before_update, "__func__", None)
+        if on_before_update is not SqlalchemyCrudService.on_before_update:
+            return False
+        # the version of each row is checked and bumped by the unit of work
+        if self.entity.__mapper__.version_id_col is not None:
+            return False
+        column_attrs = self.entity.__mapper__.column_attrs
+        return all(
+            key in column_attrs and key != self.primary_key
+            for model_data in model_data_list for key in model_data
+        )
+
+    async def _bulk_update(
+        self,
+        ids: List[ID_TYPE],
+        model_data_list: List[Dict[str, Any]],
+        db_session: AsyncSession
+    ) -> List[ModelType]:
+        primary_values = [
+            coerce_primary_value(self.entity, id) for id in ids
+        ]
+        primary_field = getattr(self.entity, self.primary_key)
+        result = await db_session.execute(
+            select(primary_field).where(primary_field.in_(primary_values)))
+        if len(set(result.scalars().all())) != len(set(primary_values)):
+            raise NotFoundException()
+        mappings = [
+            {self.primary_key: primary_value, **model_data}
+            for primary_value, model_data in zip(primary_values, model_data_list)
+            if model_data
+        ]
+        if mappings:
+            # executemany UPDATE by primary key, the entities are not loaded
+            await db_session.execute(update(self.entity), mappings)
+        return await self._get_many(ids, db_session)
+
+    async def _get_many(
+        self,
+        ids: List[ID_TYPE],
+        db_session: AsyncSession,
+        options: Optional[Sequence[ORMOption]] = None
+    ) -> List[Optional[ModelType]]:
+        mapper = self.entity.__mapper__
+        primary_values = [
+            coerce_primary_value(self.entity, id) for id in ids
+        ]
+        stmt = select(self.entity).where(
+            getattr(self.entity, self.primary_key).in_(primary_values)
+        ).execution_options(populate_existing=True)
+        if options:
+            stmt = stmt.options(*options)
+        result = await db_session.execute(stmt)
+        entities = {
+            mapper.primary_key_from_instance(entity)[0]: entity
+            for entity in result.unique().scalars().all()
+        }
+        return [entities.get(value) for value in primary_values]
+
     def _guess_should_load_relationship_fields(self, model_data: Dict):
         relationships = self.entity.__mapper__.relationships
         relationship_keys = []
@@ -574,12 +1916,20 @@ class SqlalchemyCrudService(
                     relationship_keys.append(key)
         return relationship_keys
 
-    async def _batch_delete(self, stmt, db_session: AsyncSession):
+    async def _batch_delete(
+        self,
+        stmt,
+        db_session: AsyncSession,
+        returning: Optional[bool] = False
+    ) -> Optional[List[ModelType]]:
         if not isinstance(stmt, list):
             stmt = [stmt]
         statement = delete(self.entity).where(*stmt)
-        await db_session.execute(statement)
-        await db_session.commit()
+        if not returning:
+            await db_session.execute(statement)
+            return None
+        result = await db_session.execute(statement.returning(self.entity))
+        return result.scalars().all()
 
     async def _get(
         self,
@@ -592,15 +1942,21 @@ class SqlalchemyCrudService(
     async def _soft_delete(
         self,
         id_list: List[Union[int, str]],
-        db_session: AsyncSession
-    ):
+        db_session: AsyncSession,
+        returning: Optional[bool] = False
+    ) -> Optional[List[ModelType]]:
         stmt = update(self.entity).where(
             getattr(self.entity, self.primary_key)
             .in_(id_list)).values({
                 BetterCrudGlobalConfig.soft_deleted_field_key: datetime.now().replace(microsecond=0)
             })
-        await db_session.execute(stmt)
-        await db_session.commit()
+        if not returning:
+            await db_session.execute(stmt)
+            return None
+        result = await db_session.execute(
+            stmt.returning(self.entity).execution_options(populate_existing=True)
+        )
+        return result.scalars().all()
 
     async def on_before_create(
         self,
@@ -617,6 +1973,32 @@ class SqlalchemyCrudService(
     ) -> None:
         pass
 
+    async def on_before_create_many(
+        self,
+        models: List[CreateSchemaType],
+        background_tasks: Optional[BackgroundTasks] = None
+    ) -> Union[List[Union[Dict[str, Any], None]], None]:
+        return [
+            await self.on_before_create(
+                model,
+                background_tasks=background_tasks
+            )
+            for model in models
+        ]
+
+    async def on_after_create_many(
+        self,
+        entities: List[ModelType],
+        models: List[CreateSchemaType],
+        background_tasks: Optional[BackgroundTasks] = None
+    ) -> None:
+        for entity, model in zip(entities, models):
+            await self.on_after_create(
+                entity,
+                model=model,
+                background_tasks=background_tasks
+            )
+
     async def on_before_update(
         self,
         entity: ModelType,
@@ -662,77 +2044,53 @@ class SqlalchemyCrudService(
         pass
 
     def build_query_expression(self, field, operator, value):
-        if operator == "$eq":
-            return field == value
-        elif operator == "$ne":
-            return field != value
-        elif operator == "$gt":
-            return field > value
-        elif operator == "$gte":
-            return field >= value
-        elif operator == "$lt":
-            return field < value
-        elif operator == "$lte":
-            return field <= value
-        elif operator == "$cont":
-            return field.like('%{}%'.format(value))
-        elif operator == "$excl":
-            return field.notlike('%{}%'.format(value))
-        elif operator == "$starts":
-            return field.startswith(value)
-        elif operator == "$ends":
-            return field.endswith(value)
-        elif operator == "$notstarts":
-            return field.notlike('{}%'.format(value))
-        elif operator == "$notends":
-            return field.notlike('%{}'.format(value))
-        elif operator == "$isnull":
-            return field.is_(None)
-        elif operator == "$notnull":
-            return field.isnot(None)
-        elif operator == "$in":
-            return field.in_(value.split(","))
-        elif operator == "$notin":
-            return field.notin_(value.split(","))
-        elif operator == "$between":
-            return field.between(*value.split(","))
-        elif operator == "$notbetween":
-            return ~field.between(*value.split(","))
-        elif operator == "$length":
-            return func.length(field) == int(value)
-        elif operator == "$any":
-            primary_key = self.get_field_primary_key(field)
-            if not primary_key:
-                raise NotSupportRelationshipQueryException(operator)
-            return field.any(**{primary_key: value})
-        elif operator == "$notany":
-            primary_key = self.get_field_primary_key(field)
-            if not primary_key:
-                raise NotSupportRelationshipQueryException(operator)
-            return func.not_(field.any(**{primary_key: value}))
-        elif operator == "$startsL":
-            return field.istartswith(value)
-        elif operator == "$endsL":
-            return field.iendswith(value)
-        elif operator == "$contL":
-            return field.ilike('%{}%'.format(value))
-        elif operator == "$exclL":
-            return field.notilike('%{}%'.format(value))
-        elif operator == "$eqL":
-            return func.lower(field) == value
-        elif operator == "$neL":
-            return func.lower(field) != value
-        elif operator == "$inL":
-            return func.lower(field).in_(value.split(","))
-        elif operator == "$notinL":
-            return func.lower(field).notin_(value.split(","))
-        else:
+        operator_fn = get_operator(operator)
+        if operator_fn is None:
             raise NotSupportOperatorException(operator)
+        return operator_fn(field, _typed_bind(field, value))
 
     def get_model_field(
         self,
         field,
         joins: Optional[JoinOptions] = None
+    ):
+        model_field = self.field_index.get(field)
+        if model_field is None:
+            if field.count(".") <= self.field_index_depth:
+                raise InvalidFieldException(field)
+            # deeper than the index
+            return self._resolve_model_field(field, joins)
+        if joins and "." in field and self._is_aliased_field(field, joins):
+            return self._resolve_model_field(field, joins)
+        return model_field
+
+    def _is_aliased_field(self, field: str, joins: JoinOptions) -> bool:
+        field_parts = field.split(".")
+        for index in range(1, len(field_parts)):
+            config = joins.get(".".join(field_parts[0:index]))
+            if config and config.alias:
+                return True
+        return False
+
+    def validate_fields(
+        self,
+        search: Optional[Union[Dict, SearchNode]] = None,
+        sorts: Optional[List[QuerySortDict]] = None
+    ) -> None:
+        """Raise `InvalidFieldException` for an unknown search or sort field"""
+        fields = [sort["field"] for sort in sorts or []]
+        fields.extend(
+            leaf.field for leaf in iter_search_leaves(build_search_tree(search))
+        )
+        for field in fields:
+            if field not in self.field_index \
+                    and field.count(".") <= self.field_index_depth:
+                raise InvalidFieldException(field)
+
+    def _resolve_model_field(
+        self,
+        field,
+        joins: Optional[JoinOptions] = None
     ):
         field_parts = field.split(".")
         model_field = None
@@ -749,6 +2107,8 @@ class SqlalchemyCrudService(
                     model_field = getattr(relation_cls, field_part, None)
                     if index == len(field_parts)-1:
                         break
+                if field_part not in relationships:
+                    raise InvalidFieldException(field)
                 relation_cls = relationships[field_part].mapper.entity
                 relationships = relation_cls.__mapper__.relationships
         else:
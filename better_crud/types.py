@@ -23,7 +23,10 @@ RoutesEnumType = Literal[
     "update_one",
     "update_many",
     "delete_many",
-    "recover_one"
+    "recover_one",
+    "export",
+    "aggregate",
+    "facets"
 ]
 
 BackendType = Literal[
@@ -31,6 +34,52 @@ BackendType = Literal[
     "custom"
 ]
 
+CountMode = Literal[
+    "exact",
+    "none",
+    "estimate",
+    "window"
+]
+
+ExportFormat = Literal[
+    "ndjson",
+    "csv"
+]
+
+AggregateFunction = Literal[
+    "count",
+    "sum",
+    "avg",
+    "min",
+    "max"
+]
+
+DateBucket = Literal[
+    "year",
+    "month",
+    "week",
+    "day",
+    "hour"
+]
+
+ReadMode = Literal[
+    "orm",
+    "core"
+]
+
+ReadStrategy = Literal[
+    "round_robin",
+    "least_busy"
+]
+
+JoinStrategy = Literal[
+    "joined",
+    "selectin",
+    "subquery",
+    "raise",
+    "auto"
+]
+
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 ID_TYPE = Union[int, str]
@@ -66,6 +115,9 @@ class RoutesModelDict(TypedDict, total=False):
     update_many: Optional[RouteOptionsDict] = None
     delete_many: Optional[RouteOptionsDict] = None
     recover_one: Optional[RouteOptionsDict] = None
+    export: Optional[RouteOptionsDict] = None
+    aggregate: Optional[RouteOptionsDict] = None
+    facets: Optional[RouteOptionsDict] = None
 
 
 class QueryCriterion(TypedDict, total=False):
@@ -79,6 +131,21 @@ class QuerySortDict(TypedDict):
     sort: Literal["ASC", "DESC"]
 
 
+class QueryGroupByDict(TypedDict):
+    field: str
+    bucket: Optional[DateBucket]
+
+
+class QueryMetricDict(TypedDict):
+    function: AggregateFunction
+    field: Optional[str]
+
+
+class FacetValueDict(TypedDict):
+    value: Any
+    count: int
+
+
 class PathParamDict(TypedDict):
     field: str
     type: Literal["str", "int"]
@@ -88,6 +155,17 @@ class GlobalQueryOptionsDict(TypedDict, total=False):
     soft_delete: Optional[bool] = False
     sort: Optional[List[QuerySortDict]] = None
     allow_include_deleted: Optional[bool] = False
+    count_mode: Optional[CountMode] = "exact"
+    read_mode: Optional[ReadMode] = "orm"
+    delete_returning: Optional[bool] = False
+    etag: Optional[bool] = False
+
+
+class SearchLimitsDict(TypedDict, total=False):
+    max_depth: Optional[int] = 10
+    max_breadth: Optional[int] = 100
+    max_in_size: Optional[int] = 1000
+    max_length: Optional[int] = 65536
 
 
 class QueryDelimOptionsDict(TypedDict, total=False):
@@ -101,6 +179,8 @@ class JoinOptionsDict(TypedDict, total=False):
     select_only_detail: Optional[bool] = False
     additional_filter_fn: Optional[Callable[[Any], List[Any]]] = None
     alias: Optional[Any] = None
+    exists: Optional[bool] = False
+    strategy: Optional[JoinStrategy] = "joined"
 
 
 class QueryOptionsDict(TypedDict, total=False):
@@ -108,8 +188,16 @@ class QueryOptionsDict(TypedDict, total=False):
     soft_delete: Optional[bool] = None
     allow_include_deleted: Optional[bool] = False
     allow_recover: Optional[bool] = False
+    allow_export: Optional[bool] = False
+    allow_aggregate: Optional[bool] = False
+    allow_facets: Optional[bool] = False
     filter: Union[Optional[Dict], Callable[[Any], Dict]] = None
     sort: Optional[List[QuerySortDict]] = None
+    count_mode: Optional[CountMode] = "exact"
+    read_mode: Optional[ReadMode] = "orm"
+    delete_returning: Optional[bool] = False
+    etag: Optional[bool] = False
+    allow_fields: Optional[List[str]] = None
 
 
 class AuthModelDict(TypedDict, total=False):
@@ -132,10 +220,18 @@ class SerializeModelDict(TypedDict, total=False):
     update_many: Optional[Any] = None
     delete_many: Optional[Any] = None
     recover_one: Optional[Any] = None
+    export: Optional[Any] = None
+    aggregate: Optional[Any] = None
+    facets: Optional[Any] = None
 
 
-class SqlalchemyBackendDict(TypedDict):
+class SqlalchemyBackendDict(TypedDict, total=False):
     db_session: DBSessionFactory
+    read_db_session: Optional[
+        Union[DBSessionFactory, List[DBSessionFactory]]] = None
+    read_strategy: Optional[ReadStrategy] = "round_robin"
+    concurrent_queries: Optional[bool] = False
+    concurrent_queries_limit: Optional[int] = 10
 
 
 class BackendConfigDict(TypedDict):
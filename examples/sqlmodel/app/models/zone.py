@@ -1,5 +1,7 @@
 from typing import Optional, List, TYPE_CHECKING
-from sqlmodel import Field, SQLModel
+from sqlmodel import Field, SQLModel, Column, Integer
+
+version_column = Column("version", Integer, nullable=False)
 
 
 class ZoneBase(SQLModel):
@@ -10,6 +12,9 @@ class ZoneBase(SQLModel):
 
 class Zone(ZoneBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
+    version: Optional[int] = Field(default=None, sa_column=version_column)
+
+    __mapper_args__ = {"version_id_col": version_column}
 
 
 
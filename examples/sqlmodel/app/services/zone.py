@@ -0,0 +1,7 @@
+from better_crud.service.sqlalchemy import SqlalchemyCrudService
+from app.models.zone import Zone
+
+
+class ZoneService(SqlalchemyCrudService[Zone]):
+    def __init__(self):
+        super().__init__(Zone)
@@ -451,6 +451,207 @@ def disabled_pagination_client(
         yield test_client
 
 
+@pytest.fixture
+def cursor_pagination_client(
+    async_session
+):
+    app = FastAPI()
+    BetterCrudGlobalConfig.init(
+        backend_config={
+            "sqlalchemy": {
+                "db_session": lambda: async_session
+            }
+        },
+        pagination_mode="cursor"
+    )
+    user_router = APIRouter()
+
+    @crud(
+        user_router,
+        feature="user",
+        serialize={
+            "base": UserPublic,
+        }
+    )
+    class UserController():
+        service: UserService = Depends(UserService)
+    api_router = APIRouter()
+    api_router.include_router(user_router, prefix="/user")
+    app.include_router(api_router)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def count_mode_client(
+    async_session
+):
+    app = FastAPI()
+    BetterCrudGlobalConfig.init(
+        backend_config={
+            "sqlalchemy": {
+                "db_session": lambda: async_session
+            }
+        }
+    )
+    api_router = APIRouter()
+    for count_mode in ["exact", "none", "estimate", "window"]:
+        user_router = APIRouter()
+
+        @crud(
+            user_router,
+            feature="user",
+            query={
+                "count_mode": count_mode
+            },
+            serialize={
+                "base": UserPublic,
+            }
+        )
+        class UserController():
+            service: UserService = Depends(UserService)
+        api_router.include_router(user_router, prefix=f"/{count_mode}/user")
+    app.include_router(api_router)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def read_mode_client(
+    async_session
+):
+    app = FastAPI()
+    BetterCrudGlobalConfig.init(
+        backend_config={
+            "sqlalchemy": {
+                "db_session": lambda: async_session
+            }
+        }
+    )
+    api_router = APIRouter()
+    for read_mode in ["orm", "core"]:
+        user_router = APIRouter()
+
+        @crud(
+            user_router,
+            feature="user",
+            query={
+                "read_mode": read_mode
+            },
+            serialize={
+                "base": UserPublic,
+            }
+        )
+        class UserController():
+            service: UserService = Depends(UserService)
+        api_router.include_router(user_router, prefix=f"/{read_mode}/user")
+    app.include_router(api_router)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def export_client(
+    async_session
+):
+    app = FastAPI()
+    BetterCrudGlobalConfig.init(
+        backend_config={
+            "sqlalchemy": {
+                "db_session": lambda: async_session
+            }
+        }
+    )
+    user_router = APIRouter()
+
+    @crud(
+        user_router,
+        feature="user",
+        query={
+            "soft_delete": True,
+            "allow_export": True
+        },
+        serialize={
+            "base": UserPublic,
+        }
+    )
+    class UserController():
+        service: UserService = Depends(UserService)
+    app.include_router(user_router, prefix="/user")
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def aggregate_client(
+    async_session
+):
+    app = FastAPI()
+    BetterCrudGlobalConfig.init(
+        backend_config={
+            "sqlalchemy": {
+                "db_session": lambda: async_session
+            }
+        }
+    )
+    user_router = APIRouter()
+
+    @crud(
+        user_router,
+        feature="user",
+        query={
+            "soft_delete": True,
+            "allow_aggregate": True
+        },
+        auth={
+            "filter": lambda request: {"company_id": {"$in": [1, 2]}}
+        },
+        serialize={
+            "base": UserPublic,
+        }
+    )
+    class UserController():
+        service: UserService = Depends(UserService)
+    app.include_router(user_router, prefix="/user")
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def facets_client(
+    async_session
+):
+    app = FastAPI()
+    BetterCrudGlobalConfig.init(
+        backend_config={
+            "sqlalchemy": {
+                "db_session": lambda: async_session
+            }
+        }
+    )
+    user_router = APIRouter()
+
+    @crud(
+        user_router,
+        feature="user",
+        query={
+            "soft_delete": True,
+            "allow_facets": True
+        },
+        auth={
+            "filter": lambda request: {"company_id": {"$in": [1, 2]}}
+        },
+        serialize={
+            "base": UserPublic,
+        }
+    )
+    class UserController():
+        service: UserService = Depends(UserService)
+    app.include_router(user_router, prefix="/user")
+    with TestClient(app) as test_client:
+        yield test_client
+
+
 @pytest.fixture
 def per_route_override_client(
     async_session
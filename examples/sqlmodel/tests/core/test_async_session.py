@@ -2,12 +2,17 @@ import pytest
 from typing import AsyncGenerator
 from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import AsyncSession
-from better_crud import BetterCrudGlobalConfig, crud
+from better_crud import BetterCrudGlobalConfig, crud, crud_action
+from better_crud.service.sqlalchemy import share_db_session, db_session_scope
+from better_crud.service.sqlalchemy.helper import concurrent_db_session
 from fastapi.testclient import TestClient
-from fastapi import FastAPI, Depends, APIRouter
+from fastapi import FastAPI, Depends, APIRouter, Request
+from fastapi_pagination import Params, set_params
 from examples.sqlmodel.tests.helper import setup_database
 from app.services.user import UserService
 from app.models.user import UserPublic
+from app.services.role import RoleService
+from app.models.role import Role, RolePublic, RoleCreate, RoleUpdate
 
 
 @pytest.mark.asyncio
@@ -72,3 +77,335 @@ async def test_async_session(async_session):
         response = test_client.get("/user")
         data = response.json()
         assert len(data) == 0
+
+
+@pytest.mark.asyncio
+async def test_share_db_session():
+    opened_sessions = []
+
+    async def async_session() -> AsyncGenerator[AsyncSession, None]:  # pragma: no cover
+        # every session is a new in-memory database
+        async with setup_database("sqlite+aiosqlite:///:memory:") as session:
+            opened_sessions.append(session)
+            yield session
+
+    app = FastAPI()
+    BetterCrudGlobalConfig.init(
+        backend_config={
+            "sqlalchemy": {
+                "db_session": async_session
+            }
+        }
+    )
+    role_router = APIRouter(dependencies=[Depends(share_db_session)])
+
+    @crud(
+        role_router,
+        feature="role",
+        routes={
+            "only": ["get_many"]
+        },
+        serialize={
+            "base": RolePublic,
+        }
+    )
+    class RoleController():
+        service: RoleService = Depends(RoleService)
+
+        @crud_action(method="POST", path="/copy", response_model=RolePublic)
+        async def copy(self, request: Request):
+            role = await self.service.crud_create_one(
+                request, RoleCreate(name="admin", description="admin"))
+            await self.service.crud_update_one(
+                request, role.id, RoleUpdate(name="admin copy", description="admin"))
+            return await self.service.crud_get_one(request, role.id)
+    app.include_router(role_router, prefix="/role")
+    with TestClient(app) as test_client:
+        response = test_client.post("/role/copy")
+        assert response.status_code == 200
+        assert response.json()["name"] == "admin copy"
+        assert len(opened_sessions) == 1
+        response = test_client.get("/role")
+        assert response.json() == []
+        assert len(opened_sessions) == 2
+
+
+def _create_role_app(
+    db_session,
+    read_db_session=None,
+    read_strategy="round_robin",
+    **sqlalchemy_config
+):
+    app = FastAPI()
+    BetterCrudGlobalConfig.init(
+        backend_config={
+            "sqlalchemy": {
+                "db_session": db_session,
+                "read_db_session": read_db_session,
+                "read_strategy": read_strategy,
+                **sqlalchemy_config
+            }
+        }
+    )
+    role_router = APIRouter()
+
+    @crud(
+        role_router,
+        feature="role",
+        routes={
+            "only": ["get_many", "get_one", "create_one"]
+        },
+        dto={
+            "create": RoleCreate
+        },
+        serialize={
+            "base": RolePublic,
+        }
+    )
+    class RoleController():
+        service: RoleService = Depends(RoleService)
+
+        @crud_action(method="POST", path="/copy", response_model=RolePublic)
+        async def copy(self, request: Request):
+            role = await self.service.crud_create_one(
+                request, RoleCreate(name="admin", description="admin"))
+            return await self.service.crud_get_one(request, role.id)
+    app.include_router(role_router, prefix="/role")
+    return app
+
+
+@pytest.mark.asyncio
+async def test_read_db_session(async_session):
+    async with setup_database("sqlite+aiosqlite:///:memory:") as replica_session:
+        app = _create_role_app(
+            lambda: async_session,
+            lambda: replica_session
+        )
+        with TestClient(app) as test_client:
+            response = test_client.post(
+                "/role", json={"name": "admin", "description": "admin"})
+            assert response.status_code == 200
+            # the replica did not receive the write
+            assert test_client.get("/role").json() == []
+            assert test_client.get("/role/1").status_code == 404
+            # reads that follow a write of the request use the primary
+            response = test_client.post("/role/copy")
+            assert response.status_code == 200
+            assert response.json()["name"] == "admin"
+        replica_session.add(Role(name="replica", description="replica"))
+        await replica_session.commit()
+        with TestClient(app) as test_client:
+            assert test_client.get("/role").json()[0]["name"] == "replica"
+
+
+@pytest.mark.asyncio
+async def test_read_db_session_after_scope(async_session, test_request):
+    async with setup_database("sqlite+aiosqlite:///:memory:") as replica_session:
+        _create_role_app(
+            lambda: async_session,
+            lambda: replica_session
+        )
+        role_service = RoleService()
+        async with db_session_scope():
+            role = await role_service.crud_create_one(
+                test_request, RoleCreate(name="admin", description="admin"))
+            # reads of the scope that wrote use the primary
+            assert (await role_service.crud_get_one(test_request, role.id)).name == "admin"
+        # once the scope exits, reads of the same context use the replica
+        assert await role_service.crud_get_many(test_request) == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("read_strategy", ["round_robin", "least_busy"])
+async def test_read_db_session_strategy(async_session, read_strategy):
+    used_replicas = []
+
+    def create_replica(name):
+        async def replica() -> AsyncGenerator[AsyncSession, None]:
+            used_replicas.append(name)
+            yield async_session
+        return replica
+
+    app = _create_role_app(
+        lambda: async_session,
+        [create_replica("replica_1"), create_replica("replica_2")],
+        read_strategy
+    )
+    with TestClient(app) as test_client:
+        for _ in range(4):
+            assert test_client.get("/role").status_code == 200
+    if read_strategy == "round_robin":
+        assert sorted(used_replicas) == [
+            "replica_1", "replica_1", "replica_2", "replica_2"]
+    else:
+        # sequential reads always find the first replica idle
+        assert used_replicas == ["replica_1"] * 4
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("concurrent_queries_limit", [10, 0])
+async def test_concurrent_queries(tmp_path, concurrent_queries_limit):
+    opened_sessions = []
+    async with setup_database(f"sqlite+aiosqlite:///{tmp_path}/db.sqlite") as session:
+        session.add_all([
+            Role(name=f"role_{index}", description="role") for index in range(5)
+        ])
+        await session.commit()
+
+        async def db_session() -> AsyncGenerator[AsyncSession, None]:
+            async with AsyncSession(session.bind) as new_session:
+                opened_sessions.append(new_session)
+                yield new_session
+
+        app = _create_role_app(
+            db_session,
+            concurrent_queries=True,
+            concurrent_queries_limit=concurrent_queries_limit
+        )
+        with TestClient(app) as test_client:
+            response = test_client.get("/role", params={"page": 2, "size": 2})
+            assert response.status_code == 200
+            data = response.json()
+            assert data["total"] == 5
+            assert [item["name"] for item in data["items"]] == ["role_2", "role_3"]
+    # the count ran on a session of its own, unless the limit is reached
+    assert len(opened_sessions) == (2 if concurrent_queries_limit else 1)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_same_session(async_session, init_data):
+    # a factory returning the request session can not run them concurrently
+    app = _create_role_app(lambda: async_session, concurrent_queries=True)
+    with TestClient(app) as test_client:
+        response = test_client.get("/role", params={"page": 1, "size": 2})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 3
+        assert len(data["items"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_pending_changes(async_session, init_data):
+    _create_role_app(
+        lambda: AsyncSession(async_session.bind),
+        concurrent_queries=True
+    )
+    async with AsyncSession(async_session.bind) as db_session:
+        # a transaction that only read does not prevent it
+        await db_session.get(Role, 1)
+        async with concurrent_db_session(db_session) as other_db_session:
+            assert other_db_session is not None
+            await other_db_session.close()
+        # another session would not see the changes of db_session
+        db_session.add(Role(name="pending", description="pending"))
+        async with concurrent_db_session(db_session) as other_db_session:
+            assert other_db_session is None
+        await db_session.flush()
+        assert not db_session.new
+        async with concurrent_db_session(db_session) as other_db_session:
+            assert other_db_session is None
+        await db_session.rollback()
+        async with concurrent_db_session(db_session) as other_db_session:
+            assert other_db_session is not None
+            await other_db_session.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_same_replica(tmp_path):
+    used_replicas = []
+    async with setup_database(f"sqlite+aiosqlite:///{tmp_path}/db.sqlite") as session:
+        session.add_all([
+            Role(name=f"role_{index}", description="role") for index in range(5)
+        ])
+        await session.commit()
+
+        def create_replica(name):
+            async def replica() -> AsyncGenerator[AsyncSession, None]:
+                async with AsyncSession(session.bind) as new_session:
+                    used_replicas.append(name)
+                    yield new_session
+            return replica
+
+        app = _create_role_app(
+            lambda: session,
+            [create_replica("replica_1"), create_replica("replica_2")],
+            concurrent_queries=True
+        )
+        with TestClient(app) as test_client:
+            for _ in range(2):
+                response = test_client.get("/role", params={"page": 1, "size": 2})
+                assert response.json()["total"] == 5
+    # the page and the count of a request read the same replica
+    assert used_replicas[0::2] == used_replicas[1::2]
+    assert sorted(used_replicas) == [
+        "replica_1", "replica_1", "replica_2", "replica_2"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_shared_scope(tmp_path):
+    opened_sessions = []
+    async with setup_database(f"sqlite+aiosqlite:///{tmp_path}/db.sqlite") as session:
+        session.add_all([
+            Role(name=f"role_{index}", description="role") for index in range(5)
+        ])
+        await session.commit()
+
+        async def db_session() -> AsyncGenerator[AsyncSession, None]:
+            async with AsyncSession(session.bind) as new_session:
+                opened_sessions.append(new_session)
+                yield new_session
+
+        BetterCrudGlobalConfig.init(
+            backend_config={
+                "sqlalchemy": {
+                    "db_session": db_session,
+                    "concurrent_queries": True
+                }
+            }
+        )
+        app = FastAPI()
+        role_router = APIRouter(dependencies=[Depends(share_db_session)])
+
+        @crud(
+            role_router,
+            feature="role",
+            routes={
+                "only": ["get_many"]
+            },
+            serialize={
+                "base": RolePublic,
+            }
+        )
+        class RoleController():
+            service: RoleService = Depends(RoleService)
+
+            @crud_action(method="GET", path="/first")
+            async def first(self, request: Request):
+                role = await self.service.crud_get_one(request, 1)
+                set_params(Params(page=1, size=2))
+                page = await self.service.crud_get_many(request)
+                return {"name": role.name, "total": page.total}
+        app.include_router(role_router, prefix="/role")
+        with TestClient(app) as test_client:
+            response = test_client.get("/role/first")
+            assert response.status_code == 200
+            assert response.json() == {"name": "role_0", "total": 5}
+    # the count ran on a session of its own although the shared one had read
+    assert len(opened_sessions) == 2
+
+
+def test_plain_db_session_factory_left_open(async_session, init_data):
+    closed_sessions = []
+
+    class DBSession(AsyncSession):
+        async def close(self):
+            closed_sessions.append(self)
+            await super().close()
+
+    db_session = DBSession(async_session.bind)
+    app = _create_role_app(lambda: db_session)
+    with TestClient(app) as test_client:
+        response = test_client.get("/role/1")
+        assert response.status_code == 200
+    # the session belongs to the caller of the factory
+    assert closed_sessions == []
@@ -50,3 +50,50 @@ def test_custom_response_schema(async_session):
     with TestClient(app) as test_client:
         response = test_client.get("/user")
         assert response.json() == {'code': 200, 'msg': 'success', 'data': []}
+
+
+def _create_user_app(async_session, fast_response):
+    app = FastAPI()
+    BetterCrudGlobalConfig.init(
+        response_schema=ResponseModel,
+        fast_response=fast_response,
+        backend_config={
+            "sqlalchemy": {
+                "db_session": lambda: async_session
+            }
+        }
+    )
+    user_router = APIRouter()
+
+    @crud(
+        user_router,
+        feature="user",
+        routes={
+            "only": ["get_many", "get_one"]
+        },
+        serialize={
+            "base": UserPublic,
+        }
+    )
+    class UserController():
+        service: UserService = Depends(UserService)
+    app.include_router(user_router, prefix="/user")
+    return app
+
+
+def test_fast_response(async_session, init_data):
+    responses = []
+    for fast_response in [False, True]:
+        app = _create_user_app(async_session, fast_response)
+        with TestClient(app) as test_client:
+            responses.append([
+                test_client.get("/user"),
+                test_client.get("/user", params={"page": 1, "size": 2}),
+                test_client.get("/user/1"),
+            ])
+    for response, fast_response in zip(*responses):
+        assert fast_response.status_code == 200
+        assert fast_response.headers["content-type"] == "application/json"
+        assert fast_response.json() == response.json()
+    assert responses[1][1].json()["data"]["total"] == 4
+    assert "hashed_password" not in responses[1][2].json()["data"]
@@ -0,0 +1,100 @@
+import pytest
+import json
+from better_crud.exceptions import InvalidSearchException
+from better_crud.models import SearchLimits
+from better_crud.search import (
+    And,
+    Or,
+    Leaf,
+    build_search_tree,
+    search_tree_to_dict,
+    parse_search_spec
+)
+
+
+def test_build_search_tree():
+    search = {
+        "user_name": "bob",
+        "age": {"$gt": 10, "$or": {"$isnull": True, "$lt": 5}},
+        "$or": [{"email": {"$cont": "bob"}}, {"is_active": True}]
+    }
+    assert build_search_tree(search) == And((
+        Leaf("user_name", "$eq", "bob"),
+        And((
+            Leaf("age", "$gt", 10),
+            Or((Leaf("age", "$isnull", True), Leaf("age", "$lt", 5)), "age")
+        ), "age"),
+        Or((
+            And((Leaf("email", "$cont", "bob"),), "email"),
+            Leaf("is_active", "$eq", True)
+        ))
+    ))
+
+
+@pytest.mark.parametrize(
+    "search",
+    [
+        {"user_name": {"$eq": "bob"}},
+        {"$and": [{"user_name": {"$eq": "bob"}}, {"age": {"$in": [1, 2]}}]},
+        {"$or": [{"user_name": {"$eq": "bob"}}, {"age": {"$or": {"$gt": 1, "$lt": 0}}}]},
+        {"age": {"$gt": 1, "$or": {"$isnull": True, "$eq": 0}}},
+    ]
+)
+def test_search_tree_to_dict(search):
+    search_tree = build_search_tree(search)
+    assert search_tree_to_dict(search_tree) == search
+    assert build_search_tree(search_tree_to_dict(search_tree)) == search_tree
+
+
+@pytest.mark.parametrize(
+    "search",
+    [
+        {"$and": {"user_name": "bob"}},
+        {"$and": ["bob"]},
+        {"user_name": {"$eq": {"$gt": 1}}},
+        {"user_name": {"$in": [[1, 2]]}},
+    ]
+)
+def test_build_search_tree_malformed(search):
+    with pytest.raises(InvalidSearchException):
+        build_search_tree(search)
+
+
+@pytest.mark.parametrize(
+    "search,limits",
+    [
+        (
+            {"$and": [{"$and": [{"$and": [{"user_name": "bob"}]}]}]},
+            SearchLimits(max_depth=2)
+        ),
+        (
+            {"$or": [{"user_name": name} for name in "abc"]},
+            SearchLimits(max_breadth=2)
+        ),
+        (
+            {"user_name": {f"$op{index}": "bob" for index in range(3)}},
+            SearchLimits(max_breadth=2)
+        ),
+        ({"id": {"$in": "1,2,3"}}, SearchLimits(max_in_size=2)),
+        ({"id": {"$notin": [1, 2, 3]}}, SearchLimits(max_in_size=2)),
+    ]
+)
+def test_build_search_tree_limits(search, limits):
+    build_search_tree(search)
+    with pytest.raises(InvalidSearchException):
+        build_search_tree(search, limits)
+
+
+def test_parse_search_spec_cache():
+    raw_search_spec = json.dumps({"user_name": "cached"})
+    limits = SearchLimits()
+    hits = parse_search_spec.cache_info().hits
+    search_tree = parse_search_spec(raw_search_spec, limits)
+    assert parse_search_spec(raw_search_spec, limits) is search_tree
+    assert parse_search_spec.cache_info().hits == hits + 1
+
+
+def test_parse_search_spec_max_length():
+    raw_search_spec = json.dumps({"user_name": "x" * 100})
+    with pytest.raises(InvalidSearchException):
+        parse_search_spec(raw_search_spec, SearchLimits(max_length=50))
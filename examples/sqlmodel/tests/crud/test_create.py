@@ -1,6 +1,6 @@
 import pytest
 from typing import List
-from sqlalchemy import select
+from sqlalchemy import select, event
 from sqlalchemy.orm import joinedload
 from app.models.user import User, UserCreate,UserCreateWithRolesDict
 from app.models.role import RoleCreate, Role
@@ -9,6 +9,7 @@ from app.models.user_task import UserTaskCreateWithoutId
 from app.services.user import UserService
 from app.services.role import RoleService
 from app.services.user_task import UserTaskService
+from better_crud.exceptions import RelationNotFoundException
 
 
 @pytest.mark.asyncio
@@ -223,3 +224,44 @@ async def test_create_many_atomic_rollback(async_session, test_request, test_use
     result = await async_session.execute(stmt)
     fetched_records = result.unique().scalars().all()
     assert len(fetched_records) == 0
+
+
+@pytest.mark.asyncio
+async def test_create_many_by_many_to_many_batched(async_session, test_request, test_user_data, test_role_data):
+    user_service = UserService()
+    for role_data in test_role_data:
+        async_session.add(Role(**role_data))
+    await async_session.commit()
+    async_session.expunge_all()
+    new_data = [
+        UserCreate(**item, roles=item["role_ids"]) for item in test_user_data
+    ]
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = async_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        users = await user_service.crud_create_many(test_request, new_data, db_session=async_session)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    role_selects = [
+        statement for statement in statements
+        if statement.startswith("SELECT") and "FROM role" in statement
+    ]
+    assert len(role_selects) == 1
+    for user, item in zip(users, test_user_data):
+        assert [role.id for role in user.roles] == item["role_ids"]
+
+
+@pytest.mark.asyncio
+async def test_create_by_many_to_many_not_found(async_session, test_request, test_user_data, test_role_data):
+    user_service = UserService()
+    for role_data in test_role_data:
+        async_session.add(Role(**role_data))
+    await async_session.commit()
+    new_data = UserCreate(**test_user_data[0], roles=[1, 99])
+    with pytest.raises(RelationNotFoundException):
+        await user_service.crud_create_one(test_request, new_data, db_session=async_session)
@@ -1,5 +1,5 @@
 import pytest
-from sqlalchemy import select
+from sqlalchemy import select, event
 from better_crud.exceptions import NotFoundException
 from app.models.user import User
 from app.services.user import UserService
@@ -64,3 +64,66 @@ async def test_recover_non_existent_record(async_session, test_user_data, test_r
     non_existent_id = 1000
     with pytest.raises(NotFoundException):
         await user_service.crud_recover_one(test_request, non_existent_id, db_session=async_session)
+
+
+def _capture_statements(async_session):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = async_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    return statements, lambda: event.remove(
+        engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("soft_delete", [False, True])
+async def test_delete_returning(async_session, test_user_data, test_request, init_data, soft_delete):
+    user_service = UserService()
+    ids = [test_user_data[1]["id"], test_user_data[0]["id"]]
+    statements, remove = _capture_statements(async_session)
+    try:
+        entities = await user_service.crud_delete_many(
+            test_request,
+            ids,
+            soft_delete=soft_delete,
+            returning=True,
+            db_session=async_session
+        )
+    finally:
+        remove()
+    assert [entity.id for entity in entities] == ids
+    assert len(statements) == 1
+    assert "RETURNING" in statements[0]
+    stmt = select(User).where(User.id.in_(ids))
+    stmt = stmt.execution_options(populate_existing=True)
+    result = await async_session.execute(stmt)
+    fetched_records = result.scalars().all()
+    if soft_delete:
+        assert all(item.deleted_at is not None for item in fetched_records)
+        assert all(entity.deleted_at is not None for entity in entities)
+    else:
+        assert fetched_records == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("soft_delete", [False, True])
+async def test_delete_returning_non_existent_record(async_session, test_user_data, test_request, init_data, soft_delete):
+    user_service = UserService()
+    exist_user_id = test_user_data[0]["id"]
+    with pytest.raises(NotFoundException):
+        await user_service.crud_delete_many(
+            test_request,
+            [exist_user_id, 1000],
+            soft_delete=soft_delete,
+            returning=True,
+            db_session=async_session
+        )
+    stmt = select(User).where(User.id == exist_user_id)
+    stmt = stmt.execution_options(populate_existing=True)
+    result = await async_session.execute(stmt)
+    fetched_record: User = result.scalar_one_or_none()
+    assert fetched_record is not None
+    assert fetched_record.deleted_at is None
@@ -1,15 +1,21 @@
 import pytest
 from app.services.user import UserService
-from sqlalchemy import select
+from sqlalchemy import select, func, event
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.orm import joinedload
 from datetime import datetime, timedelta
+from better_crud import BetterCrudGlobalConfig
 from better_crud.models import JoinOptionModel
+from better_crud.search import build_search_tree
+from better_crud.service.sqlalchemy import QueryCache, register_operator
+from better_crud.service.sqlalchemy.operators import operator_map
 from better_crud.exceptions import (
     NotSupportOperatorException,
     InvalidFieldException,
     NotSupportRelationshipQueryException
 )
 from app.models.user import User, UserProfile
+from app.models.role import Role
 
 
 @pytest.mark.asyncio
@@ -272,6 +278,50 @@ async def test_get_many_filter_with_invalid_operator(async_session, test_user_da
         await user_service.crud_get_many(test_request, search=search, db_session=async_session)
 
 
+@pytest.fixture
+def custom_operator():
+    @register_operator("$lengthgt")
+    def length_greater_than(field, value):
+        return func.length(field) > value
+    yield
+    operator_map.pop("$lengthgt")
+
+
+@pytest.mark.asyncio
+async def test_get_many_filter_with_custom_operator(async_session, test_user_data, test_request, init_data, custom_operator):
+    user_service = UserService()
+    search = {
+        "user_name": {
+            "$lengthgt": 3
+        }
+    }
+    fetched_records = await user_service.crud_get_many(test_request, search=search, db_session=async_session)
+    assert [item.user_name for item in fetched_records] == [
+        item["user_name"] for item in test_user_data if len(item["user_name"]) > 3
+    ]
+
+
+@pytest.fixture
+def value_reading_operator():
+    @register_operator("$anyof")
+    def any_of(field, value):
+        return field.in_(value.split("|"))
+    yield
+    operator_map.pop("$anyof")
+
+
+@pytest.mark.asyncio
+async def test_get_many_custom_operator_receives_value(async_session, test_request, init_data, value_reading_operator):
+    user_service = UserService()
+    for value, expected in [("bob|jim", ["bob", "jim"]), ("tom", ["tom"])]:
+        fetched_records = await user_service.crud_get_many(
+            test_request,
+            search={"user_name": {"$anyof": value}},
+            db_session=async_session
+        )
+        assert sorted(item.user_name for item in fetched_records) == expected
+
+
 @pytest.mark.asyncio
 async def test_get_many_filter_with_invalid_value(async_session, test_user_data, test_request, init_data):
     user_service = UserService()
@@ -296,6 +346,54 @@ async def test_get_many_filter_with_invalid_field(async_session, test_user_data,
         await user_service.crud_get_many(test_request, search=search, db_session=async_session)
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "search,sorts",
+    [
+        ({"company.invalid_field": "jim"}, None),
+        ({"invalid_relation.name": "jim"}, None),
+        ({"$or": [{"user_name": "jim"}, {"invalid_field": "jim"}]}, None),
+        (None, [{"field": "invalid_relation.name", "sort": "ASC"}]),
+    ]
+)
+async def test_get_many_invalid_field_before_query(async_session, test_request, init_data, search, sorts):
+    user_service = UserService()
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = async_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        with pytest.raises(InvalidFieldException):
+            await user_service.crud_get_many(test_request, search=search, sorts=sorts, db_session=async_session)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert statements == []
+
+
+def test_field_index():
+    user_service = UserService()
+    assert user_service.get_model_field("user_name") is User.user_name
+    assert user_service.get_model_field("roles") is User.roles
+    assert user_service.get_model_field("profile.name") is UserProfile.name
+    assert user_service.get_model_field("roles.users.company.name").key == "name"
+    with pytest.raises(InvalidFieldException):
+        user_service.get_model_field("profile.invalid_field")
+
+
+def test_field_index_depth():
+    class ShallowUserService(UserService):
+        field_index_depth = 1
+
+    user_service = ShallowUserService()
+    assert "profile.name" in user_service.field_index
+    assert "roles.users.user_name" not in user_service.field_index
+    # paths deeper than the index are still resolved
+    assert user_service.get_model_field("roles.users.user_name").key == "user_name"
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "operator",
@@ -370,3 +468,262 @@ async def test_get_relations_with_only_detail(async_session, test_user_data, tes
     fetched_record = await user_service.crud_get_many(test_request, exist_user_id, db_session=async_session, joins=joins)
     assert fetched_record is not None
     assert len(fetched_record[0].roles) == 0
+
+
+@pytest.mark.asyncio
+async def test_get_many_query_cache(async_session, test_request, init_data):
+    user_service = UserService()
+    user_service.query_cache.clear()
+    for user_name, is_active, expected_count in [
+        ("bob", True, 1),
+        ("jim", True, 1),
+        ("tom", True, 0),
+        ("tom", False, 1),
+    ]:
+        fetched_records = await user_service.crud_get_many(
+            test_request,
+            search={
+                "user_name": {"$in": user_name},
+                "is_active": is_active
+            },
+            db_session=async_session
+        )
+        assert len(fetched_records) == expected_count
+    cache_info = user_service.query_cache.info()
+    assert cache_info.misses == 1
+    assert cache_info.hits == 3
+    assert cache_info.currsize == 1
+    fetched_records = await user_service.crud_get_many(
+        test_request,
+        search={"user_name": {"$isnull": True}},
+        db_session=async_session
+    )
+    assert len(fetched_records) == 0
+    assert user_service.query_cache.info().misses == 2
+
+
+def test_query_cache_soft_deleted_field_key(monkeypatch):
+    UserService.query_cache.clear()
+    stmt, _ = UserService()._build_cached_query(soft_delete=True)
+    assert '"user".deleted_at >' in str(stmt)
+    monkeypatch.setattr(
+        BetterCrudGlobalConfig, "soft_deleted_field_key", "created_at")
+    for include_deleted, expected in [(False, True), (True, False)]:
+        stmt, _ = UserService()._build_cached_query(
+            soft_delete=True, include_deleted=include_deleted)
+        assert '"user".deleted_at >' not in str(stmt)
+        assert ('"user".created_at >' in str(stmt)) == expected
+    assert UserService.query_cache.info().misses == 3
+
+
+@pytest.mark.asyncio
+async def test_get_many_query_cache_skip_additional_filter(async_session, test_request, init_data):
+    user_service = UserService()
+    user_service.query_cache.clear()
+    joins = {
+        "roles": JoinOptionModel(
+            select=True,
+            additional_filter_fn=lambda _: Role.id == 2
+        ),
+    }
+    fetched_records = await user_service.crud_get_many(
+        test_request,
+        joins=joins,
+        db_session=async_session
+    )
+    assert len(fetched_records) > 0
+    assert user_service.query_cache.info().currsize == 0
+
+
+def test_query_cache_lru():
+    query_cache = QueryCache(maxsize=2)
+    query_cache.set("a", 1)
+    query_cache.set("b", 2)
+    assert query_cache.get("a") == 1
+    query_cache.set("c", 3)
+    assert query_cache.get("b") is None
+    assert query_cache.get("c") == 3
+    assert query_cache.info() == (2, 1, 2, 2)
+    query_cache = QueryCache(maxsize=0)
+    query_cache.set("a", 1)
+    assert query_cache.get("a") is None
+
+
+@pytest.mark.parametrize(
+    "joins,expected_distinct",
+    [
+        (None, False),
+        ({"profile": JoinOptionModel(select=True, join=True)}, False),
+        ({"roles": JoinOptionModel(select=True, join=False)}, False),
+        ({"roles": JoinOptionModel(select=True, join=True)}, True),
+        ({"roles": JoinOptionModel(select=True, join=True, exists=True)}, False),
+    ]
+)
+def test_get_many_distinct_only_to_many_join(joins, expected_distinct):
+    user_service = UserService()
+    stmt = user_service._build_query(joins=joins)
+    assert ("DISTINCT" in str(stmt)) == expected_distinct
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "search,expected_count",
+    [
+        ({"roles.name": "test1"}, 2),
+        ({"roles.name": {"$in": "test1,test2"}}, 4),
+        ({"roles.name": {"$eq": "test2"}, "user_name": "bob"}, 1),
+    ]
+)
+async def test_get_many_exists_join(async_session, test_request, init_data, search, expected_count):
+    user_service = UserService()
+    joins = {
+        "roles": JoinOptionModel(select=False, join=True, exists=True),
+    }
+    stmt = str(user_service._build_query(search=search, joins=joins))
+    assert "EXISTS" in stmt
+    assert "JOIN" not in stmt
+    fetched_records = await user_service.crud_get_many(
+        test_request,
+        search=search,
+        joins=joins,
+        db_session=async_session
+    )
+    assert len(fetched_records) == expected_count
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("exists", [True, False])
+async def test_get_many_exists_join_same_row(async_session, test_request, init_data, exists):
+    user_service = UserService()
+    joins = {
+        "roles": JoinOptionModel(select=False, join=True, exists=exists),
+    }
+    # bob has the roles test1 and test2, none of them is both
+    search = {"roles.name": "test1", "roles.id": 2}
+    stmt = str(user_service._build_query(search=search, joins=joins))
+    assert stmt.count("EXISTS") == (1 if exists else 0)
+    fetched_records = await user_service.crud_get_many(
+        test_request,
+        search=search,
+        joins=joins,
+        db_session=async_session
+    )
+    assert fetched_records == []
+    search = {"roles.name": "test1", "roles.id": {"$lte": 2}}
+    fetched_records = await user_service.crud_get_many(
+        test_request,
+        search=search,
+        joins=joins,
+        db_session=async_session
+    )
+    assert sorted(record.user_name for record in fetched_records) == ["bob", "tom"]
+
+
+@pytest.mark.asyncio
+async def test_get_many_exists_join_with_sort(async_session, test_request, init_data):
+    user_service = UserService()
+    joins = {
+        "roles": JoinOptionModel(select=False, join=True, exists=True),
+    }
+    sorts = [{"field": "roles.name", "sort": "ASC"}]
+    stmt = str(user_service._build_query(joins=joins, sorts=sorts))
+    assert "JOIN" in stmt
+    fetched_records = await user_service.crud_get_many(
+        test_request,
+        joins=joins,
+        sorts=sorts,
+        db_session=async_session
+    )
+    assert len(fetched_records) == 4
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", ["joined", "selectin", "subquery", "auto"])
+async def test_get_many_join_strategy(async_session, test_request, init_data, strategy):
+    user_service = UserService()
+    joins = {
+        "profile": JoinOptionModel(select=True, join=False, strategy=strategy),
+        "roles": JoinOptionModel(select=True, join=False, strategy=strategy),
+    }
+    stmt = str(user_service._build_query(joins=joins))
+    assert ("JOIN role" in stmt) == (strategy == "joined")
+    fetched_records = await user_service.crud_get_many(
+        test_request,
+        joins=joins,
+        sorts=[{"field": "id", "sort": "ASC"}],
+        db_session=async_session
+    )
+    assert len(fetched_records) == 4
+    assert [role.id for role in fetched_records[0].roles] == [1, 2]
+    assert fetched_records[0].profile is not None
+
+
+@pytest.mark.asyncio
+async def test_get_many_join_strategy_raise(async_session, test_request, init_data):
+    user_service = UserService()
+    joins = {
+        "roles": JoinOptionModel(select=True, join=False, strategy="raise"),
+    }
+    fetched_records = await user_service.crud_get_many(
+        test_request,
+        joins=joins,
+        db_session=async_session
+    )
+    with pytest.raises(InvalidRequestError):
+        fetched_records[0].roles
+
+
+@pytest.mark.asyncio
+async def test_get_many_read_mode_core(async_session, test_request, init_data):
+    user_service = UserService()
+    fetched_records = await user_service.crud_get_many(
+        test_request,
+        sorts=[{"field": "id", "sort": "ASC"}],
+        read_mode="core",
+        db_session=async_session
+    )
+    assert isinstance(fetched_records[0], dict)
+    assert fetched_records[0]["user_name"] == "bob"
+    joins = {
+        "roles": JoinOptionModel(select=True, join=False),
+    }
+    fetched_records = await user_service.crud_get_many(
+        test_request,
+        joins=joins,
+        read_mode="core",
+        db_session=async_session
+    )
+    assert isinstance(fetched_records[0], User)
+
+
+@pytest.mark.asyncio
+async def test_estimate_count_binds_search_values(test_request):
+    from sqlalchemy.dialects import postgresql
+    statements = []
+
+    class Bind:
+        dialect = postgresql.dialect()
+
+    class ExplainSession:
+        def get_bind(self):
+            return Bind()
+
+        async def scalar(self, statement, params=None):
+            statements.append((statement, params))
+            return [{"Plan": {"Plan Rows": 7}}]
+
+    user_service = UserService()
+    query, bind_params = user_service._build_cached_query(
+        search=build_search_tree({"user_name": {"$cont": "x (:evil"}}),
+        request=test_request
+    )
+    total = await user_service._estimate_count(
+        ExplainSession(), query, bind_params)
+    assert total == 7
+    statement, params = statements[0]
+    compiled = statement.compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+    # the search value is sent as a parameter, not pasted in the sql
+    assert "evil" not in sql
+    assert "%x (:evil%" in compiled.construct_params(params).values()
@@ -103,3 +103,58 @@ async def test_hooks_delete_call(async_session, test_request, entity_service):
     entity_service.on_after_delete.assert_called()
     entity_service.on_after_delete.assert_called_once_with(
         entities, background_tasks=None)
+
+
+@pytest.mark.asyncio
+async def test_hooks_delete_returning_call(async_session, test_request, entity_service):
+    entity = Entity(name="entity name", description="entity description")
+    async_session.add(entity)
+    await async_session.commit()
+    entities = await entity_service.crud_delete_many(
+        test_request, [entity.id], False, returning=True, db_session=async_session)
+    assert [item.id for item in entities] == [entity.id]
+    entity_service.on_before_delete.assert_called_once_with(
+        entities, background_tasks=None)
+    entity_service.on_after_delete.assert_called_once_with(
+        entities, background_tasks=None)
+
+
+@pytest.mark.asyncio
+async def test_hooks_create_many_call(async_session, test_request, entity_service):
+    entity_creates = [
+        EntityCreate(name=f"entity {index}") for index in range(3)
+    ]
+    session_flush = async_session.flush
+    flush_count = 0
+
+    async def flush(*args, **kwargs):
+        nonlocal flush_count
+        flush_count += 1
+        return await session_flush(*args, **kwargs)
+
+    async_session.flush = flush
+    entities = await entity_service.crud_create_many(test_request, entity_creates, db_session=async_session)
+    assert flush_count == 1
+    assert entity_service.on_before_create.call_count == 3
+    assert entity_service.on_after_create.call_count == 3
+    entity_service.on_after_create.assert_called_with(
+        entities[2], model=entity_creates[2], background_tasks=None)
+    assert all(entity.id is not None for entity in entities)
+    assert all(entity.key == "mykey" for entity in entities)
+
+
+@pytest.mark.asyncio
+async def test_hooks_create_many_batch_call(async_session, test_request, entity_service):
+    entity_creates = [
+        EntityCreate(name=f"entity {index}") for index in range(2)
+    ]
+    entity_service.on_before_create_many = MagicMock(
+        return_value=async_return([{"key": "key0"}, None]))
+    entity_service.on_after_create_many = MagicMock(return_value=async_return())
+    entities = await entity_service.crud_create_many(test_request, entity_creates, db_session=async_session)
+    entity_service.on_before_create_many.assert_called_once_with(
+        entity_creates, background_tasks=None)
+    entity_service.on_after_create_many.assert_called_once_with(
+        entities, models=entity_creates, background_tasks=None)
+    entity_service.on_before_create.assert_not_called()
+    assert [entity.key for entity in entities] == ["key0", None]
@@ -0,0 +1,157 @@
+import pytest
+from sqlalchemy import event
+from better_crud.models import JoinOptionModel
+from better_crud.service.sqlalchemy import ResultCache
+from app.models.role import RoleCreate, RoleUpdate
+from app.services.role import RoleService
+from app.services.user import UserService
+
+
+def _capture_statements(async_session):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(
+        async_session.bind.sync_engine,
+        "before_cursor_execute",
+        before_cursor_execute
+    )
+    return statements, before_cursor_execute
+
+
+@pytest.fixture
+def result_cache():
+    result_cache = ResultCache()
+    RoleService.result_cache = result_cache
+    UserService.result_cache = result_cache
+    yield result_cache
+    del RoleService.result_cache
+    del UserService.result_cache
+
+
+@pytest.mark.asyncio
+async def test_get_one_result_cache(async_session, test_request, init_data, result_cache):
+    role_service = RoleService()
+    statements, listener = _capture_statements(async_session)
+    try:
+        role = await role_service.crud_get_one(test_request, 1, db_session=async_session)
+        cached_role = await role_service.crud_get_one(test_request, 1, db_session=async_session)
+        assert cached_role.name == role.name
+        assert len(statements) == 1
+        await role_service.crud_update_one(
+            test_request,
+            1,
+            RoleUpdate(name="new name", description="new description"),
+            db_session=async_session
+        )
+        statements.clear()
+        role = await role_service.crud_get_one(test_request, 1, db_session=async_session)
+        assert role.name == "new name"
+        assert len(statements) == 1
+    finally:
+        event.remove(async_session.bind.sync_engine, "before_cursor_execute", listener)
+    assert result_cache.info().hits == 1
+
+
+@pytest.mark.asyncio
+async def test_get_many_result_cache(async_session, test_request, init_data, result_cache):
+    role_service = RoleService()
+    roles = await role_service.crud_get_many(test_request, db_session=async_session)
+    search = {"id": {"$in": [1, 2]}}
+    searched_roles = await role_service.crud_get_many(
+        test_request, search=search, db_session=async_session)
+    assert len(searched_roles) == 2
+    assert len(await role_service.crud_get_many(
+        test_request, search={"id": 1}, db_session=async_session)) == 1
+    assert [role.id for role in await role_service.crud_get_many(
+        test_request, search=search, db_session=async_session)] == [role.id for role in searched_roles]
+    assert len(await role_service.crud_get_many(
+        test_request, db_session=async_session)) == len(roles)
+    assert result_cache.info().hits == 2
+    await role_service.crud_create_one(
+        test_request,
+        RoleCreate(name="new role", description="new role"),
+        db_session=async_session
+    )
+    new_roles = await role_service.crud_get_many(test_request, db_session=async_session)
+    assert len(new_roles) == len(roles) + 1
+
+
+@pytest.mark.asyncio
+async def test_result_cache_related_write(async_session, test_request, init_data, result_cache):
+    user_service = UserService()
+    role_service = RoleService()
+    joins = {"roles": JoinOptionModel(select=True, join=False)}
+    user = await user_service.crud_get_one(
+        test_request, 1, joins=joins, db_session=async_session)
+    cached_user = await user_service.crud_get_one(
+        test_request, 1, joins=joins, db_session=async_session)
+    assert [role.id for role in cached_user.roles] == [role.id for role in user.roles]
+    # users load their roles, a role write drops the cached users
+    await role_service.crud_update_one(
+        test_request,
+        1,
+        RoleUpdate(name="new name", description="new description"),
+        db_session=async_session
+    )
+    assert result_cache.info().currsize == 1
+    await user_service.crud_get_one(
+        test_request, 1, joins=joins, db_session=async_session)
+    assert result_cache.info().currsize == 2
+
+
+@pytest.mark.asyncio
+async def test_result_cache_request_filtered_join(async_session, test_request, init_data, result_cache):
+    user_service = UserService()
+    joins = {
+        "roles": JoinOptionModel(
+            select=True,
+            join=False,
+            additional_filter_fn=lambda request: []
+        )
+    }
+    await user_service.crud_get_one(
+        test_request, 1, joins=joins, db_session=async_session)
+    assert result_cache.info().currsize == 0
+
+
+@pytest.mark.asyncio
+async def test_result_cache_detached_copies(async_session, test_request, init_data, result_cache):
+    from sqlalchemy import inspect
+    from sqlalchemy.ext.asyncio import AsyncSession
+    user_service = UserService()
+    joins = {"roles": JoinOptionModel(select=True, join=False)}
+    async with AsyncSession(async_session.bind) as db_session:
+        user = await user_service.crud_get_one(
+            test_request, 1, joins=joins, db_session=db_session)
+    # the session that loaded the user is closed
+    cached_user = await user_service.crud_get_one(
+        test_request, 1, joins=joins, db_session=async_session)
+    assert result_cache.info().hits == 1
+    assert cached_user is not user
+    assert inspect(cached_user).session is None
+    assert cached_user.user_name == user.user_name
+    assert [role.name for role in cached_user.roles] == [role.name for role in user.roles]
+    # a request changing its copy does not change the cached result
+    cached_user.user_name = "changed"
+    cached_user.roles.clear()
+    cached_user = await user_service.crud_get_one(
+        test_request, 1, joins=joins, db_session=async_session)
+    assert cached_user.user_name == user.user_name
+    assert len(cached_user.roles) == len(user.roles)
+
+
+@pytest.mark.asyncio
+async def test_result_cache_lru_and_ttl():
+    result_cache = ResultCache(maxsize=2, ttl=None)
+    await result_cache.set("a", 1)
+    await result_cache.set("b", 2)
+    assert await result_cache.get("a") == 1
+    await result_cache.set("c", 3)
+    assert await result_cache.get("b") is None
+    assert await result_cache.get("a") == 1
+    result_cache = ResultCache(ttl=0)
+    await result_cache.set("a", 1)
+    assert await result_cache.get("a") is None
+    assert result_cache.info().currsize == 0
@@ -1,11 +1,15 @@
 import pytest
 from typing import List
-from sqlalchemy import select
+from sqlalchemy import select, event
 from better_crud.exceptions import NotFoundException
 from sqlalchemy.orm import joinedload
 from app.models.user import User, UserUpdate
 from app.models.user_task import UserTask
+from app.models.role import Role, RoleUpdate
+from app.models.zone import Zone, ZoneBase
 from app.services.user import UserService
+from app.services.role import RoleService
+from app.services.zone import ZoneService
 
 
 @pytest.mark.asyncio
@@ -229,3 +233,95 @@ async def test_update_many_atomic_rollback(async_session, test_user_data, test_r
     fetched_record: User = result.scalar_one_or_none()
     assert fetched_record is not None
     assert fetched_record.email == original_email
+
+
+def _capture_statements(async_session):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = async_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    return statements, lambda: event.remove(
+        engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.mark.asyncio
+async def test_update_many_loads_entities_once(async_session, test_user_data, test_request, init_data):
+    user_service = UserService()
+    ids = [item["id"] for item in test_user_data]
+    update_data = [
+        UserUpdate(email=f"new-{item['email']}") for item in test_user_data
+    ]
+    statements, remove = _capture_statements(async_session)
+    try:
+        res = await user_service.crud_update_many(test_request, ids, update_data, db_session=async_session)
+    finally:
+        remove()
+    user_selects = [
+        statement for statement in statements
+        if statement.startswith("SELECT") and "FROM user" in statement
+    ]
+    assert len(user_selects) == 1
+    assert [item.id for item in res] == ids
+    assert [item.email for item in res] == [item.email for item in update_data]
+
+
+@pytest.mark.asyncio
+async def test_update_many_bulk_scalar_payload(async_session, test_role_data, test_request, init_data):
+    role_service = RoleService()
+    ids = [item["id"] for item in reversed(test_role_data)]
+    update_data = [
+        RoleUpdate(name=f"{item['name']} new", description=item["description"])
+        for item in reversed(test_role_data)
+    ]
+    statements, remove = _capture_statements(async_session)
+    try:
+        res = await role_service.crud_update_many(test_request, ids, update_data, db_session=async_session)
+    finally:
+        remove()
+    updates = [
+        statement for statement in statements if statement.startswith("UPDATE role")
+    ]
+    assert len(updates) == 1
+    assert [item.id for item in res] == ids
+    assert [item.name for item in res] == [item.name for item in update_data]
+    stmt = select(Role).where(Role.id.in_(ids))
+    stmt = stmt.execution_options(populate_existing=True)
+    result = await async_session.execute(stmt)
+    fetched_records = {item.id: item for item in result.scalars().all()}
+    for id, item in zip(ids, update_data):
+        assert fetched_records[id].name == item.name
+
+
+@pytest.mark.asyncio
+async def test_update_many_bulk_not_found(async_session, test_role_data, test_request, init_data):
+    role_service = RoleService()
+    ids = [test_role_data[0]["id"], 9999]
+    update_data = [
+        RoleUpdate(name="rolled back"),
+        RoleUpdate(name="never applied"),
+    ]
+    with pytest.raises(NotFoundException):
+        await role_service.crud_update_many(test_request, ids, update_data, db_session=async_session)
+    stmt = select(Role).where(Role.id == test_role_data[0]["id"])
+    stmt = stmt.execution_options(populate_existing=True)
+    result = await async_session.execute(stmt)
+    assert result.scalar_one().name == test_role_data[0]["name"]
+
+
+@pytest.mark.asyncio
+async def test_update_many_versioned(async_session, test_zone_data, test_request):
+    for zone_data in test_zone_data:
+        async_session.add(Zone(**zone_data))
+    await async_session.commit()
+    zone_service = ZoneService()
+    ids = [item["id"] for item in test_zone_data]
+    update_data = [
+        ZoneBase(name=f"{item['name']} new") for item in test_zone_data
+    ]
+    res = await zone_service.crud_update_many(test_request, ids, update_data, db_session=async_session)
+    assert [item.name for item in res] == [item.name for item in update_data]
+    # the versioned rows are updated by the unit of work, bumping the version
+    assert [item.version for item in res] == [2] * len(ids)
@@ -0,0 +1,128 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from fastapi import FastAPI, APIRouter, Depends
+from fastapi.testclient import TestClient
+from better_crud import BetterCrudGlobalConfig, crud
+from app.models.zone import Zone, ZoneBase, ZonePublic
+from app.models.role import RolePublic
+from app.services.zone import ZoneService
+from app.services.role import RoleService
+
+
+@pytest.fixture
+def etag_client(async_session):
+    app = FastAPI()
+    BetterCrudGlobalConfig.init(
+        backend_config={
+            "sqlalchemy": {
+                "db_session": lambda: async_session
+            }
+        }
+    )
+    zone_router = APIRouter()
+    role_router = APIRouter()
+
+    @crud(
+        zone_router,
+        feature="zone",
+        routes={
+            "only": ["get_many", "get_one", "update_one"]
+        },
+        query={
+            "etag": True
+        },
+        dto={
+            "update": ZoneBase
+        },
+        serialize={
+            "base": ZonePublic,
+        }
+    )
+    class ZoneController():
+        service: ZoneService = Depends(ZoneService)
+
+    @crud(
+        role_router,
+        feature="role",
+        routes={
+            "only": ["get_many", "get_one"]
+        },
+        query={
+            "etag": True
+        },
+        serialize={
+            "base": RolePublic,
+        }
+    )
+    class RoleController():
+        service: RoleService = Depends(RoleService)
+    app.include_router(zone_router, prefix="/zone")
+    app.include_router(role_router, prefix="/role")
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest_asyncio.fixture
+async def init_zones(async_session, test_zone_data):
+    for zone_data in test_zone_data:
+        async_session.add(Zone(**zone_data))
+    await async_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_get_one_version_etag(async_session, etag_client: TestClient, init_zones):
+    response = etag_client.get("/zone/1")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag.startswith("W/")
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(async_session.bind.sync_engine,
+                 "before_cursor_execute", before_cursor_execute)
+    try:
+        response = etag_client.get("/zone/1", headers={"If-None-Match": etag})
+    finally:
+        event.remove(async_session.bind.sync_engine,
+                     "before_cursor_execute", before_cursor_execute)
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    # only the version column is read
+    assert len(statements) == 1
+    assert "zone.name" not in statements[0]
+    response = etag_client.put("/zone/1", json={"name": "zone1 new"})
+    assert response.status_code == 200
+    response = etag_client.get("/zone/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["name"] == "zone1 new"
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_get_one_body_etag(etag_client: TestClient, init_data):
+    response = etag_client.get("/role/1")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert not etag.startswith("W/")
+    response = etag_client.get(
+        "/role/1", headers={"If-None-Match": f'"other", {etag}'})
+    assert response.status_code == 304
+    response = etag_client.get("/role/2", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert etag_client.get(
+        "/role/1000", headers={"If-None-Match": "*"}).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_many_etag(etag_client: TestClient, init_data):
+    response = etag_client.get("/role")
+    etag = response.headers["etag"]
+    response = etag_client.get("/role", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    response = etag_client.get(
+        "/role", params={"s": '{"id": 1}'}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 1
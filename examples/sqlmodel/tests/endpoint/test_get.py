@@ -1,5 +1,9 @@
 import pytest
 import json
+import functools
+import csv
+import io
+from app.models.user import UserPublic
 from fastapi.testclient import TestClient
 
 
@@ -259,6 +263,178 @@ async def test_get_many_optional_boundary_size_zero(optional_pagination_client:
     assert len(data) == len(test_user_data)
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "page,size,expected_size,expected_has_next",
+    [
+        (1, 3, 3, True),
+        (2, 3, 1, False),
+        (1, 4, 4, False),
+        (3, 2, 0, False),
+    ]
+)
+async def test_get_many_count_mode_none(
+    count_mode_client: TestClient,
+    test_user_data,
+    init_data,
+    page,
+    size,
+    expected_size,
+    expected_has_next
+):
+    response = count_mode_client.get("/none/user", params={"page": page, "size": size})
+    data = response.json()
+    assert data["total"] is None
+    assert data["pages"] is None
+    assert len(data["items"]) == expected_size
+    assert data["has_next"] == expected_has_next
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("count_mode", ["exact", "estimate", "window"])
+async def test_get_many_count_mode_total(count_mode_client: TestClient, test_user_data, init_data, count_mode):
+    response = count_mode_client.get(f"/{count_mode}/user", params={"page": 1, "size": 3})
+    data = response.json()
+    assert data["total"] == len(test_user_data)
+    assert data["pages"] == 2
+    assert data["has_next"] is True
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("page,size,expected_size", [(1, 3, 3), (2, 3, 1), (3, 3, 0)])
+async def test_get_many_count_mode_window(
+    async_session,
+    count_mode_client: TestClient,
+    test_user_data,
+    init_data,
+    page,
+    size,
+    expected_size
+):
+    from sqlalchemy import event
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(async_session.bind.sync_engine,
+                 "before_cursor_execute", before_cursor_execute)
+    try:
+        response = count_mode_client.get(
+            "/window/user", params={"page": page, "size": size})
+    finally:
+        event.remove(async_session.bind.sync_engine,
+                     "before_cursor_execute", before_cursor_execute)
+    data = response.json()
+    assert data["total"] == len(test_user_data)
+    assert len(data["items"]) == expected_size
+    # the empty page falls back to a count query
+    assert len(statements) == (1 if expected_size else 2)
+    assert "count(*) OVER ()" in statements[0]
+
+
+@pytest.mark.asyncio
+async def test_get_many_count_mode_window_fields(count_mode_client: TestClient, test_user_data, init_data):
+    response = count_mode_client.get(
+        "/window/user", params={"page": 1, "size": 2, "fields": "id,email"})
+    data = response.json()
+    assert data["total"] == len(test_user_data)
+    assert data["items"][0].keys() == {"id", "email"}
+
+
+@pytest.mark.asyncio
+async def test_get_many_cursor_no_params(cursor_pagination_client: TestClient, test_user_data, init_data):
+    response = cursor_pagination_client.get("/user")
+    data = response.json()
+    assert len(data["items"]) == len(test_user_data)
+    assert data["next_cursor"] is None
+    assert data["prev_cursor"] is None
+    assert "total" not in data
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "sort,expected_ids",
+    [
+        ("id,ASC", [1, 2, 3, 4]),
+        ("id,DESC", [4, 3, 2, 1]),
+        ("user_name,ASC", [2, 1, 3, 4]),
+        ("is_active,DESC", [1, 2, 3, 4]),
+    ]
+)
+async def test_get_many_cursor_walk(cursor_pagination_client: TestClient, test_user_data, init_data, sort, expected_ids):
+    params = {"size": 3, "sort": sort}
+    response = cursor_pagination_client.get("/user", params=params)
+    first_page = response.json()
+    assert [item["id"] for item in first_page["items"]] == expected_ids[:3]
+    assert first_page["prev_cursor"] is None
+    response = cursor_pagination_client.get(
+        "/user", params={**params, "cursor": first_page["next_cursor"]})
+    second_page = response.json()
+    assert [item["id"] for item in second_page["items"]] == expected_ids[3:]
+    assert second_page["next_cursor"] is None
+    response = cursor_pagination_client.get(
+        "/user", params={**params, "cursor": second_page["prev_cursor"]})
+    previous_page = response.json()
+    assert [item["id"] for item in previous_page["items"]] == expected_ids[:3]
+    assert previous_page["prev_cursor"] is None
+    assert previous_page["next_cursor"] is not None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "sort,expected_ids",
+    [
+        ("email,ASC", [2, 4, 1, 3]),
+        ("email,DESC", [1, 3, 4, 2]),
+    ]
+)
+async def test_get_many_cursor_walk_nulls(
+    async_session,
+    cursor_pagination_client: TestClient,
+    init_data,
+    sort,
+    expected_ids
+):
+    from app.models.user import User
+    for user_id in (1, 3):
+        user = await async_session.get(User, user_id)
+        user.email = None
+    await async_session.commit()
+    params = {"size": 1, "sort": sort}
+    ids = []
+    pages = []
+    cursor = None
+    while True:
+        response = cursor_pagination_client.get(
+            "/user", params={**params, "cursor": cursor} if cursor else params)
+        assert response.status_code == 200
+        page = response.json()
+        pages.append(page)
+        ids.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    # NULL emails come last in ascending order
+    assert ids == expected_ids
+    cursor = pages[-1]["prev_cursor"]
+    previous_ids = []
+    while cursor is not None:
+        response = cursor_pagination_client.get(
+            "/user", params={**params, "cursor": cursor})
+        assert response.status_code == 200
+        page = response.json()
+        previous_ids[:0] = [item["id"] for item in page["items"]]
+        cursor = page["prev_cursor"]
+    assert previous_ids == expected_ids[:-1]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "eyJkIjoibmV4dCJ9"])
+async def test_get_many_cursor_invalid(cursor_pagination_client: TestClient, test_user_data, init_data, cursor):
+    response = cursor_pagination_client.get("/user", params={"cursor": cursor})
+    assert response.status_code == 400
+
+
 @pytest.mark.asyncio
 async def test_get_many_select_relation(join_config_client: TestClient, test_user_data, test_company_data, init_data):
     response = join_config_client.get("/user", params={
@@ -375,3 +551,429 @@ async def test_recover_flow(recover_enabled_client: TestClient, test_user_data,
 async def test_recover_non_existent_record(recover_enabled_client: TestClient, test_user_data, init_data):
     response = recover_enabled_client.patch("/user/9999/recover")
     assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_many_fields(client: TestClient, test_user_data, init_data):
+    response = client.get("/user", params={
+        "fields": "id,user_name",
+        "sort": "id,ASC"
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert data == [
+        {"id": item["id"], "user_name": item["user_name"]}
+        for item in test_user_data
+    ]
+    response = client.get("/user", params={
+        "fields": ["id", "email"],
+        "filter": "user_name||$eq||bob",
+        "page": 1,
+        "size": 2
+    })
+    data = response.json()
+    assert data["total"] == 1
+    assert data["items"] == [{"id": 1, "email": test_user_data[0]["email"]}]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fields", ["hashed_password", "id,roles", "unknown"])
+async def test_get_many_fields_not_allowed(client: TestClient, init_data, fields):
+    response = client.get("/user", params={"fields": fields})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid fields"}
+
+
+@pytest.mark.asyncio
+async def test_get_one_fields(client: TestClient, test_user_data, init_data):
+    response = client.get("/user/2", params={"fields": "user_name,is_active"})
+    assert response.status_code == 200
+    assert response.json() == {
+        "user_name": test_user_data[1]["user_name"],
+        "is_active": test_user_data[1]["is_active"]
+    }
+    response = client.get("/user/1000", params={"fields": "user_name"})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_many_cursor_fields(cursor_pagination_client: TestClient, init_data):
+    response = cursor_pagination_client.get("/user", params={
+        "fields": "user_name",
+        "sort": "id,DESC",
+        "size": 3
+    })
+    data = response.json()
+    assert data["items"] == [
+        {"user_name": "tom"},
+        {"user_name": "jim"},
+        {"user_name": "alice"}
+    ]
+    response = cursor_pagination_client.get("/user", params={
+        "fields": "user_name",
+        "sort": "id,DESC",
+        "size": 3,
+        "cursor": data["next_cursor"]
+    })
+    assert response.json()["items"] == [{"user_name": "bob"}]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"sort": "id,DESC"},
+        {"filter": "is_active||$eq||1", "page": 1, "size": 2},
+        {"load": "roles", "sort": "id,ASC"},
+    ]
+)
+async def test_get_many_read_mode_core(read_mode_client: TestClient, init_data, params):
+    orm_data = read_mode_client.get("/orm/user", params=params).json()
+    core_response = read_mode_client.get("/core/user", params=params)
+    assert core_response.status_code == 200
+    core_data = core_response.json()
+    if "items" in orm_data:
+        assert core_data["total"] == orm_data["total"]
+        orm_data, core_data = orm_data["items"], core_data["items"]
+    assert len(core_data) == len(orm_data)
+    for core_item, orm_item in zip(core_data, orm_data):
+        for key in ["id", "user_name", "email", "is_active", "company_id"]:
+            assert core_item[key] == orm_item[key]
+    if "load" in params:
+        assert core_data[0]["roles"] == orm_data[0]["roles"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "search_spec",
+    [
+        json.dumps(["user_name"]),
+        json.dumps({"id": {"$in": list(range(1001))}}),
+        json.dumps(functools.reduce(
+            lambda search, _: {"$and": [search]}, range(11), {"user_name": "bob"})),
+        json.dumps({"user_name": {"$eq": {"$gt": 1}}}),
+    ]
+)
+async def test_get_many_invalid_search(client: TestClient, init_data, search_spec):
+    response = client.get("/user", params={"s": search_spec})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_many_invalid_search_json(client: TestClient, init_data):
+    response = client.get("/user", params={"s": "{user_name"})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson(export_client: TestClient, test_user_data, init_data):
+    response = export_client.get("/user/export", params={"sort": "id,DESC"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == sorted(
+        [item["id"] for item in test_user_data], reverse=True)
+    assert "hashed_password" not in rows[0]
+    assert set(rows[0].keys()) <= set(UserPublic.model_fields)
+
+
+@pytest.mark.asyncio
+async def test_export_csv(export_client: TestClient, test_user_data, init_data):
+    response = export_client.get("/user/export", params={
+        "format": "csv",
+        "fields": "id,user_name",
+        "s": json.dumps({"is_active": True})
+    })
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert rows == [
+        {"id": str(item["id"]), "user_name": item["user_name"]}
+        for item in test_user_data if item["is_active"]
+    ]
+
+
+@pytest.mark.asyncio
+async def test_export_empty(export_client: TestClient, init_data):
+    response = export_client.get("/user/export", params={
+        "s": json.dumps({"user_name": "nobody"})
+    })
+    assert response.status_code == 200
+    assert response.text == ""
+
+
+@pytest.mark.asyncio
+async def test_export_invalid_fields(export_client: TestClient, init_data):
+    response = export_client.get("/user/export", params={"fields": "profile"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_export_route_is_opt_in(client: TestClient, export_client: TestClient, test_user_data, init_data):
+    exist_user_id = test_user_data[0]["id"]
+    assert export_client.get(f"/user/{exist_user_id}").json()["id"] == exist_user_id
+    assert not any(
+        getattr(route, "path", None) == "/user/export" for route in client.app.routes)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("page,size", [(1, 2), (2, 2), (1, 3), (3, 2)])
+@pytest.mark.parametrize("sort", ["id,DESC", "email,ASC"])
+async def test_get_many_ids_first_pagination(
+    async_session,
+    join_config_client: TestClient,
+    init_data,
+    page,
+    size,
+    sort
+):
+    from sqlalchemy import event
+    from app.services.user import UserService
+    params = {
+        "page": page,
+        "size": size,
+        "sort": sort,
+        "filter": "projects.is_active||$eq||true"
+    }
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(async_session.bind.sync_engine,
+                 "before_cursor_execute", before_cursor_execute)
+    UserService.ids_first_pagination = True
+    try:
+        response = join_config_client.get("/user", params=params)
+    finally:
+        del UserService.ids_first_pagination
+        event.remove(async_session.bind.sync_engine,
+                     "before_cursor_execute", before_cursor_execute)
+    assert response.status_code == 200
+    # the page of ids does not load the relationships
+    assert any(
+        statement.split(" \nFROM")[0] in (
+            "SELECT DISTINCT user.id",
+            "SELECT DISTINCT user.id, user.email"
+        )
+        for statement in statements
+    )
+    expected = join_config_client.get("/user", params=params).json()
+    assert response.json() == expected
+
+
+def test_ids_first_page_query_selects_sort_columns():
+    from sqlalchemy.dialects import postgresql
+    from fastapi_pagination import Params
+    from fastapi_pagination.ext.sqlalchemy import create_paginate_query
+    from better_crud.models import JoinOptionModel
+    from app.services.user import UserService
+    user_service = UserService()
+    query = user_service._build_query(
+        joins={"tasks": JoinOptionModel(select=False, join=True)},
+        sorts=[{"field": "email", "sort": "ASC"}]
+    )
+    page_query = user_service._create_ids_page_query(
+        create_paginate_query(query, Params(page=2, size=10)))
+    sql = str(page_query.compile(dialect=postgresql.dialect()))
+    # postgresql needs the ORDER BY expressions of a DISTINCT query in
+    # the select list
+    select_list = sql[:sql.index("FROM")]
+    assert select_list.startswith("SELECT DISTINCT")
+    assert '"user".email' in select_list
+    assert 'ORDER BY "user".email ASC' in sql
+
+
+@pytest.mark.asyncio
+async def test_aggregate(aggregate_client: TestClient, init_data):
+    response = aggregate_client.get("/user/aggregate", params={
+        "group_by": "company_id",
+        "metrics": "count,min||id,max||id,sum||id,avg||id"
+    })
+    assert response.status_code == 200
+    # the auth filter leaves out the users of company 3
+    assert response.json() == [
+        {"company_id": 1, "count": 2, "min_id": 1, "max_id": 4,
+         "sum_id": 5, "avg_id": 2.5},
+        {"company_id": 2, "count": 1, "min_id": 2, "max_id": 2,
+         "sum_id": 2, "avg_id": 2.0},
+    ]
+    response = aggregate_client.get("/user/aggregate", params={
+        "s": json.dumps({"is_active": True})
+    })
+    assert response.json() == [{"count": 2}]
+    aggregate_client.delete("/user/1")
+    response = aggregate_client.get("/user/aggregate")
+    assert response.json() == [{"count": 2}]
+
+
+@pytest.mark.asyncio
+async def test_aggregate_join(aggregate_client: TestClient, init_data):
+    response = aggregate_client.get("/user/aggregate", params={
+        "group_by": "roles.name",
+        "join": "roles"
+    })
+    assert response.status_code == 200
+    assert {row["roles.name"]: row["count"] for row in response.json()} == {
+        "test1": 2, "test2": 2, "test3": 2}
+    response = aggregate_client.get("/user/aggregate", params={
+        "join": "roles",
+        "s": json.dumps({"roles.id": {"$in": [2, 3]}})
+    })
+    # users are counted once whatever the number of joined roles
+    assert response.json() == [{"count": 3}]
+
+
+@pytest.mark.asyncio
+async def test_aggregate_to_many_join(aggregate_client: TestClient, init_data):
+    params = {"metrics": "count,sum||id,count||id,avg||id"}
+    expected = aggregate_client.get("/user/aggregate", params=params).json()
+    assert expected == [{"count": 3, "sum_id": 7, "count_id": 3, "avg_id": 7 / 3}]
+    # the tasks repeat the rows of the users
+    response = aggregate_client.get(
+        "/user/aggregate", params={**params, "join": "tasks"})
+    assert response.json() == expected
+    response = aggregate_client.get("/user/aggregate", params={
+        "group_by": "roles.name",
+        "metrics": "count,sum||id",
+        "join": ["roles", "tasks"]
+    })
+    assert response.json() == [
+        {"roles.name": "test1", "count": 2, "sum_id": 5},
+        {"roles.name": "test2", "count": 2, "sum_id": 3},
+        {"roles.name": "test3", "count": 2, "sum_id": 6},
+    ]
+    # the values of a to-many relationship have no single row per item
+    response = aggregate_client.get("/user/aggregate", params={
+        "metrics": "sum||id,count||tasks.id",
+        "join": "tasks"
+    })
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_aggregate_date_bucket(
+    async_session,
+    aggregate_client: TestClient,
+    init_data
+):
+    from datetime import datetime
+    from app.models.user import User
+    for user_id, created_at in [
+        (1, datetime(2024, 1, 5, 10)),
+        (2, datetime(2024, 1, 20, 8)),
+        (4, datetime(2024, 3, 1, 9)),
+    ]:
+        user = await async_session.get(User, user_id)
+        user.created_at = created_at
+    await async_session.commit()
+    response = aggregate_client.get("/user/aggregate", params={
+        "group_by": "created_at||month",
+        "metrics": "count,max||created_at"
+    })
+    assert response.status_code == 200
+    assert [
+        (row["created_at_month"], row["count"]) for row in response.json()
+    ] == [("2024-01", 2), ("2024-03", 1)]
+    response = aggregate_client.get("/user/aggregate", params={
+        "group_by": "created_at||year,is_active"
+    })
+    assert response.json() == [
+        {"created_at_year": "2024", "is_active": False, "count": 1},
+        {"created_at_year": "2024", "is_active": True, "count": 2},
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [
+    {"group_by": "unknown"},
+    {"group_by": "roles"},
+    {"group_by": "roles.name"},
+    {"group_by": "created_at||decade"},
+    {"metrics": "median||id"},
+    {"metrics": "sum"},
+])
+async def test_aggregate_invalid(aggregate_client: TestClient, init_data, params):
+    response = aggregate_client.get("/user/aggregate", params=params)
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_aggregate_route_is_opt_in(client: TestClient, init_data):
+    assert not any(
+        getattr(route, "path", None) == "/user/aggregate" for route in client.app.routes)
+
+
+@pytest.mark.asyncio
+async def test_facets(async_session, facets_client: TestClient, init_data):
+    from sqlalchemy import event
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(async_session.bind.sync_engine,
+                 "before_cursor_execute", before_cursor_execute)
+    try:
+        response = facets_client.get("/user/facets", params={
+            "fields": "company_id,is_active"
+        })
+    finally:
+        event.remove(async_session.bind.sync_engine,
+                     "before_cursor_execute", before_cursor_execute)
+    assert response.status_code == 200
+    # the auth filter leaves out the users of company 3
+    assert response.json() == {
+        "company_id": [{"value": 1, "count": 2}, {"value": 2, "count": 1}],
+        "is_active": [{"value": True, "count": 2}, {"value": False, "count": 1}],
+    }
+    assert len(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_facets_ignore_own_filter(facets_client: TestClient, init_data):
+    response = facets_client.get("/user/facets", params={
+        "fields": "company_id,is_active",
+        "filter": ["company_id||$in||1,3", "user_name||$ne||bob"]
+    })
+    assert response.status_code == 200
+    assert response.json() == {
+        # the company filter applies to the other facets only, the auth
+        # filter still applies to every facet
+        "company_id": [{"value": 1, "count": 1}, {"value": 2, "count": 1}],
+        "is_active": [{"value": False, "count": 1}],
+    }
+    response = facets_client.get("/user/facets", params={
+        "fields": "is_active",
+        "filter": "company_id||$eq||2"
+    })
+    assert response.json() == {"is_active": [{"value": True, "count": 1}]}
+
+
+@pytest.mark.asyncio
+async def test_facets_join(facets_client: TestClient, init_data):
+    facets_client.delete("/user/1")
+    response = facets_client.get("/user/facets", params={
+        "fields": "roles.name,company_id",
+        "join": "roles"
+    })
+    assert response.status_code == 200
+    assert response.json() == {
+        "roles.name": [
+            {"value": "test3", "count": 2},
+            {"value": "test1", "count": 1},
+            {"value": "test2", "count": 1},
+        ],
+        # users are counted once whatever the number of joined roles
+        "company_id": [{"value": 1, "count": 1}, {"value": 2, "count": 1}],
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params,status_code", [
+    ({}, 422),
+    ({"fields": "unknown"}, 400),
+    ({"fields": "roles.name"}, 400),
+    ({"fields": "company_id", "filter": "unknown||$eq||1"}, 400),
+])
+async def test_facets_invalid(facets_client: TestClient, init_data, params, status_code):
+    response = facets_client.get("/user/facets", params=params)
+    assert response.status_code == status_code
@@ -121,4 +121,15 @@ async def test_post_by_params_persist(params_client: TestClient,async_session, t
     stmt = select(UserTask).where(UserTask.id == task_id)
     result = await async_session.execute(stmt)
     fetched_record: UserTask = result.scalar_one_or_none()
-    assert fetched_record.user_id == 2
\ No newline at end of file
+    assert fetched_record.user_id == 2
+
+@pytest.mark.asyncio
+async def test_post_by_many_to_many_not_found(client: TestClient, async_session, test_user_data, test_role_data):
+    for role_data in test_role_data:
+        async_session.add(Role(**role_data))
+    await async_session.commit()
+    response = client.post("/user", json={**test_user_data[0], "roles": [1, 99, 100]})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Role not found: 99, 100"}
+    response = client.post("/user/bulk", json=[{**test_user_data[0], "roles": [99]}])
+    assert response.status_code == 400